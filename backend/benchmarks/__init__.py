@@ -0,0 +1,10 @@
+"""Benchmarks SynapseSync.
+
+À lancer depuis `backend/`, par exemple : `python -m benchmarks.http_pool`.
+"""
+
+import os
+import sys
+
+# Même principe que `app.py` : rend `synapsesync` importable sans installation.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
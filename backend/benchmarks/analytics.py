@@ -0,0 +1,158 @@
+"""Agrégations sur l'export Arrow (`core/analytics.py`) comparées au `GROUP BY` SQLite équivalent.
+
+Usage : `python -m benchmarks.analytics [--events 1000000] [--repeat 10]` (requiert `pyarrow`)
+
+Events synthétiques sur deux ans, écrits à la fois dans une table SQLite réduite (index
+`(module_id, timestamp)` comme `events`) et en fragments Arrow mensuels dans un `analytics_dir`
+temporaire. Requêtes : comptes par jour sur un an, par mois × `event_type` sur tout l'historique,
+par semaine × `repo_name` en `Europe/Paris`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from benchmarks.common import summarize
+
+EVENT_TYPES = ("PushEvent", "WatchEvent", "IssuesEvent", "PullRequestEvent", "CreateEvent")
+START = datetime(2024, 10, 1, tzinfo=timezone.utc)
+SPAN_S = 2 * 365 * 86400
+
+SQLITE_QUERIES = {
+    "day_1y": (
+        "SELECT strftime('%Y-%m-%d', timestamp), count(*) FROM events "
+        "WHERE module_id = 'github' AND timestamp >= ? GROUP BY 1",
+        lambda: ((START + timedelta(days=365)).strftime("%Y-%m-%d %H:%M:%S"),),
+    ),
+    "month_x_type": (
+        "SELECT strftime('%Y-%m', timestamp), event_type, count(*) FROM events WHERE module_id = 'github' GROUP BY 1, 2",
+        lambda: (),
+    ),
+    # Décalage fixe : approximation du fuseau côté SQLite (l'API applique les changements d'heure).
+    "week_x_repo_paris": (
+        "SELECT strftime('%Y-%W', timestamp, '+1 hours'), repo_name, count(*) FROM events WHERE module_id = 'github' GROUP BY 1, 2",
+        lambda: (),
+    ),
+}
+
+
+def seed(db: Path, events: int) -> list[tuple[Any, ...]]:
+    rng = random.Random(0)
+    rows = []
+    for i in range(events):
+        ts = START + timedelta(seconds=SPAN_S * i / events)
+        rows.append((i + 1, ts, "github", rng.choice(EVENT_TYPES), f"octo/repo{rng.randint(0, 49)}", "octo", str(i)))
+
+    conn = sqlite3.connect(db)
+    conn.executescript(
+        """
+        PRAGMA journal_mode = WAL;
+        PRAGMA synchronous = OFF;
+        CREATE TABLE events (id INTEGER PRIMARY KEY, timestamp TEXT, module_id TEXT, event_type TEXT,
+                             repo_name TEXT, actor TEXT, external_id TEXT);
+        CREATE INDEX ix_events_module_id_timestamp ON events (module_id, timestamp);
+        """
+    )
+    conn.executemany(
+        "INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ((r[0], r[1].strftime("%Y-%m-%d %H:%M:%S.%f"), *r[2:]) for r in rows),
+    )
+    conn.commit()
+    conn.close()
+    return rows
+
+
+def write_export(root: Path, rows: list[tuple[Any, ...]]) -> None:
+    """Fragments mensuels au format de `export_events` (un par mois)."""
+    import pyarrow as pa
+
+    from synapsesync.core import analytics
+
+    fields = analytics.module_fields("github")
+    schema = analytics._schema(fields)
+    months: dict[str, list[tuple[Any, ...]]] = {}
+    for row in rows:
+        months.setdefault(f"{row[1]:%Y-%m}", []).append(row)
+    module_dir = root / "github"
+    for month, month_rows in months.items():
+        (module_dir / month).mkdir(parents=True)
+        table = pa.table(
+            {
+                "id": [r[0] for r in month_rows],
+                "timestamp": [r[1] for r in month_rows],
+                "event_type": [r[3] for r in month_rows],
+                "repo_name": [r[4] for r in month_rows],
+                "actor": [r[5] for r in month_rows],
+                "ref": [None] * len(month_rows),
+                "external_id": [r[6] for r in month_rows],
+                **{name: [None] * len(month_rows) for name in fields},
+            },
+            schema=schema,
+        )
+        analytics._write_ipc(module_dir / month / f"{month_rows[0][0]}-{month_rows[-1][0]}.arrow", table)
+    analytics._save_state(
+        module_dir, {"last_event_id": rows[-1][0], "fields": {name: list(value) for name, value in fields.items()}}
+    )
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> dict[str, Any]:
+    timings: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return summarize(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    from synapsesync.core import analytics
+    from synapsesync.core.config import get_settings
+
+    if not analytics.HAS_PYARROW:
+        raise SystemExit("pyarrow is required (pip install 'synapsesync[analytics]')")
+    analytics._require_pyarrow()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        get_settings().analytics_dir = str(Path(tmp) / "analytics")
+        rows = seed(Path(tmp) / "events.db", args.events)
+        write_export(Path(tmp) / "analytics", rows)
+        report: dict[str, Any] = {"events": args.events, "seed_s": round(time.perf_counter() - start, 1)}
+        del rows
+
+        arrow_queries = {
+            "day_1y": lambda: analytics.aggregate("github", bucket="day", since=START + timedelta(days=365)),
+            "month_x_type": lambda: analytics.aggregate("github", bucket="month", group_by=["event_type"]),
+            "week_x_repo_paris": lambda: analytics.aggregate(
+                "github", bucket="week", group_by=["repo_name"], timezone_name="Europe/Paris"
+            ),
+        }
+        conn = sqlite3.connect(Path(tmp) / "events.db")
+        for name, (sql, params) in SQLITE_QUERIES.items():
+            cold_start = time.perf_counter()
+            arrow_queries[name]()
+            report[name] = {
+                "arrow_first_ms": round((time.perf_counter() - cold_start) * 1000, 2),
+                "arrow": _time(arrow_queries[name], args.repeat),
+                "sqlite": _time(lambda: conn.execute(sql, params()).fetchall(), max(1, args.repeat // 5)),
+            }
+        conn.close()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
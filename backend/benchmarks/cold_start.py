@@ -0,0 +1,135 @@
+"""Démarrage à froid d'un worker : import de l'app, lifespan, puis premières requêtes.
+
+Usage : `python -m benchmarks.cold_start [--runs 10] [--events 10000] [--idle-ms 100]`
+
+Chaque mesure est un nouveau processus Python (caches d'import vides, comme un worker uvicorn qui
+démarre) sur une même base SQLite migrée et peuplée une fois. Le préchargement en tâche de fond
+(modules et routes, `SYNAPSESYNC_STARTUP_WARMUP_ENABLED`) est mesuré activé puis désactivé :
+
+- interpreter : lancement du processus jusqu'à la première ligne du script ;
+- import : `import synapsesync.main` (création de l'app comprise) ;
+- startup : entrée dans le lifespan (le worker accepte alors des requêtes) ;
+- first_request / first_widget : `GET /api/widgets` puis un widget, `--idle-ms` après le démarrage
+  (délai avant le premier trafic) ; warm_widget : le même widget une seconde fois, sans cache ;
+- startup_report : `GET /__startup` en fin de run (découverte, import de chaque module, imports optionnels).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from benchmarks.common import summarize
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+WIDGET = "/api/widget-data/github/events_7d"
+STEPS = ("interpreter", "import", "startup", "first_request", "first_widget", "warm_widget")
+
+
+async def _child(idle_ms: float) -> dict[str, Any]:
+    timings: dict[str, float] = {}
+
+    start = time.perf_counter()
+    from synapsesync.main import app
+
+    timings["import"] = time.perf_counter() - start
+
+    import httpx
+
+    from synapsesync.core.cache import widget_cache
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            timings["startup"] = time.perf_counter() - start
+            await asyncio.sleep(idle_ms / 1000)
+
+            for step, path in (("first_request", "/api/widgets"), ("first_widget", WIDGET)):
+                start = time.perf_counter()
+                (await client.get(path)).raise_for_status()
+                timings[step] = time.perf_counter() - start
+
+            widget_cache.clear()
+            start = time.perf_counter()
+            (await client.get(WIDGET)).raise_for_status()
+            timings["warm_widget"] = time.perf_counter() - start
+
+            report = (await client.get("/__startup")).json()
+    return {"timings": timings, "startup_report": report}
+
+
+def _spawn(env: dict[str, str], idle_ms: float) -> dict[str, Any]:
+    spawned = time.time()
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.cold_start", "--child", "--idle-ms", str(idle_ms)],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    data = json.loads(result.stdout)
+    data["timings"]["interpreter"] = data.pop("started_at") - spawned
+    return data
+
+
+def _prepare(db: Path, events: int) -> None:
+    from alembic import command
+
+    from benchmarks.datasets import seed_database
+    from benchmarks.suite import _alembic_config
+
+    command.upgrade(_alembic_config(), "head")
+    if events:
+        seed_database(events)
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="synapsesync-cold-start-") as tmp:
+        db = Path(tmp) / "bench.db"
+        base_env = {
+            **os.environ,
+            "SYNAPSESYNC_DATABASE_URL": f"sqlite:///{db}",
+            "SYNAPSESYNC_SCHEDULER_ENABLED": "false",
+            "SYNAPSESYNC_ANALYTICS_DIR": str(Path(tmp) / "analytics"),
+        }
+        os.environ.update(base_env)
+        _prepare(db, args.events)
+
+        report: dict[str, Any] = {"runs": args.runs, "events": args.events, "idle_ms": args.idle_ms}
+        for label, warmup in (("warmup", "true"), ("no_warmup", "false")):
+            env = base_env | {"SYNAPSESYNC_STARTUP_WARMUP_ENABLED": warmup}
+            # Un premier processus non mesuré : fichiers `.pyc` et cache disque du système à jour.
+            _spawn(env, args.idle_ms)
+            runs = [_spawn(env, args.idle_ms) for _ in range(args.runs)]
+            report[label] = {step: summarize([r["timings"][step] for r in runs]) for step in STEPS}
+            report[label]["startup_report"] = runs[-1]["startup_report"]
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="processus mesurés par configuration")
+    parser.add_argument("--events", type=int, default=10_000, help="events synthétiques dans la base")
+    parser.add_argument("--idle-ms", type=float, default=100.0, help="délai entre le démarrage et la première requête")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        started_at = time.time()
+        print(json.dumps({"started_at": started_at, **asyncio.run(_child(args.idle_ms))}))
+        return
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
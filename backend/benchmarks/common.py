@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import statistics
+
+
+def summarize(timings: list[float]) -> dict[str, float | int | None]:
+    """Résumé (en millisecondes) d'une liste de durées en secondes."""
+    if not timings:
+        return {"count": 0, "mean_ms": None, "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+
+    ordered = sorted(timings)
+
+    def pct(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000, 2)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
@@ -0,0 +1,112 @@
+"""Latence de queue sous chargements de dashboard parallèles (app in-process via ASGI).
+
+Usage : `python -m benchmarks.concurrency [--dashboards 50] [--concurrency 10] [--seed-events 0]`
+
+Pendant les chargements, une sonde appelle `/health` en boucle : si l'event loop est bloqué par
+des I/O base synchrones, sa latence explose. Le cache widgets est désactivé pour mesurer la base.
+Pour comparer deux commits, lancer le script sur chacun avec la même DB (`SYNAPSESYNC_DATABASE_URL`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from benchmarks.common import summarize
+from synapsesync.core.cache import widget_cache
+from synapsesync.core.database import SessionLocal
+from synapsesync.core.ingest import ingest_events
+from synapsesync.main import create_app
+
+WIDGETS = ["recent_activity", "events_7d", "commit_streak", "commit_streak_history"]
+
+
+def seed_events(n: int) -> None:
+    now = datetime.now(tz=timezone.utc)
+    rows = (
+        {
+            "timestamp": now - timedelta(minutes=random.randint(0, 60 * 24 * 365)),
+            "module_id": "github",
+            "event_type": random.choice(["PushEvent", "PushEvent", "IssuesEvent", "WatchEvent"]),
+            "summary_text": f"bench: event {i}",
+            "external_id": f"bench-{i}",
+            "metadata_json": {"bench": True},
+        }
+        for i in range(n)
+    )
+    session = SessionLocal()
+    try:
+        ingest_events(session, "github", rows)
+        session.commit()
+    finally:
+        session.close()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dashboards", type=int, default=50, help="nombre de chargements de dashboard")
+    parser.add_argument("--concurrency", type=int, default=10, help="chargements simultanés")
+    parser.add_argument("--seed-events", type=int, default=0, help="events synthétiques à insérer avant")
+    args = parser.parse_args()
+
+    if args.seed_events:
+        seed_events(args.seed_events)
+
+    widget_cache.max_entries = 0
+
+    transport = httpx.ASGITransport(app=create_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        widget_timings: list[float] = []
+        dashboard_timings: list[float] = []
+        health_timings: list[float] = []
+        semaphore = asyncio.Semaphore(args.concurrency)
+        done = asyncio.Event()
+
+        async def timed_get(path: str, sink: list[float]) -> None:
+            start = time.perf_counter()
+            resp = await client.get(path)
+            resp.raise_for_status()
+            sink.append(time.perf_counter() - start)
+
+        async def load_dashboard() -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                await timed_get("/api/dashboards/default", widget_timings)
+                await asyncio.gather(*(timed_get(f"/api/widget-data/github/{w}", widget_timings) for w in WIDGETS))
+                dashboard_timings.append(time.perf_counter() - start)
+
+        async def probe_health() -> None:
+            while not done.is_set():
+                await timed_get("/health", health_timings)
+                await asyncio.sleep(0.005)
+
+        probe = asyncio.create_task(probe_health())
+        started = time.perf_counter()
+        await asyncio.gather(*(load_dashboard() for _ in range(args.dashboards)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe
+
+    print(
+        json.dumps(
+            {
+                "dashboards": args.dashboards,
+                "concurrency": args.concurrency,
+                "elapsed_s": round(elapsed, 3),
+                "dashboard_load": summarize(dashboard_timings),
+                "widget_request": summarize(widget_timings),
+                "health_during_load": summarize(health_timings),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,257 @@
+"""Jeux de données synthétiques : events GitHub au format de l'API (`/users/{user}/events`).
+
+Tailles nommées : `small` (10k), `medium` (1M), `large` (10M). La génération est déterministe pour
+une graine et une date de fin données. La date de fin vaut « maintenant » par défaut, car les fenêtres
+des widgets (7 jours, 365 jours) sont relatives à l'heure courante.
+
+Profil d'un compte actif : ~55 % de `PushEvent`, puis branches, PR, commentaires, étoiles, issues…
+L'activité se concentre sur quelques repos (poids décroissants). Il y a des jours sans activité,
+plus fréquents le week-end, ce qui casse les streaks. Les payloads ont la forme de ceux de l'API
+(commits, titres, corps), pour la compression et l'index plein texte.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Any
+
+SIZES = {"small": 10_000, "medium": 1_000_000, "large": 10_000_000}
+USERNAME = "octo-bench"
+FIRST_EVENT_ID = 30_000_000_000
+
+EVENT_MIX = (
+    ("PushEvent", 55),
+    ("CreateEvent", 10),
+    ("PullRequestEvent", 8),
+    ("IssueCommentEvent", 7),
+    ("WatchEvent", 6),
+    ("IssuesEvent", 5),
+    ("PullRequestReviewEvent", 4),
+    ("DeleteEvent", 3),
+    ("ForkEvent", 1),
+    ("ReleaseEvent", 1),
+)
+LANGUAGES = ("Python", "TypeScript", "JavaScript", "Rust", "Go", "Shell", "HTML", "CSS", "Dockerfile", "Makefile")
+WORDS = (
+    "fix", "add", "update", "refactor", "remove", "cache", "widget", "sync", "parser", "tests", "docs",
+    "dashboard", "timezone", "streak", "config", "module", "query", "index", "export", "retry", "typo",
+    "memory", "latency", "api", "client", "schema", "migration", "layout", "error", "handling",
+)
+REPO_COUNT = 40
+
+
+def resolve_size(name_or_count: str) -> int:
+    """`small` / `medium` / `large` ou un nombre d'events (`250000`, `250_000`)."""
+    if name_or_count in SIZES:
+        return SIZES[name_or_count]
+    return int(name_or_count.replace("_", ""))
+
+
+def default_end() -> datetime:
+    """Maintenant, tronqué à l'heure : deux générations dans la même heure sont identiques."""
+    return datetime.now(tz=timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def repo_names(username: str = USERNAME) -> list[str]:
+    return [f"{username}/project-{i:02d}" for i in range(REPO_COUNT)]
+
+
+def _sha(*parts: Any) -> str:
+    return hashlib.sha1(":".join(map(str, parts)).encode()).hexdigest()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, k=words)).capitalize()
+
+
+def _payload(event_type: str, rng: random.Random, i: int, username: str) -> dict[str, Any]:
+    number = rng.randint(1, 2000)
+    if event_type == "PushEvent":
+        size = rng.choices((1, 2, 3, 5, 8), cum_weights=(50, 70, 85, 95, 100))[0]
+        return {
+            "push_id": 20_000_000_000 + i,
+            "size": size,
+            "distinct_size": size,
+            "ref": "refs/heads/main" if rng.random() < 0.7 else f"refs/heads/feature-{number}",
+            "head": _sha("head", i),
+            "before": _sha("before", i),
+            "commits": [
+                {
+                    "sha": _sha("commit", i, c),
+                    "author": {"email": f"{username}@users.noreply.github.com", "name": username},
+                    "message": _sentence(rng, rng.randint(3, 12)),
+                    "distinct": True,
+                    "url": f"https://api.github.com/repos/commits/{_sha('commit', i, c)}",
+                }
+                for c in range(size)
+            ],
+        }
+    if event_type == "CreateEvent":
+        ref_type = rng.choice(("branch", "branch", "tag", "repository"))
+        return {
+            "ref": None if ref_type == "repository" else f"feature-{number}",
+            "ref_type": ref_type,
+            "master_branch": "main",
+            "description": _sentence(rng, 6),
+            "pusher_type": "user",
+        }
+    if event_type == "PullRequestEvent":
+        return {
+            "action": rng.choice(("opened", "closed", "reopened")),
+            "number": number,
+            "pull_request": {
+                "number": number,
+                "state": "open",
+                "title": _sentence(rng, 6),
+                "body": _sentence(rng, rng.randint(10, 40)),
+                "merged": False,
+                "additions": rng.randint(1, 500),
+                "deletions": rng.randint(0, 300),
+            },
+        }
+    if event_type == "IssueCommentEvent":
+        return {
+            "action": "created",
+            "issue": {"number": number, "title": _sentence(rng, 6), "state": "open"},
+            "comment": {"id": 1_000_000 + i, "body": _sentence(rng, rng.randint(5, 30))},
+        }
+    if event_type == "IssuesEvent":
+        return {
+            "action": rng.choice(("opened", "closed")),
+            "issue": {"number": number, "title": _sentence(rng, 6), "body": _sentence(rng, rng.randint(10, 40))},
+        }
+    if event_type == "PullRequestReviewEvent":
+        return {
+            "action": "created",
+            "review": {"state": rng.choice(("approved", "commented")), "body": _sentence(rng, rng.randint(0, 15))},
+            "pull_request": {"number": number, "title": _sentence(rng, 6)},
+        }
+    if event_type == "DeleteEvent":
+        return {"ref": f"feature-{number}", "ref_type": "branch", "pusher_type": "user"}
+    if event_type == "ForkEvent":
+        return {"forkee": {"full_name": f"{username}/fork-{number}", "fork": True}}
+    if event_type == "ReleaseEvent":
+        return {
+            "action": "published",
+            "release": {"tag_name": f"v{number // 100}.{number % 100}", "name": _sentence(rng, 3), "body": _sentence(rng, 25)},
+        }
+    return {"action": "started"}
+
+
+def _active_days(start: datetime, days: int, rng: random.Random) -> list[datetime]:
+    active = []
+    for d in range(days):
+        day = start + timedelta(days=d)
+        if rng.random() < (0.4 if day.weekday() >= 5 else 0.85):
+            active.append(day)
+    return active or [start]
+
+
+def github_events(
+    count: int,
+    *,
+    seed: int = 0,
+    end: datetime | None = None,
+    span_days: int = 730,
+    first_id: int = FIRST_EVENT_ID,
+    username: str = USERNAME,
+) -> Iterator[dict[str, Any]]:
+    """`count` events du plus ancien au plus récent, sur les `span_days` jours qui précèdent `end`.
+
+    Les ids croissent avec le temps, comme ceux de GitHub (le curseur de sync s'appuie dessus).
+    """
+    end = end or default_end()
+    rng = random.Random(seed)
+    start_day = (end - timedelta(days=span_days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    days = _active_days(start_day, span_days + 1, rng)
+    types = [name for name, _ in EVENT_MIX]
+    type_weights = list(accumulate(weight for _, weight in EVENT_MIX))
+    repos = repo_names(username)
+    repo_indexes = range(len(repos))
+    repo_weights = list(accumulate(1 / (rank + 1) for rank in repo_indexes))
+    limit = end - timedelta(seconds=1)
+
+    for i in range(count):
+        # Jours actifs parcourus dans l'ordre, heure du jour croissante à l'intérieur d'un jour.
+        position = i * len(days) / count
+        day = days[min(len(days) - 1, int(position))]
+        ts = min(limit, day + timedelta(hours=7, seconds=(position % 1) * 16 * 3600))
+        event_type = rng.choices(types, cum_weights=type_weights)[0]
+        repo_index = rng.choices(repo_indexes, cum_weights=repo_weights)[0]
+        repo = repos[repo_index]
+        yield {
+            "id": str(first_id + i),
+            "type": event_type,
+            "actor": {"id": 1_000_001, "login": username, "url": f"https://api.github.com/users/{username}"},
+            "repo": {"id": 700_000 + repo_index, "name": repo, "url": f"https://api.github.com/repos/{repo}"},
+            "payload": _payload(event_type, rng, i, username),
+            "public": True,
+            "created_at": ts.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+
+
+def repositories(*, seed: int = 0, username: str = USERNAME, forks: int = 5) -> list[dict[str, Any]]:
+    """Repos de `/users/{user}/repos` (dont quelques forks, ignorés par `languages_usage`)."""
+    rng = random.Random(seed)
+    names = repo_names(username) + [f"{username}/fork-{i}" for i in range(forks)]
+    return [
+        {
+            "id": 700_000 + index,
+            "full_name": name,
+            "name": name.split("/", 1)[1],
+            "fork": "/fork-" in name,
+            "pushed_at": (default_end() - timedelta(days=rng.randint(0, 400))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "language": rng.choice(LANGUAGES),
+            "languages_url": f"https://api.github.com/repos/{name}/languages",
+        }
+        for index, name in enumerate(names)
+    ]
+
+
+def repo_languages(full_name: str) -> dict[str, int]:
+    """Octets par langage d'un repo (stables d'une exécution à l'autre)."""
+    rng = random.Random(full_name)
+    chosen = rng.sample(LANGUAGES, rng.randint(1, 4))
+    return {language: rng.randint(1_000, 2_000_000) for language in chosen}
+
+
+def seed_database(
+    count: int,
+    *,
+    seed: int = 0,
+    end: datetime | None = None,
+    chunk_size: int = 50_000,
+    username: str = USERNAME,
+) -> int:
+    """Insère `count` events dans la base configurée, convertis comme le fait `GitHubModule.sync`.
+
+    Un commit par `chunk_size` events. Déclare aussi le module (provider `api`, `username`) et le
+    dashboard `bench` avec tous les widgets GitHub. Retourne le nombre d'events insérés.
+    """
+    from synapsesync.core.database import SessionLocal, iter_batches
+    from synapsesync.core.ingest import ingest_events
+    from synapsesync.core.models import Dashboard, ModuleConfig
+    from synapsesync.modules.github.module import GitHubModule
+
+    module = GitHubModule()
+    inserted = 0
+    rows = (module.event_row(ev, username) for ev in github_events(count, seed=seed, end=end, username=username))
+    for chunk in iter_batches(rows, chunk_size):
+        with SessionLocal() as session:
+            inserted += ingest_events(session, module.id, chunk)
+            session.commit()
+
+    with SessionLocal() as session:
+        session.merge(ModuleConfig(module_id=module.id, config_json={"provider": "api", "username": username}))
+        session.merge(
+            Dashboard(
+                id="bench",
+                config_json={"widgets": [{"module_id": module.id, "widget_id": w.id} for w in module.get_widgets()]},
+            )
+        )
+        session.commit()
+    return inserted
@@ -0,0 +1,106 @@
+"""API GitHub simulée pour les benchmarks, servie par un `httpx.MockTransport` (aucun accès réseau).
+
+Routes couvertes, celles qu'appelle `GitHubModule` :
+
+- `GET /users/{user}/events` : du plus récent au plus ancien, paginé (`per_page`, `page`, en-tête
+  `Link` `rel="next"`), `ETag` sur la première page et `304` sur `If-None-Match` ;
+- `GET /users/{user}/repos` : paginé de la même façon ;
+- `GET /repos/{owner}/{repo}/languages` : octets par langage (`languages_url` des repos).
+
+Chaque réponse porte les en-têtes `x-ratelimit-*`. `latency_ms` ajoute une attente par appel, pour
+approcher un aller-retour réseau. `push()` publie de nouveaux events entre deux syncs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import re
+from collections import Counter
+from collections.abc import Iterable
+from typing import Any
+
+import httpx
+
+from benchmarks.datasets import USERNAME, repo_languages, repositories
+
+API = "https://api.github.com"
+_EVENTS = re.compile(r"^/users/([^/]+)/events$")
+_REPOS = re.compile(r"^/users/([^/]+)/repos$")
+_LANGUAGES = re.compile(r"^/repos/([^/]+/[^/]+)/languages$")
+
+
+class FakeGitHub:
+    def __init__(
+        self,
+        events: Iterable[dict[str, Any]] = (),
+        repos: list[dict[str, Any]] | None = None,
+        *,
+        username: str = USERNAME,
+        latency_ms: float = 0.0,
+    ) -> None:
+        self.username = username
+        self.latency_ms = latency_ms
+        # Du plus récent au plus ancien, comme l'API.
+        self.events: list[dict[str, Any]] = sorted(events, key=lambda ev: int(ev["id"]), reverse=True)
+        self.repos = repos if repos is not None else repositories(username=username)
+        self.calls: Counter[str] = Counter()
+        self.remaining = 5000
+
+    def push(self, events: Iterable[dict[str, Any]]) -> None:
+        """Publie de nouveaux events (ids supérieurs aux existants)."""
+        self.events = sorted(events, key=lambda ev: int(ev["id"]), reverse=True) + self.events
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+        path = request.url.path
+        if (match := _EVENTS.match(path)) and match.group(1) == self.username:
+            self.calls["events"] += 1
+            return self._page(request, self.events, etag=True)
+        if (match := _REPOS.match(path)) and match.group(1) == self.username:
+            self.calls["repos"] += 1
+            return self._page(request, self.repos)
+        if (match := _LANGUAGES.match(path)) and any(r["full_name"] == match.group(1) for r in self.repos):
+            self.calls["languages"] += 1
+            return self._json(200, repo_languages(match.group(1)))
+        self.calls["not_found"] += 1
+        return self._json(404, {"message": "Not Found"})
+
+    def _page(self, request: httpx.Request, items: list[dict[str, Any]], etag: bool = False) -> httpx.Response:
+        per_page = min(100, int(request.url.params.get("per_page", 30)))
+        page = max(1, int(request.url.params.get("page", 1)))
+        chunk = items[(page - 1) * per_page : page * per_page]
+        headers: dict[str, str] = {}
+
+        if etag and page == 1:
+            newest = items[0]["id"] if items else ""
+            tag = '"' + hashlib.sha1(f"{request.url.path}:{per_page}:{newest}:{len(items)}".encode()).hexdigest() + '"'
+            headers["ETag"] = tag
+            if request.headers.get("if-none-match") == tag:
+                # Comme GitHub : un 304 ne décompte pas de quota.
+                self.calls["not_modified"] += 1
+                return httpx.Response(304, headers={**headers, **self._rate_headers(consume=False)})
+
+        if page * per_page < len(items):
+            last = -(-len(items) // per_page)
+            base = f"{API}{request.url.path}?per_page={per_page}"
+            headers["Link"] = f'<{base}&page={page + 1}>; rel="next", <{base}&page={last}>; rel="last"'
+        return self._json(200, chunk, headers)
+
+    def _json(self, status: int, body: Any, headers: dict[str, str] | None = None) -> httpx.Response:
+        return httpx.Response(status, json=body, headers={**(headers or {}), **self._rate_headers()})
+
+    def _rate_headers(self, consume: bool = True) -> dict[str, str]:
+        if consume:
+            self.remaining = max(0, self.remaining - 1)
+        return {
+            "x-ratelimit-limit": "5000",
+            "x-ratelimit-remaining": str(self.remaining),
+            "x-ratelimit-reset": "4102444800",
+            "x-ratelimit-resource": "core",
+        }
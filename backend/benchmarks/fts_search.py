@@ -0,0 +1,142 @@
+"""Latence de la recherche plein texte (`events_fts`) comparée à un `LIKE` sur `summary_text`/`body`.
+
+Usage : `python -m benchmarks.fts_search [--events 1000000] [--repeat 20]`
+
+Base SQLite temporaire au schéma de la migration `0010` (table `events` réduite + FTS5), vocabulaire
+à distribution de Zipf : termes rares, fréquents et préfixes. Pour chacun, première page de 20 de
+`GET /api/events/search` : BM25 sur toutes les correspondances (`unbounded`), BM25 borné aux
+`--max-candidates` plus récentes (`relevance`, comportement par défaut) et `order=recent`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from benchmarks.common import summarize
+
+SELECT_SQL = """
+SELECT e.id, bm25(events_fts, 2.0, 1.0) AS rank,
+       highlight(events_fts, 0, '<mark>', '</mark>'), snippet(events_fts, 1, '<mark>', '</mark>', '…', 24)
+FROM events_fts JOIN events e ON e.id = events_fts.rowid
+WHERE events_fts MATCH ? AND e.module_id = ?
+"""
+FLOOR_SQL = """
+SELECT events_fts.rowid FROM events_fts JOIN events e ON e.id = events_fts.rowid
+WHERE events_fts MATCH ? AND e.module_id = ? ORDER BY events_fts.rowid DESC LIMIT 1 OFFSET ?
+"""
+
+LIKE_SQL = """
+SELECT e.id FROM events e JOIN events_body b ON b.id = e.id
+WHERE e.module_id = ? AND (e.summary_text LIKE ? OR b.body LIKE ?)
+ORDER BY e.timestamp DESC LIMIT 20
+"""
+
+
+def _vocabulary(size: int = 5000) -> list[str]:
+    rng = random.Random(0)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return [f"{''.join(rng.choices(letters, k=rng.randint(3, 9)))}{i}" for i in range(size)]
+
+
+def seed(db: Path, events: int) -> list[str]:
+    vocab = _vocabulary()
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocab))))
+    rng = random.Random(1)
+
+    conn = sqlite3.connect(db)
+    conn.executescript(
+        """
+        PRAGMA journal_mode = WAL;
+        PRAGMA synchronous = OFF;
+        CREATE TABLE events (id INTEGER PRIMARY KEY, timestamp TEXT, module_id TEXT, summary_text TEXT);
+        CREATE TABLE events_body (id INTEGER PRIMARY KEY, body TEXT);
+        CREATE VIRTUAL TABLE events_fts USING fts5(summary_text, body, tokenize = 'unicode61 remove_diacritics 2');
+        """
+    )
+    batch = 10_000
+    for start in range(0, events, batch):
+        rows = []
+        for i in range(start, min(start + batch, events)):
+            summary = "octo: PushEvent " + " ".join(rng.choices(vocab, cum_weights=cum_weights, k=3))
+            body = " ".join(rng.choices(vocab, cum_weights=cum_weights, k=20))
+            rows.append((i + 1, f"2026-01-01T00:00:{i:012d}", "github", summary, body))
+        conn.executemany("INSERT INTO events VALUES (?, ?, ?, ?)", [r[:4] for r in rows])
+        conn.executemany("INSERT INTO events_body VALUES (?, ?)", [(r[0], r[4]) for r in rows])
+        conn.executemany("INSERT INTO events_fts (rowid, summary_text, body) VALUES (?, ?, ?)", [(r[0], r[3], r[4]) for r in rows])
+        conn.commit()
+    conn.execute("INSERT INTO events_fts (events_fts) VALUES ('optimize')")
+    conn.commit()
+    conn.close()
+    return vocab
+
+
+def _time(conn: sqlite3.Connection, sql: str, params: tuple[Any, ...], repeat: int) -> dict[str, Any]:
+    timings: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        timings.append(time.perf_counter() - start)
+    return summarize(timings)
+
+
+def _time_bounded(conn: sqlite3.Connection, expression: str, max_candidates: int, repeat: int) -> dict[str, Any]:
+    timings: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        floor = conn.execute(FLOOR_SQL, (expression, "github", max_candidates - 1)).fetchone()
+        if floor is None:
+            conn.execute(SELECT_SQL + " ORDER BY rank, e.id LIMIT 20", (expression, "github")).fetchall()
+        else:
+            sql = SELECT_SQL + " AND events_fts.rowid >= ? ORDER BY rank, e.id LIMIT 20"
+            conn.execute(sql, (expression, "github", floor[0])).fetchall()
+        timings.append(time.perf_counter() - start)
+    return summarize(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--max-candidates", type=int, default=20_000)
+    parser.add_argument("--skip-like", action="store_true", help="ne pas mesurer le LIKE (long au-delà de 1M)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "fts.db"
+        start = time.perf_counter()
+        vocab = seed(db, args.events)
+        report: dict[str, Any] = {"events": args.events, "seed_s": round(time.perf_counter() - start, 1)}
+
+        queries = {
+            "rare_term": f'"{vocab[-1]}"',
+            "common_term": f'"{vocab[0]}"',
+            "two_terms": f'"{vocab[10]}" "{vocab[200]}"',
+            "prefix": f'"{vocab[50][:3]}"*',
+        }
+        conn = sqlite3.connect(db)
+        for name, expression in queries.items():
+            matches = conn.execute("SELECT count(*) FROM events_fts WHERE events_fts MATCH ?", (expression,)).fetchone()[0]
+            report[name] = {
+                "matches": matches,
+                "unbounded": _time(conn, SELECT_SQL + " ORDER BY rank, e.id LIMIT 20", (expression, "github"), args.repeat),
+                "relevance": _time_bounded(conn, expression, args.max_candidates, args.repeat),
+                "recent": _time(conn, SELECT_SQL + " ORDER BY events_fts.rowid DESC LIMIT 20", (expression, "github"), args.repeat),
+            }
+            if not args.skip_like and name == "rare_term":
+                pattern = f"%{vocab[-1]}%"
+                report[name]["like"] = _time(conn, LIKE_SQL, ("github", pattern, pattern), max(1, args.repeat // 10))
+        conn.close()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Compare un client httpx neuf par requête au client partagé de l'application.
+
+Usage : `python -m benchmarks.http_pool [--url URL] [--requests N]`
+
+Par défaut interroge `https://api.github.com/rate_limit`, qui ne consomme pas de quota.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.common import summarize
+from synapsesync.core.http import create_http_client
+
+
+async def _fresh_clients(url: str, n: int) -> list[float]:
+    timings: list[float] = []
+    for _ in range(n):
+        start = time.perf_counter()
+        async with httpx.AsyncClient(timeout=30) as client:
+            resp = await client.get(url)
+            resp.raise_for_status()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def _shared_client(url: str, n: int) -> list[float]:
+    timings: list[float] = []
+    async with create_http_client() as client:
+        for _ in range(n):
+            start = time.perf_counter()
+            resp = await client.get(url)
+            resp.raise_for_status()
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="https://api.github.com/rate_limit")
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    fresh = await _fresh_clients(args.url, args.requests)
+    shared = await _shared_client(args.url, args.requests)
+    print(json.dumps({"url": args.url, "requests": args.requests, "fresh_client": summarize(fresh), "shared_client": summarize(shared)}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
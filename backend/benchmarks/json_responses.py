@@ -0,0 +1,124 @@
+"""Coût de sérialisation des réponses volumineuses (timelines d'events avec `metadata_json`).
+
+Usage : `python -m benchmarks.json_responses [--sizes 1000 10000 100000] [--repeat 5]`
+
+Compare le chemin par défaut de FastAPI (`jsonable_encoder` + `json`), la sérialisation Pydantic
+(`TypeAdapter.dump_json`, chemin des endpoints avec `response_model`), `FastJSONResponse`
+(orjson si installé) et son repli stdlib, puis la taille/le temps de compression gzip (et brotli si installé).
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from benchmarks.common import summarize
+from synapsesync.core import responses
+from synapsesync.core.config import get_settings
+from synapsesync.core.responses import FastJSONResponse
+
+
+def make_events(n: int) -> dict[str, Any]:
+    """Réponse type `recent_activity` avec le payload GitHub complet de chaque event."""
+    now = datetime.now(tz=timezone.utc)
+    events = []
+    for i in range(n):
+        ts = now - timedelta(minutes=i)
+        events.append(
+            {
+                "timestamp": ts,
+                "event_type": "PushEvent",
+                "summary_text": f"octocat: PushEvent (octocat/repo-{i % 50})",
+                "metadata_json": {
+                    "id": str(30_000_000_000 + i),
+                    "type": "PushEvent",
+                    "actor": {"id": 583231, "login": "octocat", "url": "https://api.github.com/users/octocat"},
+                    "repo": {"id": 1296269 + i % 50, "name": f"octocat/repo-{i % 50}"},
+                    "payload": {
+                        "push_id": 10_000_000 + i,
+                        "size": 2,
+                        "ref": "refs/heads/main",
+                        "head": f"{i:040x}",
+                        "commits": [
+                            {"sha": f"{i * 2 + k:040x}", "message": f"Fix bug #{i}-{k} — é", "distinct": True}
+                            for k in range(2)
+                        ],
+                    },
+                    "public": True,
+                    "created_at": ts.isoformat().replace("+00:00", "Z"),
+                },
+            }
+        )
+    return {"visual_type": "timeline", "data": events}
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> tuple[list[float], Any]:
+    timings: list[float] = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def _stdlib_fallback(content: Any) -> bytes:
+    orjson, responses.orjson = responses.orjson, None
+    try:
+        return responses.json_dumps(content)
+    finally:
+        responses.orjson = orjson
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    adapter = TypeAdapter(dict[str, Any])
+    try:
+        import brotli  # type: ignore
+    except ImportError:
+        brotli = None
+
+    report: dict[str, Any] = {"orjson": responses.HAS_ORJSON, "brotli": brotli is not None, "sizes": {}}
+    for n in args.sizes:
+        content = make_events(n)
+        paths: dict[str, Callable[[], bytes]] = {
+            "fastapi_default": lambda: JSONResponse(jsonable_encoder(content)).body,
+            "pydantic_dump_json": lambda: adapter.dump_json(content),
+            "fast_json_response": lambda: FastJSONResponse(content).body,
+            "stdlib_fallback": lambda: _stdlib_fallback(content),
+        }
+
+        entry: dict[str, Any] = {}
+        body = b""
+        for name, fn in paths.items():
+            timings, body = _time(fn, args.repeat)
+            entry[name] = summarize(timings)
+        entry["body_bytes"] = len(body)
+        assert json.loads(body)["data"][0]["event_type"] == "PushEvent"
+
+        timings, compressed = _time(lambda: gzip.compress(body, compresslevel=settings.gzip_compresslevel), args.repeat)
+        entry["gzip"] = {"bytes": len(compressed), **summarize(timings)}
+        if brotli is not None:
+            timings, compressed = _time(lambda: brotli.compress(body, quality=settings.brotli_quality), args.repeat)
+            entry["brotli"] = {"bytes": len(compressed), **summarize(timings)}
+
+        report["sizes"][n] = entry
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Surcoût de l'instrumentation `/metrics` (`core/metrics.py`) par requête HTTP et par requête SQL.
+
+Usage : `python -m benchmarks.metrics_overhead [--requests 20000] [--queries 50000]`
+
+- HTTP : une route FastAPI triviale appelée directement en ASGI (sans réseau), avec et sans
+  `MetricsMiddleware` ; seul le coût de la pile est mesuré, pas celui d'un vrai endpoint.
+- SQL : `SELECT 1` sur deux moteurs SQLite en mémoire, avec et sans `install_engine_hooks`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+from synapsesync.core.metrics import MetricsMiddleware, install_engine_hooks
+
+
+def _app(instrumented: bool) -> Any:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int) -> dict:
+        return {"id": item_id}
+
+    return MetricsMiddleware(app) if instrumented else app
+
+
+async def _call(app: Any, n: int) -> float:
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(_message: dict[str, Any]) -> None:
+        pass
+
+    start = time.perf_counter()
+    for i in range(n):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "path": f"/items/{i}",
+            "raw_path": f"/items/{i}".encode(),
+            "root_path": "",
+            "scheme": "http",
+            "query_string": b"",
+            "headers": [],
+            "client": ("127.0.0.1", 1234),
+            "server": ("testserver", 80),
+        }
+        await app(scope, receive, send)
+    return time.perf_counter() - start
+
+
+def _queries(instrumented: bool, n: int) -> float:
+    engine = create_engine("sqlite://")
+    if instrumented:
+        install_engine_hooks(engine, "bench")
+    with engine.connect() as conn:
+        statement = text("SELECT 1")
+        start = time.perf_counter()
+        for _ in range(n):
+            conn.execute(statement).scalar()
+        return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=50_000)
+    args = parser.parse_args()
+
+    report: dict[str, Any] = {}
+    for label, instrumented in (("plain", False), ("instrumented", True)):
+        app = _app(instrumented)
+        asyncio.run(_call(app, 500))  # échauffement
+        http_s = asyncio.run(_call(app, args.requests))
+        sql_s = _queries(instrumented, args.queries)
+        report[label] = {
+            "http_us_per_request": round(http_s / args.requests * 1e6, 2),
+            "sql_us_per_query": round(sql_s / args.queries * 1e6, 2),
+        }
+    report["overhead"] = {
+        key: round(report["instrumented"][key] - report["plain"][key], 2) for key in report["plain"]
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Taille et coût du stockage compressé des payloads d'events (`events.payload`).
+
+Usage : `python -m benchmarks.payload_compression [--events 10000]`
+
+Compare le JSON brut (ancien `metadata_json`) à zlib et zstd (si `zstandard` est installé), par event :
+octets moyens, ratio, et temps de compression / décompression.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import zlib
+from typing import Any, Callable
+
+from benchmarks.common import summarize
+from benchmarks.json_responses import make_events
+
+
+def _measure(payloads: list[dict[str, Any]], compress: Callable[[bytes], bytes], decompress: Callable[[bytes], bytes]) -> dict[str, Any]:
+    raws = [json.dumps(p, separators=(",", ":"), ensure_ascii=False).encode("utf-8") for p in payloads]
+
+    start = time.perf_counter()
+    blobs = [compress(r) for r in raws]
+    compress_s = time.perf_counter() - start
+
+    timings: list[float] = []
+    for blob in blobs:
+        t = time.perf_counter()
+        decompress(blob)
+        timings.append(time.perf_counter() - t)
+
+    raw_bytes = sum(len(r) for r in raws)
+    blob_bytes = sum(len(b) for b in blobs)
+    return {
+        "avg_bytes": round(blob_bytes / len(blobs), 1),
+        "ratio": round(raw_bytes / blob_bytes, 2),
+        "compress_us_per_event": round(compress_s / len(blobs) * 1e6, 2),
+        "decompress": summarize(timings),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--level", type=int, default=6)
+    args = parser.parse_args()
+
+    payloads = [e["metadata_json"] for e in json.loads(json.dumps(make_events(args.events)["data"], default=str))]
+    raw_avg = sum(len(json.dumps(p, separators=(",", ":")).encode()) for p in payloads) / len(payloads)
+
+    report: dict[str, Any] = {"events": args.events, "raw_avg_bytes": round(raw_avg, 1)}
+    report["zlib"] = _measure(payloads, lambda r: zlib.compress(r, args.level), zlib.decompress)
+    try:
+        import zstandard  # type: ignore
+    except ImportError:
+        report["zstd"] = None
+    else:
+        cctx, dctx = zstandard.ZstdCompressor(level=args.level), zstandard.ZstdDecompressor()
+        report["zstd"] = _measure(payloads, cctx.compress, dctx.decompress)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
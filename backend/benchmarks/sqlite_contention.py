@@ -0,0 +1,127 @@
+"""Lectures de widgets pendant des syncs : profil SQLite optimisé vs mode par défaut.
+
+Usage : `python -m benchmarks.sqlite_contention [--untuned] [--duration 5] [--readers 8] [--batch 2000]`
+
+Des writers rejouent des transactions de sync (`ingest_events` par gros lots) pendant que des readers
+exécutent les requêtes des widgets. Le script compte les erreurs `database is locked` de chaque côté.
+À lancer sur une DB jetable : `SYNAPSESYNC_DATABASE_URL=sqlite:///bench.db` + `alembic upgrade head`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import count
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--untuned", action="store_true", help="désactive WAL/PRAGMAs (journal rollback)")
+    parser.add_argument("--no-retry", action="store_true", help="désactive le retry sur `database is locked`")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--batch", type=int, default=2000, help="events par transaction de sync")
+    args = parser.parse_args()
+
+    # Les réglages sont lus à la création des engines : à fixer avant tout import de synapsesync.
+    if args.untuned:
+        os.environ["SYNAPSESYNC_SQLITE_TUNED"] = "false"
+        os.environ["SYNAPSESYNC_SQLITE_BUSY_TIMEOUT_MS"] = "0"
+    if args.no_retry:
+        os.environ["SYNAPSESYNC_DB_LOCK_RETRIES"] = "0"
+
+    from sqlalchemy import func, select
+
+    from benchmarks.common import summarize
+    from synapsesync.core.database import AsyncSessionLocal, get_async_engine, is_lock_error, retry_on_locked
+    from synapsesync.core.ingest import ingest_events
+    from synapsesync.core.models import Event
+
+    ids = count()
+    stop = asyncio.Event()
+    read_timings: list[float] = []
+    write_timings: list[float] = []
+    errors = {"read_locked": 0, "write_locked": 0}
+    inserted_total = 0
+
+    def make_rows(n: int) -> list[dict]:
+        now = datetime.now(tz=timezone.utc)
+        return [
+            {
+                "timestamp": now - timedelta(seconds=i),
+                "module_id": "bench",
+                "event_type": "PushEvent",
+                "summary_text": "bench: contention",
+                "external_id": f"contention-{os.getpid()}-{next(ids)}",
+                "metadata_json": {"bench": True},
+            }
+            for i in range(n)
+        ]
+
+    async def writer() -> None:
+        nonlocal inserted_total
+        while not stop.is_set():
+            rows = make_rows(args.batch)
+
+            async def write() -> int:
+                async with AsyncSessionLocal() as session:
+                    inserted = await session.run_sync(ingest_events, "bench", rows)
+                    await session.commit()
+                    return inserted
+
+            start = time.perf_counter()
+            try:
+                inserted_total += await retry_on_locked(write)
+                write_timings.append(time.perf_counter() - start)
+            except Exception as e:
+                if not is_lock_error(e):
+                    raise
+                errors["write_locked"] += 1
+
+    async def reader() -> None:
+        since = datetime.now(tz=timezone.utc) - timedelta(days=7)
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as session:
+                    await session.execute(
+                        select(func.count()).select_from(Event).where(Event.module_id == "bench").where(Event.timestamp >= since)
+                    )
+                    await session.execute(
+                        select(Event.id).where(Event.module_id == "bench").order_by(Event.timestamp.desc()).limit(30)
+                    )
+                read_timings.append(time.perf_counter() - start)
+            except Exception as e:
+                if not is_lock_error(e):
+                    raise
+                errors["read_locked"] += 1
+
+    tasks = [asyncio.create_task(writer()) for _ in range(args.writers)]
+    tasks += [asyncio.create_task(reader()) for _ in range(args.readers)]
+    await asyncio.sleep(args.duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    await get_async_engine().dispose()
+
+    print(
+        json.dumps(
+            {
+                "profile": "untuned" if args.untuned else "tuned",
+                "duration_s": args.duration,
+                "inserted": inserted_total,
+                "errors": errors,
+                "read": summarize(read_timings),
+                "sync_transaction": summarize(write_timings),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,385 @@
+"""Suite de référence : ingestion, widgets, dashboard et latence de queue sur un jeu synthétique.
+
+Usage :
+  `python -m benchmarks.suite [--dataset small|medium|large|N] [--seed 0] [--db PATH] [--output FILE]
+  [--only ingest widgets dashboard concurrency] [--latency-ms 0]`
+  `python -m benchmarks.suite compare BASE.json NEW.json [--threshold 0.1]`
+
+- base : SQLite dédiée, migrée par Alembic puis peuplée par `datasets.seed_database`. Avec `--db`, la
+  base peuplée est conservée et réutilisée tant que taille, graine et schéma ne changent pas (peupler
+  `large` prend plusieurs minutes) ; chaque exécution travaille sur une copie ;
+- ingest : `GitHubModule.sync` contre `FakeGitHub`, `--sync-events` nouveaux events par tour (pages
+  de 100) → events/s ; puis syncs incrémentales (quelques events) et sans changement (`304`) ;
+- widgets : chaque widget GitHub via `/api/widget-data`, cache widgets désactivé ; le premier appel
+  de `languages_usage` (langages demandés à l'API) est compté à part des suivants (cache en base) ;
+- dashboard : `GET /api/dashboards/bench` puis `POST /api/widget-data/batch` du dashboard ;
+- concurrency : chargements de dashboard simultanés, avec une sonde `/health` (blocage de l'event loop).
+
+Le JSON produit (stdout ou `--output`) porte le commit, la machine et les paramètres ; `compare`
+affiche l'écart de chaque mesure entre deux fichiers et sort en erreur au-delà du seuil.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from benchmarks.common import summarize
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+PHASES = ("ingest", "widgets", "dashboard", "concurrency")
+
+
+def _git(*args: str) -> str | None:
+    try:
+        result = subprocess.run(["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def _alembic_config() -> Any:
+    from alembic.config import Config
+
+    # Sans fichier ini : pas de `fileConfig`, la configuration des loggers reste intacte.
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    return config
+
+
+def _schema_head() -> str | None:
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(_alembic_config()).get_current_head()
+
+
+def _remove_db(path: Path) -> None:
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+
+def _copy_db(source: Path, target: Path) -> None:
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+def prepare_database(events: int, seed: int, cache: Path | None, target: Path) -> dict[str, Any]:
+    """Peuple `target` (ou la copie depuis `cache`, base peuplée conservée entre deux exécutions).
+
+    À appeler avant tout import de `synapsesync` : les moteurs sont créés à l'import, sur l'URL de
+    `SYNAPSESYNC_DATABASE_URL`, qui désigne toujours la base de travail `target`.
+    """
+    os.environ["SYNAPSESYNC_DATABASE_URL"] = f"sqlite:///{target}"
+    os.environ["SYNAPSESYNC_SCHEDULER_ENABLED"] = "false"
+    head = _schema_head()
+    meta_path = cache.with_name(cache.name + ".json") if cache is not None else None
+    if cache is not None and meta_path is not None and cache.exists() and meta_path.exists():
+        meta = json.loads(meta_path.read_text())
+        if (meta["events"], meta["seed"], meta["schema"]) == (events, seed, head):
+            _copy_db(cache, target)
+            return meta | {"reused": True}
+
+    from alembic import command
+
+    from benchmarks.datasets import default_end, seed_database
+
+    end = default_end()
+    start = time.perf_counter()
+    command.upgrade(_alembic_config(), "head")
+    inserted = seed_database(events, seed=seed, end=end)
+    meta = {
+        "events": events,
+        "inserted": inserted,
+        "seed": seed,
+        "end": end.isoformat(),
+        "schema": head,
+        "seed_s": round(time.perf_counter() - start, 1),
+    }
+    if cache is not None and meta_path is not None:
+        _remove_db(cache)
+        _copy_db(target, cache)
+        meta_path.write_text(json.dumps(meta))
+    return meta | {"reused": False}
+
+
+# --- Phases -----------------------------------------------------------------------------------
+
+
+async def bench_ingest(args: argparse.Namespace, fake: Any, first_id: int) -> dict[str, Any]:
+    from benchmarks.datasets import default_end, github_events
+    from synapsesync.core.config import get_settings
+    from synapsesync.modules.github.module import GitHubModule
+
+    settings = get_settings()
+    settings.github_events_per_page = 100
+    settings.github_events_max_pages = max(settings.github_events_max_pages, math.ceil(args.sync_events / 100) + 1)
+    module = GitHubModule()
+    next_id = first_id
+
+    async def sync_new(count: int, seed: int) -> tuple[int, float]:
+        nonlocal next_id
+        fake.push(github_events(count, seed=seed, end=default_end(), span_days=1, first_id=next_id))
+        next_id += count
+        start = time.perf_counter()
+        inserted = await module.sync()
+        return inserted, time.perf_counter() - start
+
+    rounds = []
+    for r in range(args.sync_rounds):
+        inserted, elapsed = await sync_new(args.sync_events, args.seed + 1000 + r)
+        rounds.append({"inserted": inserted, "seconds": round(elapsed, 3), "events_per_s": round(inserted / elapsed, 1)})
+
+    incremental = []
+    for r in range(args.repeat):
+        _, elapsed = await sync_new(args.incremental_events, args.seed + 2000 + r)
+        incremental.append(elapsed)
+
+    not_modified = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        await module.sync()
+        not_modified.append(time.perf_counter() - start)
+
+    return {
+        "events_per_round": args.sync_events,
+        "rounds": rounds,
+        "events_per_s": round(statistics.median(r["events_per_s"] for r in rounds), 1) if rounds else None,
+        "incremental": summarize(incremental),
+        "not_modified": summarize(not_modified),
+    }
+
+
+async def _timed(client: Any, method: str, path: str, sink: list[float], **kwargs: Any) -> Any:
+    start = time.perf_counter()
+    resp = await client.request(method, path, **kwargs)
+    sink.append(time.perf_counter() - start)
+    resp.raise_for_status()
+    return resp
+
+
+async def bench_widgets(args: argparse.Namespace, client: Any) -> dict[str, Any]:
+    from synapsesync.modules.github.module import GitHubModule
+
+    report: dict[str, Any] = {}
+    first: list[float] = []
+    await _timed(client, "GET", "/api/widget-data/github/languages_usage", first)
+    report["languages_usage_first"] = summarize(first)
+    for widget in GitHubModule().get_widgets():
+        timings: list[float] = []
+        for _ in range(args.repeat):
+            await _timed(client, "GET", f"/api/widget-data/github/{widget.id}", timings)
+        report[widget.id] = summarize(timings)
+    return report
+
+
+async def _load_dashboard(client: Any, sink: list[float]) -> None:
+    start = time.perf_counter()
+    await client.get("/api/dashboards/bench")
+    resp = await client.post("/api/widget-data/batch", json={"dashboard_id": "bench"})
+    resp.raise_for_status()
+    failed = [r["widget_id"] for r in resp.json()["results"] if r["status"] != "ok"]
+    if failed:
+        raise RuntimeError(f"Dashboard widgets failed: {failed}")
+    sink.append(time.perf_counter() - start)
+
+
+async def bench_dashboard(args: argparse.Namespace, client: Any) -> dict[str, Any]:
+    timings: list[float] = []
+    for _ in range(args.repeat):
+        await _load_dashboard(client, timings)
+    return summarize(timings)
+
+
+async def bench_concurrency(args: argparse.Namespace, client: Any) -> dict[str, Any]:
+    loads: list[float] = []
+    health: list[float] = []
+    semaphore = asyncio.Semaphore(args.clients)
+    done = asyncio.Event()
+
+    async def load() -> None:
+        async with semaphore:
+            await _load_dashboard(client, loads)
+
+    async def probe() -> None:
+        while not done.is_set():
+            await _timed(client, "GET", "/health", health)
+            await asyncio.sleep(0.005)
+
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(load() for _ in range(args.loads)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+    return {
+        "clients": args.clients,
+        "loads": args.loads,
+        "elapsed_s": round(elapsed, 3),
+        "loads_per_s": round(args.loads / elapsed, 1),
+        "dashboard_load": summarize(loads),
+        "health_during_load": summarize(health),
+    }
+
+
+async def run_phases(args: argparse.Namespace, first_id: int) -> dict[str, Any]:
+    import httpx
+
+    from benchmarks.fake_github import FakeGitHub
+    from synapsesync.core.cache import widget_cache
+    from synapsesync.core.http import close_http_client, create_http_client, use_http_client
+    from synapsesync.main import create_app
+
+    fake = FakeGitHub(latency_ms=args.latency_ms)
+    use_http_client(create_http_client(transport=fake.transport()))
+    # Mesure du calcul des widgets, pas du cache en mémoire.
+    widget_cache.max_entries = 0
+
+    report: dict[str, Any] = {}
+    try:
+        if "ingest" in args.only:
+            report["ingest"] = await bench_ingest(args, fake, first_id)
+        transport = httpx.ASGITransport(app=create_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            if "widgets" in args.only:
+                report["widgets"] = await bench_widgets(args, client)
+            if "dashboard" in args.only:
+                report["dashboard"] = await bench_dashboard(args, client)
+            if "concurrency" in args.only:
+                report["concurrency"] = await bench_concurrency(args, client)
+    finally:
+        await close_http_client()
+    report["github_api_calls"] = dict(fake.calls)
+    return report
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    from benchmarks.datasets import FIRST_EVENT_ID, resolve_size
+
+    events = resolve_size(args.dataset)
+    with ExitStack() as stack:
+        workdir = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="synapsesync-bench-")))
+        dataset = prepare_database(events, args.seed, Path(args.db).resolve() if args.db else None, workdir / "bench.db")
+        phases = asyncio.run(run_phases(args, FIRST_EVENT_ID + events))
+
+        from synapsesync.core.database import get_engine
+
+        get_engine().dispose()
+
+    return {
+        "meta": {
+            "commit": _git("rev-parse", "HEAD"),
+            "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+            "created_at": datetime.now(tz=timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sqlite": sqlite3.sqlite_version,
+            "dataset": dataset,
+            "params": {
+                key: getattr(args, key)
+                for key in ("repeat", "sync_events", "sync_rounds", "incremental_events", "clients", "loads", "latency_ms")
+            },
+        },
+        **phases,
+    }
+
+
+# --- Comparaison ------------------------------------------------------------------------------
+
+
+def _flatten(data: dict[str, Any], prefix: str = "") -> dict[str, float]:
+    values: dict[str, float] = {}
+    for key, value in data.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            values.update(_flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[path] = value
+    return values
+
+
+def _direction(metric: str) -> int:
+    """+1 : plus grand = mieux ; -1 : plus petit = mieux ; 0 : pas une mesure de performance."""
+    name = metric.rsplit(".", 1)[-1]
+    if name.endswith("per_s"):
+        return 1
+    if name in ("mean_ms", "p50_ms", "p95_ms", "p99_ms", "elapsed_s"):
+        return -1
+    return 0
+
+
+def compare(base: dict[str, Any], new: dict[str, Any], threshold: float) -> list[str]:
+    """Affiche l'écart de chaque mesure ; retourne les régressions au-delà de `threshold`."""
+    old_values = _flatten({k: v for k, v in base.items() if k != "meta"})
+    new_values = _flatten({k: v for k, v in new.items() if k != "meta"})
+    print(f"base {base['meta'].get('commit')} -> new {new['meta'].get('commit')}")
+    print(f"{'metric':55} {'base':>12} {'new':>12} {'change':>8}")
+    regressions = []
+    for metric in sorted(old_values.keys() & new_values.keys()):
+        direction = _direction(metric)
+        old, current = old_values[metric], new_values[metric]
+        if direction == 0 or not old:
+            continue
+        change = (current - old) / old
+        regressed = change * direction < -threshold
+        if regressed:
+            regressions.append(metric)
+        print(f"{metric:55} {old:>12} {current:>12} {change:+8.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main() -> None:
+    if sys.argv[1:2] == ["compare"]:
+        parser = argparse.ArgumentParser(prog="benchmarks.suite compare")
+        parser.add_argument("base")
+        parser.add_argument("new")
+        parser.add_argument("--threshold", type=float, default=0.1, help="écart relatif toléré (0.1 = 10 %%)")
+        args = parser.parse_args(sys.argv[2:])
+        regressions = compare(
+            json.loads(Path(args.base).read_text()), json.loads(Path(args.new).read_text()), args.threshold
+        )
+        sys.exit(1 if regressions else 0)
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", default="small", help="small (10k) | medium (1M) | large (10M) | nombre d'events")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", help="base peuplée à conserver et réutiliser")
+    parser.add_argument("--output", help="fichier JSON de résultats (sinon stdout)")
+    parser.add_argument("--only", nargs="+", choices=PHASES, default=list(PHASES))
+    parser.add_argument("--repeat", type=int, default=20, help="mesures par widget, dashboard et sync incrémentale")
+    parser.add_argument("--sync-events", type=int, default=2000, help="nouveaux events par tour d'ingestion")
+    parser.add_argument("--sync-rounds", type=int, default=3)
+    parser.add_argument("--incremental-events", type=int, default=20)
+    parser.add_argument("--clients", type=int, default=10, help="chargements de dashboard simultanés")
+    parser.add_argument("--loads", type=int, default=100, help="chargements de dashboard au total")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="latence simulée par appel à l'API GitHub")
+    args = parser.parse_args()
+
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        Path(args.output).write_text(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
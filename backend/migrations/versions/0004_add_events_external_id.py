@@ -0,0 +1,49 @@
+"""add events.external_id natural key
+
+Revision ID: 0004_add_events_external_id
+Revises: 0003_create_module_configs
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_add_events_external_id"
+down_revision = "0003_create_module_configs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("events") as batch_op:
+        batch_op.add_column(sa.Column("external_id", sa.String(length=255), nullable=True))
+
+    # Backfill depuis le payload : `eid` pour HPI, `id` pour les events de l'API GitHub.
+    op.execute(
+        """
+        UPDATE events
+        SET external_id = COALESCE(json_extract(metadata_json, '$.eid'), json_extract(metadata_json, '$.id'))
+        WHERE metadata_json IS NOT NULL
+        """
+    )
+
+    # Supprime les doublons accumulés par les anciennes syncs (on garde la première insertion).
+    op.execute(
+        """
+        DELETE FROM events
+        WHERE external_id IS NOT NULL
+          AND id NOT IN (
+            SELECT MIN(id) FROM events WHERE external_id IS NOT NULL GROUP BY module_id, external_id
+          )
+        """
+    )
+
+    op.create_index("ux_events_module_id_external_id", "events", ["module_id", "external_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ux_events_module_id_external_id", table_name="events")
+    with op.batch_alter_table("events") as batch_op:
+        batch_op.drop_column("external_id")
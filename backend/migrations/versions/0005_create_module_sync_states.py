@@ -0,0 +1,37 @@
+"""create module_sync_states table
+
+Revision ID: 0005_create_module_sync_states
+Revises: 0004_add_events_external_id
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_create_module_sync_states"
+down_revision = "0004_add_events_external_id"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "module_sync_states",
+        sa.Column("module_id", sa.String(length=100), primary_key=True),
+        sa.Column("source", sa.String(length=255), nullable=True),
+        sa.Column("etag", sa.String(length=255), nullable=True),
+        sa.Column("cursor_external_id", sa.String(length=255), nullable=True),
+        sa.Column("cursor_timestamp", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("module_sync_states")
@@ -0,0 +1,35 @@
+"""create github_repo_languages table
+
+Revision ID: 0006_create_github_repo_languages
+Revises: 0005_create_module_sync_states
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006_create_github_repo_languages"
+down_revision = "0005_create_module_sync_states"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "github_repo_languages",
+        sa.Column("repo_full_name", sa.String(length=255), primary_key=True),
+        sa.Column("pushed_at", sa.String(length=64), nullable=True),
+        sa.Column("languages_json", sa.JSON(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("github_repo_languages")
@@ -0,0 +1,40 @@
+"""create event_daily_rollups table (with backfill)
+
+Revision ID: 0007_create_event_daily_rollups
+Revises: 0006_create_github_repo_languages
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007_create_event_daily_rollups"
+down_revision = "0006_create_github_repo_languages"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "event_daily_rollups",
+        sa.Column("module_id", sa.String(length=100), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("event_type", sa.String(length=100), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+    )
+
+    # Backfill depuis l'historique existant (même calcul que `python -m synapsesync.core.rollups`).
+    op.execute(
+        """
+        INSERT INTO event_daily_rollups (module_id, day, event_type, count)
+        SELECT module_id, date(timestamp), event_type, COUNT(*)
+        FROM events
+        GROUP BY module_id, date(timestamp), event_type
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("event_daily_rollups")
@@ -0,0 +1,28 @@
+"""add ingest checkpoint columns to module_sync_states
+
+Revision ID: 0008_add_sync_state_checkpoint
+Revises: 0007_create_event_daily_rollups
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008_add_sync_state_checkpoint"
+down_revision = "0007_create_event_daily_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("module_sync_states") as batch_op:
+        batch_op.add_column(sa.Column("checkpoint_source", sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column("checkpoint_offset", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("module_sync_states") as batch_op:
+        batch_op.drop_column("checkpoint_offset")
+        batch_op.drop_column("checkpoint_source")
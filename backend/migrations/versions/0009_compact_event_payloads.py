@@ -0,0 +1,134 @@
+"""promote event fields to columns and compress raw payloads
+
+Revision ID: 0009_compact_event_payloads
+Revises: 0008_add_sync_state_checkpoint
+Create Date: 2026-10-18
+
+"""
+
+import json
+import zlib
+from urllib.parse import urlparse
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009_compact_event_payloads"
+down_revision = "0008_add_sync_state_checkpoint"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _repo_from_link(link):
+    if not link:
+        return None
+    url = urlparse(link)
+    parts = [p for p in url.path.split("/") if p]
+    if not url.netloc.endswith("github.com") or len(parts) < 2:
+        return None
+    return f"{parts[0]}/{parts[1]}"
+
+
+def _promoted(metadata):
+    """Mêmes règles que `GitHubModule.sync` (events de l'API GitHub, liens HPI)."""
+    if metadata.get("provider") == "hpi":
+        return {"repo_name": _repo_from_link(metadata.get("link")), "actor": None, "ref": None}
+    return {
+        "repo_name": (metadata.get("repo") or {}).get("name"),
+        "actor": (metadata.get("actor") or {}).get("login"),
+        "ref": (metadata.get("payload") or {}).get("ref"),
+    }
+
+
+def _iter_batches(bind, column):
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text(f"SELECT id, {column} FROM events WHERE id > :last_id AND {column} IS NOT NULL ORDER BY id LIMIT :n"),
+            {"last_id": last_id, "n": BATCH_SIZE},
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def _check_metadata_is_json(bind) -> None:
+    """Refuse de migrer (avant toute modification) si un `metadata_json` n'est pas du JSON valide."""
+    if bind.dialect.name != "sqlite":
+        # Ailleurs, le type JSON de la colonne garantit déjà la validité.
+        return
+    invalid = bind.execute(
+        sa.text("SELECT id FROM events WHERE metadata_json IS NOT NULL AND NOT json_valid(metadata_json) LIMIT 1")
+    ).scalar()
+    if invalid is not None:
+        raise RuntimeError(
+            f"events.metadata_json of event {invalid} is not valid JSON: fix or delete such rows before migrating"
+        )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    _check_metadata_is_json(bind)
+
+    with op.batch_alter_table("events") as batch_op:
+        batch_op.add_column(sa.Column("repo_name", sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column("actor", sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column("ref", sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column("payload", sa.LargeBinary(), nullable=True))
+
+    # Réécriture des lignes existantes : zlib (l'application détecte le codec à l'en-tête du blob).
+    # Toute valeur JSON est conservée dans `payload` ; seuls les objets alimentent les colonnes promues.
+    update = sa.text("UPDATE events SET repo_name = :repo_name, actor = :actor, ref = :ref, payload = :payload WHERE id = :id")
+    for rows in _iter_batches(bind, "metadata_json"):
+        params = []
+        for event_id, raw in rows:
+            metadata = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+            if metadata is None:
+                continue
+            payload = zlib.compress(json.dumps(metadata, separators=(",", ":"), ensure_ascii=False).encode("utf-8"), 6)
+            promoted = _promoted(metadata) if isinstance(metadata, dict) else {"repo_name": None, "actor": None, "ref": None}
+            params.append({"id": event_id, "payload": payload, **promoted})
+        if params:
+            bind.execute(update, params)
+
+    # Sur SQLite, batch_alter_table reconstruit la table : l'espace des anciens JSON est libéré au passage.
+    with op.batch_alter_table("events") as batch_op:
+        batch_op.drop_column("metadata_json")
+
+    op.create_index("ix_events_module_id_repo_name", "events", ["module_id", "repo_name"])
+    op.create_index("ix_events_module_id_actor", "events", ["module_id", "actor"])
+    op.create_index("ix_events_module_id_ref", "events", ["module_id", "ref"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_events_module_id_ref", table_name="events")
+    op.drop_index("ix_events_module_id_actor", table_name="events")
+    op.drop_index("ix_events_module_id_repo_name", table_name="events")
+
+    with op.batch_alter_table("events") as batch_op:
+        batch_op.add_column(sa.Column("metadata_json", sa.JSON(), nullable=True))
+
+    bind = op.get_bind()
+    update = sa.text("UPDATE events SET metadata_json = :metadata_json WHERE id = :id")
+    for rows in _iter_batches(bind, "payload"):
+        params = []
+        for event_id, blob in rows:
+            if blob[:4] == _ZSTD_MAGIC:
+                import zstandard
+
+                raw = zstandard.ZstdDecompressor().decompress(blob)
+            else:
+                raw = zlib.decompress(blob)
+            params.append({"id": event_id, "metadata_json": raw.decode("utf-8")})
+        bind.execute(update, params)
+
+    with op.batch_alter_table("events") as batch_op:
+        batch_op.drop_column("payload")
+        batch_op.drop_column("ref")
+        batch_op.drop_column("actor")
+        batch_op.drop_column("repo_name")
@@ -0,0 +1,95 @@
+"""create events_fts full-text index
+
+Revision ID: 0010_create_events_fts
+Revises: 0009_compact_event_payloads
+Create Date: 2026-10-18
+
+"""
+
+import json
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010_create_events_fts"
+down_revision = "0009_compact_event_payloads"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _decompress(blob):
+    if blob[:4] == _ZSTD_MAGIC:
+        import zstandard
+
+        return json.loads(zstandard.ZstdDecompressor().decompress(blob))
+    return json.loads(zlib.decompress(blob))
+
+
+def _search_body(module_id, metadata):
+    """Mêmes règles que `GitHubModule.search_body`."""
+    if module_id != "github" or not isinstance(metadata, dict):
+        return None
+    if metadata.get("provider") == "hpi":
+        return metadata.get("body")
+
+    payload = metadata.get("payload") or {}
+    parts = [c.get("message") for c in payload.get("commits") or []]
+    for key in ("issue", "pull_request", "comment", "review", "release"):
+        obj = payload.get(key) or {}
+        parts += [obj.get("title"), obj.get("name"), obj.get("body")]
+    parts.append(payload.get("description"))
+    return "\n".join(p for p in parts if isinstance(p, str) and p) or None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        # FTS5 est propre à SQLite : la recherche plein texte est désactivée sur les autres bases.
+        return
+
+    # Table FTS5 autonome (rowid = events.id) : le body vient du payload compressé, hors de portée d'un trigger.
+    op.execute(
+        "CREATE VIRTUAL TABLE events_fts USING fts5("
+        "summary_text, body, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "CREATE TRIGGER events_fts_delete AFTER DELETE ON events BEGIN "
+        "DELETE FROM events_fts WHERE rowid = old.id; "
+        "END"
+    )
+
+    insert = sa.text("INSERT INTO events_fts (rowid, summary_text, body) VALUES (:id, :summary_text, :body)")
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text("SELECT id, module_id, summary_text, payload FROM events WHERE id > :last_id ORDER BY id LIMIT :n"),
+            {"last_id": last_id, "n": BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            insert,
+            [
+                {
+                    "id": event_id,
+                    "summary_text": summary or "",
+                    "body": (_search_body(module_id, _decompress(payload)) if payload is not None else None) or "",
+                }
+                for event_id, module_id, summary, payload in rows
+            ],
+        )
+        last_id = rows[-1][0]
+
+    op.execute("INSERT INTO events_fts (events_fts) VALUES ('optimize')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute("DROP TRIGGER IF EXISTS events_fts_delete")
+    op.execute("DROP TABLE IF EXISTS events_fts")
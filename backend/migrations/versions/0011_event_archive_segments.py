@@ -0,0 +1,49 @@
+"""create event_archive_segments and enable incremental auto_vacuum
+
+Revision ID: 0011_event_archive_segments
+Revises: 0010_create_events_fts
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011_event_archive_segments"
+down_revision = "0010_create_events_fts"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "event_archive_segments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("module_id", sa.String(length=100), nullable=False),
+        sa.Column("path", sa.String(length=500), nullable=False, unique=True),
+        sa.Column("codec", sa.String(length=10), nullable=False),
+        sa.Column("event_count", sa.Integer(), nullable=False),
+        sa.Column("size_bytes", sa.Integer(), nullable=False),
+        sa.Column("min_timestamp", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("max_timestamp", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")),
+    )
+    op.create_index(
+        "ix_event_archive_segments_module_id_max_timestamp",
+        "event_archive_segments",
+        ["module_id", "max_timestamp"],
+    )
+
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite" and bind.exec_driver_sql("PRAGMA auto_vacuum").scalar() != 2:
+        # `auto_vacuum` ne change sur une base existante qu'après un VACUUM complet (hors transaction) :
+        # coût unique ici, ensuite `PRAGMA incremental_vacuum` rend les pages libres sans reconstruire la base.
+        with op.get_context().autocommit_block():
+            op.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            op.execute("VACUUM")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_event_archive_segments_module_id_max_timestamp", table_name="event_archive_segments")
+    op.drop_table("event_archive_segments")
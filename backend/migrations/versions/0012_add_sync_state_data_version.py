@@ -0,0 +1,26 @@
+"""add data_version to module_sync_states
+
+Revision ID: 0012_add_sync_state_data_version
+Revises: 0011_event_archive_segments
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0012_add_sync_state_data_version"
+down_revision = "0011_event_archive_segments"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("module_sync_states") as batch_op:
+        batch_op.add_column(sa.Column("data_version", sa.Integer(), nullable=False, server_default=sa.text("0")))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("module_sync_states") as batch_op:
+        batch_op.drop_column("data_version")
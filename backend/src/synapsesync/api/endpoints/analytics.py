@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query, Response
+
+from synapsesync.core.analytics import HAS_PYARROW, aggregate
+from synapsesync.core.discovery import registry
+from synapsesync.core.responses import FastJSONResponse
+from synapsesync.core.scheduler import sync_scheduler
+
+router = APIRouter()
+
+
+async def _ensure_available(module_id: str) -> None:
+    try:
+        await registry.load_module(module_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail="Unknown module") from e
+    if not HAS_PYARROW:
+        raise HTTPException(status_code=503, detail="Analytics requires the 'pyarrow' package")
+
+
+@router.get("/{module_id}/aggregate", response_model=None)
+async def aggregate_events(
+    module_id: str,
+    bucket: Literal["hour", "day", "week", "month", "year"] = "day",
+    group_by: list[str] | None = Query(default=None),
+    since: datetime | None = None,
+    until: datetime | None = None,
+    event_type: list[str] | None = Query(default=None),
+    timezone: str | None = None,
+    sum_field: str | None = Query(default=None, alias="sum"),
+) -> Response:
+    """Nombre d'events par tranche de temps (et par `group_by`), calculé sur l'export Arrow.
+
+    Ne lit pas SQLite : les events insérés depuis le dernier export (fin de sync) n'y figurent pas.
+    """
+    await _ensure_available(module_id)
+    try:
+        rows = await asyncio.to_thread(
+            aggregate,
+            module_id,
+            bucket=bucket,
+            group_by=group_by or (),
+            since=since,
+            until=until,
+            event_types=event_type,
+            timezone_name=timezone,
+            sum_field=sum_field,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return FastJSONResponse({"module_id": module_id, "bucket": bucket, "rows": rows})
+
+
+@router.post("/{module_id}/export")
+async def export_module_events(module_id: str, full: bool = False) -> dict:
+    """Exporte tout de suite les nouveaux events (`full` : réexport complet)."""
+    await _ensure_available(module_id)
+    return await sync_scheduler.run_analytics_export(module_id, full)
@@ -3,47 +3,85 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from synapsesync.core.database import SessionLocal
+from synapsesync.core.config import get_settings
+from synapsesync.core.data_version import LocalVersions
+from synapsesync.core.database import get_async_session
+from synapsesync.core.etag import etag_matches, make_etag, not_modified
 from synapsesync.core.models import Dashboard
 
 router = APIRouter()
 
+# Le client revalide à chaque lecture (ETag) : un dashboard modifié est visible immédiatement.
+DASHBOARD_CACHE_CONTROL = "private, no-cache"
+
+# `updated_at` connu de chaque dashboard : mis à jour à l'enregistrement, relu en base pour les autres workers.
+dashboard_versions = LocalVersions(revalidate_seconds=get_settings().version_revalidate_seconds)
+
 
 class DashboardPayload(BaseModel):
     config_json: dict[str, Any]
 
 
-@router.get("/{dashboard_id}")
-async def get_dashboard(dashboard_id: str) -> dict[str, Any]:
-    session = SessionLocal()
+def _dashboard_etag(dashboard_id: str, updated_at: datetime) -> str:
+    return make_etag("dashboard", dashboard_id, updated_at.isoformat())
+
+
+@router.get("/{dashboard_id}", response_model=None)
+async def get_dashboard(
+    dashboard_id: str,
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_async_session),
+) -> dict[str, Any] | Response:
+    """`If-None-Match` est vérifié sur le `updated_at` connu du process, à défaut sur la seule colonne
+    `updated_at`, sans charger `config_json`.
+    """
     try:
-        try:
-            row = session.execute(select(Dashboard).where(Dashboard.id == dashboard_id)).scalar_one_or_none()
-        except OperationalError as e:
-            if "no such table: dashboards" in str(e).lower():
-                raise HTTPException(
-                    status_code=503,
-                    detail="Database is missing dashboards table. Run: alembic upgrade head",
-                ) from e
-            raise
-        if row is None:
-            return {"id": dashboard_id, "config_json": {"widgets": []}}
-        return {"id": row.id, "config_json": row.config_json, "updated_at": row.updated_at.isoformat()}
-    finally:
-        session.close()
+        if request.headers.get("if-none-match"):
+            updated_at = dashboard_versions.get(dashboard_id)
+            if updated_at is None:
+                updated_at = (
+                    await session.execute(select(Dashboard.updated_at).where(Dashboard.id == dashboard_id))
+                ).scalar_one_or_none()
+                if updated_at is not None:
+                    updated_at = dashboard_versions.refresh(dashboard_id, updated_at)
+            if updated_at is not None:
+                etag = _dashboard_etag(dashboard_id, updated_at)
+                if etag_matches(request, etag):
+                    return not_modified(etag, DASHBOARD_CACHE_CONTROL)
+
+        row = (await session.execute(select(Dashboard).where(Dashboard.id == dashboard_id))).scalar_one_or_none()
+    except OperationalError as e:
+        if "no such table: dashboards" in str(e).lower():
+            raise HTTPException(
+                status_code=503,
+                detail="Database is missing dashboards table. Run: alembic upgrade head",
+            ) from e
+        raise
+    if row is None:
+        return {"id": dashboard_id, "config_json": {"widgets": []}}
+
+    dashboard_versions.refresh(row.id, row.updated_at)
+    response.headers["ETag"] = _dashboard_etag(row.id, row.updated_at)
+    response.headers["Cache-Control"] = DASHBOARD_CACHE_CONTROL
+    return {"id": row.id, "config_json": row.config_json, "updated_at": row.updated_at.isoformat()}
 
 
 @router.post("/{dashboard_id}")
-async def upsert_dashboard(dashboard_id: str, payload: DashboardPayload) -> dict[str, Any]:
-    session = SessionLocal()
+async def upsert_dashboard(
+    dashboard_id: str,
+    payload: DashboardPayload,
+    session: AsyncSession = Depends(get_async_session),
+) -> dict[str, Any]:
     try:
         try:
-            row = session.execute(select(Dashboard).where(Dashboard.id == dashboard_id)).scalar_one_or_none()
+            row = (await session.execute(select(Dashboard).where(Dashboard.id == dashboard_id))).scalar_one_or_none()
         except OperationalError as e:
             if "no such table: dashboards" in str(e).lower():
                 raise HTTPException(
@@ -58,10 +96,11 @@ async def upsert_dashboard(dashboard_id: str, payload: DashboardPayload) -> dict
             row.config_json = payload.config_json
             row.updated_at = datetime.now(tz=timezone.utc)
 
-        session.commit()
+        await session.commit()
+        # Valeur relue en base (défaut serveur, précision du stockage) : même ETag que celui de `GET`.
+        await session.refresh(row, ["updated_at"])
+        dashboard_versions.set(dashboard_id, row.updated_at)
         return {"status": "ok"}
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=400, detail=str(e)) from e
-    finally:
-        session.close()
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import html
+import json
+from datetime import datetime, timezone
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import and_, func, literal_column, or_, select, tuple_
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from synapsesync.core.archive import read_archived_events
+from synapsesync.core.config import get_settings
+from synapsesync.core.database import get_async_session
+from synapsesync.core.models import Event, EventArchiveSegment
+from synapsesync.core.payload import decompress_payload
+from synapsesync.core.responses import FastJSONResponse
+from synapsesync.core.search import events_fts, match_query
+
+router = APIRouter()
+
+MAX_LIMIT = 1000
+MAX_SEARCH_LIMIT = 100
+
+# Marqueurs de surlignage FTS5 : caractères de contrôle, remplacés par `<mark>` après échappement HTML.
+_HL_OPEN, _HL_CLOSE = "\x02", "\x03"
+
+# Colonnes renvoyées par défaut ; `metadata_json` (payload brut décompressé) seulement sur demande.
+PROJECTED_COLUMNS = (
+    Event.id,
+    Event.timestamp,
+    Event.module_id,
+    Event.event_type,
+    Event.summary_text,
+    Event.external_id,
+    Event.repo_name,
+    Event.actor,
+    Event.ref,
+)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Les timestamps sont stockés en UTC : une borne sans fuseau est interprétée en UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def encode_cursor(timestamp: datetime, event_id: int) -> str:
+    raw = json.dumps([_as_utc(timestamp).isoformat(), event_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ts, event_id = json.loads(raw)
+        return _as_utc(datetime.fromisoformat(ts)), int(event_id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
+def encode_search_cursor(rank: float | None, event_id: int, floor: int | None) -> str:
+    raw = json.dumps([rank, event_id, floor], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> tuple[float | None, int, int | None]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        rank, event_id, floor = json.loads(raw)
+        return (None if rank is None else float(rank)), int(event_id), (None if floor is None else int(floor))
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
+def _highlight_html(value: str | None) -> str:
+    """Texte surligné par FTS5 → HTML sûr (seules les balises `<mark>` ne sont pas échappées)."""
+    return html.escape(value or "").replace(_HL_OPEN, "<mark>").replace(_HL_CLOSE, "</mark>")
+
+
+@router.get("", response_model=None)
+async def list_events(
+    module_id: str | None = None,
+    event_type: list[str] | None = Query(default=None),
+    repo_name: str | None = None,
+    actor: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(default=100, ge=1, le=MAX_LIMIT),
+    order: Literal["desc", "asc"] = "desc",
+    include_metadata: bool = False,
+    include_archived: bool = False,
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
+    """Events filtrés sur `[since, until)`, paginés par curseur sur `(timestamp, id)`.
+
+    La page suivante repart de la dernière clé vue (pas d'OFFSET) : avec `module_id`, la requête reste
+    sur l'index `ix_events_module_id_timestamp` et une page profonde coûte autant que la première.
+    `include_archived` fusionne les events sortis par la rétention (segments d'archive) : ils gardent
+    leurs `id` et `timestamp`, le curseur reste donc valable d'une source à l'autre.
+    """
+    columns = PROJECTED_COLUMNS + ((Event.payload,) if include_metadata else ())
+    stmt = select(*columns)
+
+    if module_id is not None:
+        stmt = stmt.where(Event.module_id == module_id)
+    if event_type:
+        stmt = stmt.where(Event.event_type.in_(event_type))
+    if repo_name is not None:
+        stmt = stmt.where(Event.repo_name == repo_name)
+    if actor is not None:
+        stmt = stmt.where(Event.actor == actor)
+    if since is not None:
+        stmt = stmt.where(Event.timestamp >= _as_utc(since))
+    if until is not None:
+        stmt = stmt.where(Event.timestamp < _as_utc(until))
+
+    key = tuple_(Event.timestamp, Event.id)
+    cursor_key = decode_cursor(cursor) if cursor is not None else None
+    if cursor_key is not None:
+        stmt = stmt.where(key < tuple_(*cursor_key) if order == "desc" else key > tuple_(*cursor_key))
+
+    if order == "desc":
+        stmt = stmt.order_by(Event.timestamp.desc(), Event.id.desc())
+    else:
+        stmt = stmt.order_by(Event.timestamp.asc(), Event.id.asc())
+
+    # Une ligne de plus que demandé : indique s'il existe une page suivante.
+    rows = (await session.execute(stmt.limit(limit + 1))).all()
+
+    entries: list[tuple[tuple[datetime, int], dict[str, Any]]] = []
+    for row in rows:
+        item = row._asdict()
+        ts = _as_utc(row.timestamp)
+        item["timestamp"] = ts.isoformat()
+        if include_metadata:
+            item["metadata_json"] = decompress_payload(item.pop("payload"))
+        if include_archived:
+            item["archived"] = False
+        entries.append(((ts, row.id), item))
+
+    if include_archived:
+        archived = await _read_archive(
+            session,
+            module_id=module_id,
+            descending=order == "desc",
+            limit=limit + 1,
+            since=_as_utc(since) if since is not None else None,
+            until=_as_utc(until) if until is not None else None,
+            after=cursor_key,
+            event_types=event_type,
+            repo_name=repo_name,
+            actor=actor,
+        )
+        for record in archived:
+            if not include_metadata:
+                record.pop("metadata_json", None)
+            record["archived"] = True
+            entries.append(((_as_utc(datetime.fromisoformat(record["timestamp"])), record["id"]), record))
+        entries.sort(key=lambda entry: entry[0], reverse=order == "desc")
+
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    next_cursor = encode_cursor(*entries[-1][0]) if has_more else None
+    return FastJSONResponse({"items": [item for _, item in entries], "next_cursor": next_cursor})
+
+
+async def _read_archive(
+    session: AsyncSession,
+    *,
+    module_id: str | None,
+    descending: bool,
+    limit: int,
+    since: datetime | None,
+    until: datetime | None,
+    after: tuple[datetime, int] | None,
+    **filters: Any,
+) -> list[dict[str, Any]]:
+    """Events archivés de la page : manifeste filtré en SQL, segments lus dans un thread."""
+    stmt = select(EventArchiveSegment)
+    if module_id is not None:
+        stmt = stmt.where(EventArchiveSegment.module_id == module_id)
+    if since is not None:
+        stmt = stmt.where(EventArchiveSegment.max_timestamp >= since)
+    if until is not None:
+        stmt = stmt.where(EventArchiveSegment.min_timestamp < until)
+    if after is not None:
+        stmt = stmt.where(
+            EventArchiveSegment.min_timestamp <= after[0] if descending else EventArchiveSegment.max_timestamp >= after[0]
+        )
+    segments = (await session.execute(stmt)).scalars().all()
+    if not segments:
+        return []
+    return await asyncio.to_thread(
+        read_archived_events, segments, descending=descending, limit=limit, since=since, until=until, after=after, **filters
+    )
+
+
+@router.get("/search", response_model=None)
+async def search_events(
+    q: str = Query(min_length=1),
+    syntax: Literal["simple", "fts5"] = "simple",
+    module_id: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(default=20, ge=1, le=MAX_SEARCH_LIMIT),
+    order: Literal["relevance", "recent"] = "relevance",
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
+    """Recherche plein texte (`events_fts`) avec extraits surlignés, paginée par curseur.
+
+    `relevance` : tri BM25 (le `summary_text` pèse plus que le `body`). Le score se calcule sur toutes
+    les correspondances avant le tri ; pour un terme très fréquent, il est borné aux
+    `search_max_candidates` correspondances les plus récemment indexées (plancher de rowid, repris
+    dans le curseur). `recent` : ordre d'indexation décroissant, lu en flux sur l'index (sans score).
+    """
+    if session.get_bind().dialect.name != "sqlite":
+        raise HTTPException(status_code=501, detail="Full-text search requires SQLite (FTS5)")
+
+    expression = match_query(q, syntax)
+    if not expression:
+        return FastJSONResponse({"items": [], "next_cursor": None, "truncated": False})
+
+    fts = literal_column("events_fts")
+    rowid = events_fts.c.rowid
+    rank = func.bm25(fts, 2.0, 1.0)
+
+    def matching(*columns: Any) -> Any:
+        stmt = select(*columns).select_from(events_fts).join(Event, Event.id == rowid).where(fts.op("MATCH")(expression))
+        if module_id is not None:
+            stmt = stmt.where(Event.module_id == module_id)
+        if since is not None:
+            stmt = stmt.where(Event.timestamp >= _as_utc(since))
+        if until is not None:
+            stmt = stmt.where(Event.timestamp < _as_utc(until))
+        return stmt
+
+    stmt = matching(
+        *PROJECTED_COLUMNS,
+        rank.label("rank"),
+        func.highlight(fts, 0, _HL_OPEN, _HL_CLOSE).label("summary_html"),
+        func.snippet(fts, 1, _HL_OPEN, _HL_CLOSE, "…", 24).label("snippet_html"),
+    )
+    last_rank, last_id, floor = decode_search_cursor(cursor) if cursor is not None else (None, None, None)
+
+    try:
+        if order == "recent":
+            if last_id is not None:
+                stmt = stmt.where(rowid < last_id)
+            stmt = stmt.order_by(rowid.desc())
+        else:
+            max_candidates = get_settings().search_max_candidates
+            if cursor is None and max_candidates > 0:
+                # Rowid de la N-ième correspondance la plus récente : parcours de l'index en flux, sans score.
+                floor = (
+                    await session.execute(matching(rowid).order_by(rowid.desc()).limit(1).offset(max_candidates - 1))
+                ).scalar_one_or_none()
+            if floor is not None:
+                stmt = stmt.where(rowid >= floor)
+            if last_rank is not None:
+                # BM25 FTS5 : plus petit = plus pertinent.
+                stmt = stmt.where(or_(rank > last_rank, and_(rank == last_rank, Event.id > last_id)))
+            stmt = stmt.order_by(rank.asc(), Event.id.asc())
+
+        rows = (await session.execute(stmt.limit(limit + 1))).all()
+    except OperationalError as e:
+        # Saisie brute (`syntax=fts5`) : syntaxe invalide, guillemet non fermé, colonne inconnue...
+        if syntax == "fts5" and "no such table" not in str(e.orig):
+            raise HTTPException(status_code=400, detail="Invalid search query") from e
+        raise
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items: list[dict[str, Any]] = []
+    for row in rows:
+        item = row._asdict()
+        item["timestamp"] = _as_utc(row.timestamp).isoformat()
+        item["score"] = round(-item.pop("rank"), 4)
+        item["highlight"] = {
+            "summary_text": _highlight_html(item.pop("summary_html")),
+            "body": _highlight_html(item.pop("snippet_html")) or None,
+        }
+        items.append(item)
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_search_cursor(None if order == "recent" else last.rank, last.id, floor)
+    return FastJSONResponse({"items": items, "next_cursor": next_cursor, "truncated": floor is not None})
@@ -1,78 +1,153 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timezone
 from typing import Any
 
-import httpx
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from synapsesync.core.database import SessionLocal
+from synapsesync.core.archive import retention_cutoff
+from synapsesync.core.cache import widget_cache
+from synapsesync.core.data_version import bump_data_version
+from synapsesync.core.database import get_async_session
 from synapsesync.core.discovery import registry
-from synapsesync.core.models import ModuleConfig
+from synapsesync.core.http import get_http_client
+from synapsesync.core.ingest import ingest_progress
+from synapsesync.core.models import EventArchiveSegment, ModuleConfig
+from synapsesync.core.module_config import module_config_cache
+from synapsesync.core.profiler import current_session
+from synapsesync.core.scheduler import sync_scheduler
 
 router = APIRouter()
 
 
 @router.get("")
 async def list_modules() -> list[dict]:
-    modules = registry.load_modules()
     return [
         {
             "id": m.id,
             "widgets": [w.model_dump() for w in m.get_widgets()],
         }
-        for m in modules.values()
+        for m in await registry.load_all()
     ]
 
 
-@router.post("/{module_id}/sync")
-async def sync_module(module_id: str) -> dict:
-    try:
-        module = registry.get_module(module_id)
-    except KeyError as e:
-        raise HTTPException(status_code=404, detail="Unknown module") from e
-
-    try:
-        await module.sync()
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e)) from e
-    return {"status": "ok"}
+@router.post("/{module_id}/sync", status_code=202)
+async def sync_module(module_id: str) -> dict[str, Any]:
+    await _ensure_module_exists(module_id)
+    # La sync tourne en tâche de fond : suivi via GET /{module_id}/sync/jobs/{job_id}.
+    # Requête profilée (`X-Profile-Token`) : la sync elle-même l'est aussi, sous son propre profil.
+    job = sync_scheduler.enqueue(module_id, profile=current_session() is not None)
+    if job.profile_id is not None:
+        return {"status": job.status, "job_id": job.id, "profile_id": job.profile_id}
+    return {"status": job.status, "job_id": job.id}
+
+
+@router.get("/{module_id}/sync/jobs")
+async def list_sync_jobs(module_id: str) -> dict[str, Any]:
+    await _ensure_module_exists(module_id)
+    next_run = sync_scheduler.next_run_time(module_id)
+    return {
+        "module_id": module_id,
+        "interval_seconds": sync_scheduler.interval_for(module_id),
+        "next_run_at": next_run.isoformat() if next_run else None,
+        "jobs": [j.as_dict() for j in sync_scheduler.list_jobs(module_id)],
+    }
+
+
+@router.get("/{module_id}/sync/jobs/{job_id}")
+async def get_sync_job(module_id: str, job_id: str) -> dict[str, Any]:
+    job = sync_scheduler.get_job(job_id)
+    if job is None or job.module_id != module_id:
+        raise HTTPException(status_code=404, detail="Unknown sync job")
+    return job.as_dict()
+
+
+@router.get("/{module_id}/sync/progress")
+async def get_sync_progress(module_id: str) -> dict[str, Any]:
+    await _ensure_module_exists(module_id)
+    progress = ingest_progress.get(module_id)
+    if progress is None:
+        return {"module_id": module_id, "status": "idle"}
+    return progress.as_dict()
+
+
+@router.get("/{module_id}/archive")
+async def get_module_archive(module_id: str, session: AsyncSession = Depends(get_async_session)) -> dict[str, Any]:
+    await _ensure_module_exists(module_id)
+    config = await module_config_cache.get(module_id)
+    cutoff = retention_cutoff(config)
+    segments = (
+        await session.execute(
+            select(EventArchiveSegment)
+            .where(EventArchiveSegment.module_id == module_id)
+            .order_by(EventArchiveSegment.min_timestamp)
+        )
+    ).scalars().all()
+    return {
+        "module_id": module_id,
+        "retention_days": config.get("retention_days"),
+        "cutoff": cutoff.isoformat() if cutoff else None,
+        "archived_events": sum(s.event_count for s in segments),
+        "archived_bytes": sum(s.size_bytes for s in segments),
+        "segments": [
+            {
+                "path": s.path,
+                "codec": s.codec,
+                "event_count": s.event_count,
+                "size_bytes": s.size_bytes,
+                "min_timestamp": s.min_timestamp.isoformat(),
+                "max_timestamp": s.max_timestamp.isoformat(),
+            }
+            for s in segments
+        ],
+    }
+
+
+@router.post("/{module_id}/archive")
+async def archive_module_events(module_id: str) -> dict[str, Any]:
+    """Applique tout de suite la rétention du module (sinon : passe périodique du scheduler)."""
+    await _ensure_module_exists(module_id)
+    return await sync_scheduler.run_retention(module_id)
 
 
 class ModuleConfigPayload(BaseModel):
     config_json: dict[str, Any]
 
 
-def _ensure_module_exists(module_id: str) -> None:
+async def _ensure_module_exists(module_id: str) -> None:
     try:
-        registry.get_module(module_id)
+        await registry.load_module(module_id)
     except KeyError as e:
         raise HTTPException(status_code=404, detail="Unknown module") from e
 
 
-def _get_stored_config(module_id: str) -> dict[str, Any] | None:
-    session = SessionLocal()
+async def _get_stored_config(session: AsyncSession, module_id: str) -> dict[str, Any] | None:
     try:
-        try:
-            row = session.execute(select(ModuleConfig).where(ModuleConfig.module_id == module_id)).scalar_one_or_none()
-        except OperationalError as e:
-            if "no such table: module_configs" in str(e).lower():
-                raise HTTPException(
-                    status_code=503,
-                    detail="Database is missing module_configs table. Run: alembic upgrade head",
-                ) from e
-            raise
-        return None if row is None else row.config_json
-    finally:
-        session.close()
+        row = (
+            await session.execute(select(ModuleConfig).where(ModuleConfig.module_id == module_id))
+        ).scalar_one_or_none()
+    except OperationalError as e:
+        if "no such table: module_configs" in str(e).lower():
+            raise HTTPException(
+                status_code=503,
+                detail="Database is missing module_configs table. Run: alembic upgrade head",
+            ) from e
+        raise
+    return None if row is None else row.config_json
 
 
 def _validate_module_config(module_id: str, config_json: dict[str, Any]) -> None:
+    retention_days = config_json.get("retention_days")
+    if retention_days is not None and (
+        isinstance(retention_days, bool) or not isinstance(retention_days, (int, float)) or retention_days <= 0
+    ):
+        raise HTTPException(status_code=400, detail="retention_days must be a positive number of days")
+
     if module_id == "github":
         provider = (config_json.get("provider") or "api").strip().lower()
         if provider not in {"api", "hpi"}:
@@ -90,23 +165,28 @@ def _validate_module_config(module_id: str, config_json: dict[str, Any]) -> None
 
 
 @router.get("/{module_id}/config")
-async def get_module_config(module_id: str) -> dict[str, Any]:
-    _ensure_module_exists(module_id)
-    config_json = _get_stored_config(module_id)
+async def get_module_config(module_id: str, session: AsyncSession = Depends(get_async_session)) -> dict[str, Any]:
+    await _ensure_module_exists(module_id)
+    config_json = await _get_stored_config(session, module_id)
     if config_json is None:
         return {"module_id": module_id, "config_json": {}}
     return {"module_id": module_id, "config_json": config_json}
 
 
 @router.post("/{module_id}/config")
-async def upsert_module_config(module_id: str, payload: ModuleConfigPayload) -> dict[str, Any]:
-    _ensure_module_exists(module_id)
+async def upsert_module_config(
+    module_id: str,
+    payload: ModuleConfigPayload,
+    session: AsyncSession = Depends(get_async_session),
+) -> dict[str, Any]:
+    await _ensure_module_exists(module_id)
     _validate_module_config(module_id, payload.config_json)
 
-    session = SessionLocal()
     try:
         try:
-            row = session.execute(select(ModuleConfig).where(ModuleConfig.module_id == module_id)).scalar_one_or_none()
+            row = (
+                await session.execute(select(ModuleConfig).where(ModuleConfig.module_id == module_id))
+            ).scalar_one_or_none()
         except OperationalError as e:
             if "no such table: module_configs" in str(e).lower():
                 raise HTTPException(
@@ -121,42 +201,44 @@ async def upsert_module_config(module_id: str, payload: ModuleConfigPayload) ->
         else:
             row.config_json = payload.config_json
             row.updated_at = datetime.now(tz=timezone.utc)
+        # La config change ce que calculent les widgets : ETags et cache de tous les workers.
+        await session.run_sync(bump_data_version, module_id)
 
-        session.commit()
+        await session.commit()
+        module_config_cache.invalidate(module_id)
+        widget_cache.invalidate_module(module_id)
         return {"status": "ok"}
     except HTTPException:
-        session.rollback()
+        await session.rollback()
         raise
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=400, detail=str(e)) from e
-    finally:
-        session.close()
 
 
 @router.post("/{module_id}/test")
-async def test_module_config(module_id: str, payload: ModuleConfigPayload | None = None) -> dict[str, Any]:
-    _ensure_module_exists(module_id)
-    config_json = payload.config_json if payload is not None else (_get_stored_config(module_id) or {})
+async def test_module_config(
+    module_id: str,
+    payload: ModuleConfigPayload | None = None,
+    session: AsyncSession = Depends(get_async_session),
+) -> dict[str, Any]:
+    await _ensure_module_exists(module_id)
+    config_json = payload.config_json if payload is not None else (await _get_stored_config(session, module_id) or {})
     _validate_module_config(module_id, config_json)
 
     if module_id == "github":
         provider = (config_json.get("provider") or "api").strip().lower()
         if provider == "hpi":
+            from synapsesync.modules.github.module import load_hpi_events
+
             try:
-                from my.github.all import get_events  # type: ignore
-            except Exception as e:
-                # More specific error message for missing dependencies
-                if "No module named 'ghexport'" in str(e):
-                    raise HTTPException(status_code=400, detail="HPI GitHub module requires 'ghexport'. Install it or switch to provider=api.") from e
-                elif "my.config" in str(e):
-                    raise HTTPException(status_code=400, detail="HPI not configured. Run 'hpi config create' or switch to provider=api.") from e
-                else:
-                    raise HTTPException(status_code=400, detail=f"HPI import failed: {e}. Install HPI or switch to provider=api.") from e
+                # Import du provider HPI et lecture de ses exports : hors de l'event loop.
+                get_events = await asyncio.to_thread(load_hpi_events)
+            except RuntimeError as e:
+                raise HTTPException(status_code=400, detail=str(e)) from e
 
             try:
-                it = iter(get_events())
-                first = next(it, None)
+                first = await asyncio.to_thread(lambda: next(iter(get_events()), None))
                 if first is None:
                     return {"status": "ok"}
                 if isinstance(first, Exception):
@@ -178,10 +260,9 @@ async def test_module_config(module_id: str, payload: ModuleConfigPayload | None
         else:
             url = f"https://api.github.com/users/{username}"
 
-        async with httpx.AsyncClient(timeout=20) as client:
-            resp = await client.get(url, headers=headers)
-            if resp.status_code >= 400:
-                raise HTTPException(status_code=400, detail=resp.text)
-            return {"status": "ok"}
+        resp = await get_http_client().get(url, headers=headers, timeout=20)
+        if resp.status_code >= 400:
+            raise HTTPException(status_code=400, detail=resp.text)
+        return {"status": "ok"}
 
     raise HTTPException(status_code=400, detail="No test implemented for this module")
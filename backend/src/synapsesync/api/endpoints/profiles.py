@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from synapsesync.core.config import get_settings
+from synapsesync.core.profiler import check_token, list_profiles, load_profile
+
+
+def require_profiler_token(
+    x_profile_token: str | None = Header(default=None),
+    token: str | None = Query(default=None, alias="_profile"),
+) -> None:
+    if not get_settings().profiler_token:
+        raise HTTPException(status_code=404, detail="Profiler is disabled")
+    if not check_token(x_profile_token if x_profile_token is not None else token):
+        raise HTTPException(status_code=403, detail="Invalid profiler token")
+
+
+router = APIRouter(dependencies=[Depends(require_profiler_token)])
+
+
+@router.get("")
+async def get_profiles() -> list[dict[str, Any]]:
+    return await asyncio.to_thread(list_profiles)
+
+
+@router.get("/{profile_id}")
+async def get_profile(profile_id: str) -> dict[str, Any]:
+    profile = await asyncio.to_thread(load_profile, profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Unknown profile")
+    return profile
+
+
+@router.get("/{profile_id}/folded", response_class=PlainTextResponse)
+async def get_profile_folded(profile_id: str) -> PlainTextResponse:
+    """Piles repliées (`frame;frame;… count`), à passer à `flamegraph.pl` ou à ouvrir dans speedscope."""
+    folded = await asyncio.to_thread(load_profile, profile_id, True)
+    if folded is None:
+        raise HTTPException(status_code=404, detail="Unknown profile")
+    return PlainTextResponse(folded)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import json
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+
+from synapsesync.core.config import get_settings
+from synapsesync.core.notifications import Notification, notification_bus
+
+router = APIRouter()
+
+
+def _format(notification: Notification) -> str:
+    return f"id: {notification.id}\nevent: {notification.event}\ndata: {json.dumps(notification.data)}\n\n"
+
+
+@router.get("")
+async def stream_notifications(
+    request: Request,
+    module_id: list[str] | None = Query(default=None),
+) -> StreamingResponse:
+    """Flux SSE des notifications `module_synced` (tous les modules, ou ceux de `module_id`)."""
+    settings = get_settings()
+    sub = notification_bus.subscribe(module_ids=module_id)
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            # `retry` : délai de reconnexion de l'EventSource ; `ready` : le client (re)charge tout.
+            yield f"retry: {int(settings.sse_retry_ms)}\nevent: ready\ndata: {{}}\n\n"
+            while not await request.is_disconnected():
+                if sub.dropped:
+                    # Client trop lent : notifications perdues, il doit tout recharger à la reconnexion.
+                    yield "event: dropped\ndata: {}\n\n"
+                    return
+                notification = await sub.next(timeout=settings.sse_heartbeat_seconds)
+                # Commentaire SSE : garde la connexion ouverte derrière les proxys.
+                yield ": ping\n\n" if notification is None else _format(notification)
+        finally:
+            notification_bus.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stats")
+async def get_stream_stats() -> dict[str, int]:
+    return notification_bus.stats()
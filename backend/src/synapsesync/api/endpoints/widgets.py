@@ -1,30 +1,213 @@
+import asyncio
+import time
+from collections.abc import Mapping
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import BaseModel, Field
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from synapsesync.core.cache import make_key, widget_cache
+from synapsesync.core.config import get_settings
+from synapsesync.core.data_version import get_data_versions
+from synapsesync.core.database import get_async_session
 from synapsesync.core.discovery import registry
+from synapsesync.core.etag import etag_matches, make_etag, not_modified
+from synapsesync.core.metrics import widget_compute_duration
+from synapsesync.core.models import Dashboard
+from synapsesync.core.responses import FastJSONResponse
+from synapsesync.modules.common.interfaces import BaseModule, WidgetData
 
 router = APIRouter()
 
+RESERVED_PARAMS = frozenset({"dashboard_id"})
+
 
 @router.get("/widgets")
 async def list_widgets() -> list[dict[str, Any]]:
-    modules = registry.load_modules()
-
     widgets: list[dict[str, Any]] = []
-    for module in modules.values():
+    for module in await registry.load_all():
         for w in module.get_widgets():
             widgets.append({"module_id": module.id, **w.model_dump()})
 
     return widgets
 
 
-@router.get("/widget-data/{module_id}/{widget_id}")
-async def get_widget_data(module_id: str, widget_id: str) -> dict[str, Any]:
+async def _get_dashboard_config(session: AsyncSession, dashboard_id: str) -> dict[str, Any] | None:
+    try:
+        return (
+            await session.execute(select(Dashboard.config_json).where(Dashboard.id == dashboard_id))
+        ).scalar_one_or_none()
+    except OperationalError:
+        return None
+
+
+async def _get_dashboard_timezone(session: AsyncSession, dashboard_id: str) -> str | None:
+    return ((await _get_dashboard_config(session, dashboard_id)) or {}).get("timezone")
+
+
+def _module_params(params: Mapping[str, Any]) -> dict[str, Any]:
+    """Paramètres transmis au module : sans les paramètres réservés (`dashboard_id`) ni ceux préfixés
+    par `_` (jeton `_profile` du profileur, cache-busters), qui ne doivent changer ni la clé de cache ni l'ETag.
+    """
+    return {k: v for k, v in params.items() if k not in RESERVED_PARAMS and not k.startswith("_")}
+
+
+def _widget_ttl(module: BaseModule, widget_id: str) -> float:
+    ttl = next((w.cache_ttl for w in module.get_widgets() if w.id == widget_id), None)
+    return widget_cache.default_ttl if ttl is None else ttl
+
+
+def _widget_etag(module_id: str, widget_id: str, params: dict[str, Any], data_version: int, ttl: float) -> str | None:
+    """Version des données d'un widget : `data_version` du module (en base, bumpée par sync/config/rétention)
+    + tranche de TTL. Identique d'un worker et d'un redémarrage à l'autre.
+
+    La tranche de TTL couvre les données qui évoluent sans sync (jour courant, appels sortants).
+    """
+    if ttl <= 0:
+        return None
+    bucket = int(time.time() // ttl)
+    return make_etag(*make_key(module_id, widget_id, params, data_version), bucket)
+
+
+async def _resolve_widget_data(
+    module_id: str, widget_id: str, params: dict[str, Any], data_version: int
+) -> tuple[WidgetData, bool]:
+    """Données d'un widget via le cache ; renvoie `(data, cached)`.
+
+    `data_version` est lue avant le calcul : si une sync commit entre-temps, le résultat est rangé sous
+    l'ancienne version et la requête suivante recalcule. Lève `KeyError` (module inconnu) ou
+    `ValueError` (paramètres invalides).
+    """
+    module = await registry.load_module(module_id)
+
+    key = make_key(module_id, widget_id, params, data_version)
+    data = widget_cache.get(key)
+    if data is not None:
+        return data, True
+
+    start = time.perf_counter()
+    data = await module.get_widget_data(widget_id=widget_id, params=params)
+    widget_compute_duration.observe(time.perf_counter() - start, module_id, widget_id)
+    widget_cache.set(key, data, _widget_ttl(module, widget_id))
+    return data, False
+
+
+@router.get("/widget-data/{module_id}/{widget_id}", response_model=None)
+async def get_widget_data(
+    module_id: str,
+    widget_id: str,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
+    """Les query params sont transmis au module (hors `_*`) ; `dashboard_id` apporte le fuseau du dashboard.
+
+    Un `If-None-Match` égal à la version courante renvoie `304` sans calculer le widget.
+    """
     try:
-        module = registry.get_module(module_id)
+        module = await registry.load_module(module_id)
     except KeyError as e:
         raise HTTPException(status_code=404, detail="Unknown module") from e
 
-    data = await module.get_widget_data(widget_id=widget_id, params={})
-    return data.model_dump()
+    params = _module_params(request.query_params)
+    dashboard_id = request.query_params.get("dashboard_id")
+    if dashboard_id and "timezone" not in params:
+        timezone = await _get_dashboard_timezone(session, dashboard_id)
+        if timezone:
+            params["timezone"] = timezone
+
+    # ETag calculé avant le calcul : si une sync termine entre-temps, la requête suivante repart en 200.
+    data_version = (await get_data_versions(session, [module_id]))[module_id]
+    etag = _widget_etag(module_id, widget_id, params, data_version, _widget_ttl(module, widget_id))
+    # `no-cache` : le navigateur garde la réponse mais revalide à chaque poll (304 si rien n'a changé).
+    cache_control = "private, no-cache" if etag is not None else "no-store"
+    if etag is not None and etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+
+    try:
+        data, _ = await _resolve_widget_data(module_id, widget_id, params, data_version)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    headers = {"Cache-Control": cache_control}
+    if etag is not None:
+        headers["ETag"] = etag
+    # Réponse construite ici : pas de passage par `jsonable_encoder` (timelines volumineuses).
+    return FastJSONResponse(data.model_dump(), headers=headers)
+
+
+class WidgetDataRequest(BaseModel):
+    module_id: str
+    widget_id: str
+    params: dict[str, Any] = Field(default_factory=dict)
+
+
+class WidgetDataBatchPayload(BaseModel):
+    # Sans `widgets`, ce sont ceux du dashboard `dashboard_id` qui sont résolus.
+    widgets: list[WidgetDataRequest] | None = None
+    dashboard_id: str | None = None
+
+
+async def _resolve_batch_entry(
+    entry: WidgetDataRequest, data_version: int, semaphore: asyncio.Semaphore
+) -> dict[str, Any]:
+    result: dict[str, Any] = {"module_id": entry.module_id, "widget_id": entry.widget_id}
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            data, cached = await _resolve_widget_data(entry.module_id, entry.widget_id, entry.params, data_version)
+            result.update(status="ok", cached=cached, **data.model_dump())
+        except KeyError:
+            result.update(status="error", status_code=404, error="Unknown module")
+        except ValueError as e:
+            result.update(status="error", status_code=400, error=str(e))
+        except Exception as e:
+            # Un widget en échec ne fait pas échouer le reste du dashboard.
+            result.update(status="error", status_code=500, error=str(e) or type(e).__name__)
+        result["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+@router.post("/widget-data/batch", response_model=None)
+async def get_widget_data_batch(
+    payload: WidgetDataBatchPayload,
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
+    """Résout plusieurs widgets en parallèle (au plus `widget_batch_concurrency` à la fois).
+
+    Chaque résultat porte son propre statut : la réponse est `200` même si certains widgets échouent.
+    """
+    start = time.perf_counter()
+
+    dashboard_config: dict[str, Any] = {}
+    if payload.dashboard_id:
+        dashboard_config = (await _get_dashboard_config(session, payload.dashboard_id)) or {}
+        if payload.widgets is None and not dashboard_config:
+            raise HTTPException(status_code=404, detail="Dashboard not found")
+
+    if payload.widgets is not None:
+        entries = payload.widgets
+    elif payload.dashboard_id:
+        entries = [WidgetDataRequest.model_validate(w) for w in dashboard_config.get("widgets") or []]
+    else:
+        raise HTTPException(status_code=400, detail="Either widgets or dashboard_id is required")
+
+    timezone = dashboard_config.get("timezone")
+    for entry in entries:
+        entry.params = _module_params(entry.params)
+        if timezone:
+            entry.params.setdefault("timezone", timezone)
+
+    versions = await get_data_versions(session, (entry.module_id for entry in entries))
+    semaphore = asyncio.Semaphore(max(1, get_settings().widget_batch_concurrency))
+    results = await asyncio.gather(
+        *(_resolve_batch_entry(entry, versions[entry.module_id], semaphore) for entry in entries)
+    )
+    return FastJSONResponse({"results": list(results), "duration_ms": round((time.perf_counter() - start) * 1000, 2)})
+
+
+@router.get("/widgets/cache-stats")
+async def get_widget_cache_stats() -> dict[str, Any]:
+    return widget_cache.stats()
@@ -1,9 +1,13 @@
 from fastapi import APIRouter
 
-from synapsesync.api.endpoints import dashboards, modules, widgets
+from synapsesync.api.endpoints import analytics, dashboards, events, modules, profiles, stream, widgets
 
 api_router = APIRouter()
 
 api_router.include_router(modules.router, prefix="/modules", tags=["modules"])
 api_router.include_router(widgets.router, tags=["widgets"])
 api_router.include_router(dashboards.router, prefix="/dashboards", tags=["dashboards"])
+api_router.include_router(events.router, prefix="/events", tags=["events"])
+api_router.include_router(stream.router, prefix="/stream", tags=["stream"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(profiles.router, prefix="/profiles", tags=["profiles"])
@@ -0,0 +1,477 @@
+"""Export analytique colonnaire des événements (Arrow IPC, lu en mémoire mappée) et agrégations vectorisées.
+
+Dépendance optionnelle : `pyarrow` (extra `analytics`). Disposition sur disque, sous `analytics_dir`
+(défaut : dossier `analytics/` à côté de la base SQLite) :
+
+    <module_id>/_state.json                      # dernier `events.id` exporté + champs du module
+    <module_id>/<YYYY-MM>/<premier_id>-<dernier_id>.arrow
+
+L'export est incrémental (events d'`id` supérieur au dernier exporté) et append-only : chaque passe
+ajoute un fragment par mois touché, fusionnés au-delà de `analytics_max_fragments`. Les events sortis
+de `events` par la rétention restent dans l'export. Les fragments ne sont pas compressés : ils sont
+lus par `memory_map`, sans copie ni désérialisation.
+
+    python -m synapsesync.core.analytics [--module github] [--full]
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import logging
+import shutil
+from collections.abc import Mapping, Sequence
+from datetime import date, datetime, timezone, tzinfo
+from datetime import time as time_of_day
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import select
+
+from synapsesync.core.config import data_dir, get_settings
+from synapsesync.core.database import SessionLocal
+from synapsesync.core.discovery import import_optional
+from synapsesync.core.models import Event
+from synapsesync.core.payload import decompress_payload
+from synapsesync.core.timeutils import is_utc, resolve_timezone, utc_offset_periods
+
+# Dépendance optionnelle (extra `analytics`), importée au premier export ou à la première requête
+# (`_require_pyarrow`) : l'import de pyarrow ne pèse pas sur le démarrage des workers.
+pa: Any = None
+pc: Any = None
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+logger = logging.getLogger(__name__)
+
+# Colonnes projetées de `events` ; `module_id` est donné par le dossier.
+BASE_COLUMNS = ("id", "timestamp", "event_type", "repo_name", "actor", "ref", "external_id")
+GROUP_COLUMNS = ("event_type", "repo_name", "actor", "ref")
+BUCKETS = ("hour", "day", "week", "month", "year")
+FIELD_TYPES = ("string", "int64", "float64", "bool")
+
+_STATE_FILE = "_state.json"
+
+# Tables des fragments lus : `{chemin: (mtime, table)}` (mémoire mappée, pas de copie).
+_mapped: dict[Path, tuple[float, Any]] = {}
+
+
+class AnalyticsUnavailable(RuntimeError):
+    pass
+
+
+def _require_pyarrow() -> None:
+    global pa, pc
+    if pc is not None:
+        return
+    try:
+        if not HAS_PYARROW:
+            raise ImportError("No module named 'pyarrow'")
+        pa = import_optional("pyarrow")
+        pc = import_optional("pyarrow.compute")
+    except ImportError as e:
+        raise AnalyticsUnavailable("Analytics requires the 'pyarrow' package (pip install 'synapsesync[analytics]')") from e
+
+
+def analytics_dir() -> Path:
+    settings = get_settings()
+    return Path(settings.analytics_dir) if settings.analytics_dir else data_dir() / "analytics"
+
+
+def module_fields(module_id: str) -> dict[str, tuple[str, str]]:
+    """Champs de `metadata_json` exportés en colonnes : `{colonne: (chemin.pointé, type)}`.
+
+    Déclarés par le module (`analytics_fields`), comme `search_body` pour la recherche.
+    """
+    from synapsesync.core.discovery import registry
+
+    try:
+        module = registry.get_module(module_id)
+    except KeyError:
+        return {}
+    fields = dict(getattr(module, "analytics_fields", None) or {})
+    for name, (_, type_name) in fields.items():
+        if name in BASE_COLUMNS or name == "bucket" or type_name not in FIELD_TYPES:
+            raise ValueError(f"Invalid analytics field {name!r} ({type_name})")
+    return fields
+
+
+def _schema(fields: Mapping[str, tuple[str, str]]) -> Any:
+    # Colonnes de regroupement encodées en dictionnaire : fichiers plus petits, `group_by` sur des entiers.
+    category = pa.dictionary(pa.int32(), pa.string())
+    columns = [
+        ("id", pa.int64()),
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("event_type", category),
+        ("repo_name", category),
+        ("actor", category),
+        ("ref", category),
+        ("external_id", pa.string()),
+    ]
+    columns += [
+        (name, category if type_name == "string" else getattr(pa, type_name)()) for name, (_, type_name) in fields.items()
+    ]
+    return pa.schema(columns)
+
+
+def _extract(metadata: Mapping[str, Any] | None, path: str, type_name: str) -> Any:
+    value: Any = metadata
+    for key in path.split("."):
+        if not isinstance(value, Mapping):
+            return None
+        value = value.get(key)
+    if value is None:
+        return None
+    try:
+        if type_name == "int64":
+            return int(value)
+        if type_name == "float64":
+            return float(value)
+        if type_name == "bool":
+            return bool(value)
+    except (TypeError, ValueError):
+        return None
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+# --- Fichiers ---------------------------------------------------------------------------------
+
+
+def _fragment_range(path: Path) -> tuple[int, int]:
+    first, last = path.name[: -len(".arrow")].split("-")
+    return int(first), int(last)
+
+
+def _write_ipc(path: Path, table: Any) -> None:
+    partial_path = path.with_name(path.name + ".part")
+    with pa.OSFile(str(partial_path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    partial_path.replace(path)
+
+
+def _split_fragments(month_dir: Path, last_event_id: int) -> tuple[list[Path], list[Path]]:
+    """Fragments d'un mois : `(valides triés, restes)`.
+
+    Restes d'une passe interrompue : fragments au-delà de `last_event_id` (état non enregistré) et
+    fragments couverts par un fragment fusionné (compaction interrompue avant leur suppression).
+    """
+    live: list[Path] = []
+    leftovers: list[Path] = []
+    # Tri par début croissant puis fin décroissante : un fragment fusionné précède ceux qu'il couvre.
+    for path in sorted(month_dir.glob("*.arrow"), key=lambda p: (_fragment_range(p)[0], -_fragment_range(p)[1])):
+        first, last = _fragment_range(path)
+        if first > last_event_id or (live and last <= _fragment_range(live[-1])[1]):
+            leftovers.append(path)
+        else:
+            live.append(path)
+    return live, leftovers
+
+
+def _clean_month(month_dir: Path, last_event_id: int) -> list[Path]:
+    """Supprime les restes (dont les `.part`) et retourne les fragments valides."""
+    live, leftovers = _split_fragments(month_dir, last_event_id)
+    for path in [*leftovers, *month_dir.glob("*.part")]:
+        _mapped.pop(path, None)
+        path.unlink(missing_ok=True)
+    return live
+
+
+def _load_state(root: Path) -> dict[str, Any] | None:
+    try:
+        return json.loads((root / _STATE_FILE).read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _save_state(root: Path, state: dict[str, Any]) -> None:
+    partial_path = root / (_STATE_FILE + ".part")
+    partial_path.write_text(json.dumps(state))
+    partial_path.replace(root / _STATE_FILE)
+
+
+def _read_fragment(path: Path) -> Any:
+    """Table d'un fragment, en mémoire mappée (mise en cache tant que le fichier ne change pas)."""
+    mtime = path.stat().st_mtime
+    cached = _mapped.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all())
+        _mapped[path] = cached
+    return cached[1]
+
+
+# --- Export -----------------------------------------------------------------------------------
+
+
+def _compact(month_dir: Path, schema: Any, last_event_id: int) -> None:
+    fragments = _clean_month(month_dir, last_event_id)
+    if len(fragments) <= get_settings().analytics_max_fragments:
+        return
+    table = pa.concat_tables([_read_fragment(p) for p in fragments]).unify_dictionaries().combine_chunks()
+    first, last = _fragment_range(fragments[0])[0], _fragment_range(fragments[-1])[1]
+    _write_ipc(month_dir / f"{first}-{last}.arrow", table.cast(schema))
+    for path in fragments:
+        _mapped.pop(path, None)
+        path.unlink(missing_ok=True)
+
+
+def export_events(module_id: str, full: bool = False) -> dict[str, Any]:
+    """Exporte les events de `module_id` non encore exportés. Bloquant (thread ou CLI)."""
+    _require_pyarrow()
+    settings = get_settings()
+    fields = module_fields(module_id)
+    spec = {name: list(value) for name, value in fields.items()}
+    schema = _schema(fields)
+
+    root = analytics_dir() / module_id
+    state = _load_state(root)
+    if full or state is None or state.get("fields") != spec:
+        # Premier export, ou champs du module modifiés : réexport complet.
+        shutil.rmtree(root, ignore_errors=True)
+        state = {"last_event_id": 0, "fields": spec}
+    root.mkdir(parents=True, exist_ok=True)
+    for month_dir in (p for p in root.iterdir() if p.is_dir()):
+        _clean_month(month_dir, state["last_event_id"])
+
+    columns = [getattr(Event, c) for c in BASE_COLUMNS] + ([Event.payload] if fields else [])
+    stmt = (
+        select(*columns)
+        .where(Event.module_id == module_id)
+        .where(Event.id > state["last_event_id"])
+        .order_by(Event.id)
+        .execution_options(yield_per=10000)
+    )
+
+    buffers: dict[str, dict[str, list[Any]]] = {}
+    touched: set[str] = set()
+    pending = exported = 0
+    last_id = state["last_event_id"]
+
+    def flush() -> None:
+        nonlocal pending
+        for month, data in buffers.items():
+            month_dir = root / month
+            month_dir.mkdir(exist_ok=True)
+            _write_ipc(month_dir / f"{min(data['id'])}-{max(data['id'])}.arrow", pa.table(data, schema=schema))
+            touched.add(month)
+        buffers.clear()
+        # L'état n'avance qu'une fois tous les fragments de la passe écrits (cf. `_split_fragments`).
+        state["last_event_id"] = last_id
+        _save_state(root, state)
+        pending = 0
+
+    with SessionLocal() as session:
+        for row in session.execute(stmt):
+            ts = _as_utc(row.timestamp)
+            data = buffers.setdefault(f"{ts:%Y-%m}", {name: [] for name in schema.names})
+            for name in BASE_COLUMNS:
+                data[name].append(ts if name == "timestamp" else getattr(row, name))
+            if fields:
+                metadata = decompress_payload(row.payload)
+                for name, (path, type_name) in fields.items():
+                    data[name].append(_extract(metadata, path, type_name))
+            last_id = row.id
+            pending += 1
+            exported += 1
+            if pending >= settings.analytics_export_batch_rows:
+                flush()
+    if pending:
+        flush()
+
+    for month in touched:
+        _compact(root / month, schema, state["last_event_id"])
+    if exported:
+        logger.info("Exported %d events of %s to %s", exported, module_id, root)
+    return {"module_id": module_id, "exported": exported, "months": sorted(touched), "last_event_id": state["last_event_id"]}
+
+
+# --- Lecture et agrégations -------------------------------------------------------------------
+
+
+def _read_month(month_dir: Path, last_event_id: int) -> list[Any]:
+    # Lecture seule : une compaction concurrente peut laisser un instant fragments fusionnés et d'origine
+    # (écartés par `_split_fragments`), puis supprimer ceux-ci entre le listage et la lecture (relisté).
+    for attempt in range(3):
+        live, _ = _split_fragments(month_dir, last_event_id)
+        try:
+            return [_read_fragment(p) for p in live]
+        except FileNotFoundError:
+            if attempt == 2:
+                raise
+    return []
+
+
+def load_events(module_id: str, since: datetime | None = None, until: datetime | None = None) -> Any:
+    """Table Arrow des events exportés de `module_id` (mois recoupant `[since, until)`, non filtrée)."""
+    _require_pyarrow()
+    root = analytics_dir() / module_id
+    state = _load_state(root)
+    schema = _schema(module_fields(module_id))
+    if state is None:
+        return schema.empty_table()
+
+    first_month = f"{_as_utc(since):%Y-%m}" if since is not None else None
+    last_month = f"{_as_utc(until):%Y-%m}" if until is not None else None
+    tables = []
+    for month_dir in sorted(p for p in root.iterdir() if p.is_dir()):
+        if first_month is not None and month_dir.name < first_month:
+            continue
+        if last_month is not None and month_dir.name > last_month:
+            continue
+        tables += _read_month(month_dir, state["last_event_id"])
+    if not tables:
+        return schema.empty_table()
+    # Un dictionnaire par fragment : unifiés (sans recopier les indices) pour les `group_by`.
+    return pa.concat_tables(tables).unify_dictionaries()
+
+
+_US_PER_HOUR = 3_600_000_000
+_US_PER_DAY = 24 * _US_PER_HOUR
+
+
+@lru_cache(maxsize=64)
+def _offset_periods(tz: tzinfo, first_day: date, last_day: date) -> tuple[tuple[int | None, int], ...]:
+    """`utc_offset_periods` sur des jours entiers, en microsecondes : `((fin_us_exclusive, offset_us), ...)`."""
+    start = datetime.combine(first_day, time_of_day.min, tzinfo=timezone.utc)
+    end = datetime.combine(last_day, time_of_day.max, tzinfo=timezone.utc)
+    return tuple(
+        (None if until is None else int(until.timestamp()) * 1_000_000, offset * 60_000_000)
+        for until, offset in utc_offset_periods(tz, start, end)
+    )
+
+
+def _utc_offsets(timestamps: Any, tz: tzinfo) -> Any:
+    """Offset UTC (µs) de `tz` à chaque timestamp, changements d'heure compris (scalaire si constant)."""
+    values = timestamps.cast(pa.int64())
+    if is_utc(tz) or len(values) == 0:
+        return pa.scalar(0, pa.int64())
+    bounds = pc.min_max(values).as_py()
+    periods = _offset_periods(
+        tz,
+        datetime.fromtimestamp(bounds["min"] // 1_000_000, tz=timezone.utc).date(),
+        datetime.fromtimestamp(bounds["max"] // 1_000_000, tz=timezone.utc).date(),
+    )
+    offsets: Any = pa.scalar(periods[-1][1], pa.int64())
+    for until, offset in reversed(periods[:-1]):
+        offsets = pc.if_else(pc.less(values, until), offset, offsets)
+    return offsets
+
+
+def _bucket_label(value: Any, bucket: str, tz: tzinfo) -> str | None:
+    if value is None:
+        return None
+    if bucket == "hour":
+        return datetime.fromtimestamp(value / 1_000_000, tz=tz).isoformat()
+    return value.isoformat()
+
+
+def aggregate(
+    module_id: str,
+    *,
+    bucket: str = "day",
+    group_by: Sequence[str] = (),
+    since: datetime | None = None,
+    until: datetime | None = None,
+    event_types: Sequence[str] | None = None,
+    timezone_name: str | None = None,
+    sum_field: str | None = None,
+) -> list[dict[str, Any]]:
+    """Nombre d'events (et somme optionnelle d'un champ numérique) par tranche de temps et clés.
+
+    Tranches calculées dans le fuseau demandé (`day`, `week` = lundi, `month`...) ; résultat trié par
+    tranche puis clés. Appelable depuis un widget (dans un thread : le calcul est bloquant).
+
+    Le regroupement se fait sur des entiers (heure ou jour local par division des microsecondes, clés
+    dictionnaire) ; semaines, mois et années sont déduits ensuite des quelques milliers de jours obtenus.
+    """
+    _require_pyarrow()
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of {', '.join(BUCKETS)}")
+    fields = module_fields(module_id)
+    allowed = set(GROUP_COLUMNS) | {name for name, (_, type_name) in fields.items() if type_name in ("string", "bool")}
+    unknown = [key for key in group_by if key not in allowed]
+    if unknown:
+        raise ValueError(f"Cannot group by {', '.join(unknown)}")
+    if sum_field is not None and fields.get(sum_field, ("", ""))[1] not in ("int64", "float64"):
+        raise ValueError(f"Cannot sum {sum_field}")
+    tz = resolve_timezone(timezone_name)
+    group_by = list(dict.fromkeys(group_by))
+
+    table = load_events(module_id, since, until)
+    ts_type = pa.timestamp("us", tz="UTC")
+    conditions = []
+    if since is not None:
+        conditions.append(pc.greater_equal(table["timestamp"], pa.scalar(_as_utc(since), type=ts_type)))
+    if until is not None:
+        conditions.append(pc.less(table["timestamp"], pa.scalar(_as_utc(until), type=ts_type)))
+    if event_types:
+        conditions.append(pc.is_in(table["event_type"], value_set=pa.array(list(event_types), type=pa.string())))
+    if conditions:
+        mask = conditions[0]
+        for condition in conditions[1:]:
+            mask = pc.and_(mask, condition)
+        table = table.filter(mask)
+
+    offsets = _utc_offsets(table["timestamp"], tz)
+    local = pc.add(table["timestamp"].cast(pa.int64()), offsets)
+    if bucket == "hour":
+        # Début de l'heure locale, ramené en UTC : l'heure répétée au passage à l'heure d'hiver reste distincte.
+        keys = pc.subtract(pc.multiply(pc.divide(local, _US_PER_HOUR), _US_PER_HOUR), offsets)
+    else:
+        keys = pc.divide(local, _US_PER_DAY).cast(pa.int32()).cast(pa.date32())
+    data = {"bucket": keys}
+    data.update({key: table[key] for key in group_by})
+    aggregations: list[tuple[Any, str]] = [([], "count_all")]
+    if sum_field is not None:
+        data[sum_field] = table[sum_field]
+        aggregations.append((sum_field, "sum"))
+
+    names = ["bucket", *group_by]
+    result = _group(pa.table(data), names, aggregations)
+    if bucket in ("week", "month", "year"):
+        # Agrégats journaliers (petite table) repliés sur la tranche demandée.
+        rolled = pc.floor_temporal(result["bucket"], multiple=1, unit=bucket, week_starts_monday=True)
+        result = result.set_column(0, "bucket", rolled)
+        result = _group(result, names, [(name, "sum") for name in result.column_names[len(names) :]])
+    for index, field in enumerate(result.schema):
+        if pa.types.is_dictionary(field.type):
+            result = result.set_column(index, field.name, result[field.name].cast(field.type.value_type))
+    result = result.sort_by([(name, "ascending") for name in names])
+
+    rows = []
+    for row in result.to_pylist():
+        item = {"bucket": _bucket_label(row["bucket"], bucket, tz), **{key: row[key] for key in group_by}, "count": row["count"]}
+        if sum_field is not None:
+            item[f"sum_{sum_field}"] = row["sum"]
+        rows.append(item)
+    return rows
+
+
+def _group(table: Any, names: list[str], aggregations: list[tuple[Any, str]]) -> Any:
+    """`group_by` → colonnes `names` puis `count` (et `sum`), quel que soit l'ordre de sortie d'Arrow."""
+    result = table.group_by(names, use_threads=False).aggregate(aggregations)
+    produced = [function if not column else f"{column}_{function}" for column, function in aggregations]
+    return result.select([*names, *produced]).rename_columns([*names, *("count", "sum")[: len(produced)]])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Exporte les events au format Arrow (analytics_dir).")
+    parser.add_argument("--module", default=None, help="module_id à exporter (défaut : tous)")
+    parser.add_argument("--full", action="store_true", help="réexport complet")
+    args = parser.parse_args()
+
+    from synapsesync.core.discovery import registry
+
+    module_ids = [args.module] if args.module else list(registry.load_modules())
+    for module_id in module_ids:
+        print(json.dumps(export_events(module_id, full=args.full)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""Rétention des événements : archivage en segments compressés puis suppression de la table `events`.
+
+Pour chaque module dont la config définit `retention_days`, les events plus anciens que la fenêtre
+sont écrits dans des segments JSONL append-only (zstd si `zstandard` est installé, sinon gzip) sous
+`archive_dir`, référencés dans `event_archive_segments`, puis supprimés de `events` (et de `events_fts`
+par trigger). Les agrégats `event_daily_rollups` sont conservés. L'espace libéré est rendu au système
+de fichiers par `PRAGMA incremental_vacuum`.
+
+Passe manuelle (sinon : toutes les `retention_interval_seconds`, cf. `core/scheduler.py`) :
+
+    python -m synapsesync.core.archive [--module github] [--no-vacuum]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import io
+import json
+import logging
+import os
+import uuid
+from collections.abc import Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import IO, Any
+
+from sqlalchemy import delete, select
+
+from synapsesync.core.config import data_dir, get_settings
+from synapsesync.core.data_version import bump_data_version
+from synapsesync.core.database import SessionLocal, get_engine, iter_batches, retry_on_locked_sync
+from synapsesync.core.models import Event, EventArchiveSegment, ModuleConfig
+from synapsesync.core.payload import decompress_payload
+from synapsesync.core.responses import json_dumps
+
+try:
+    import zstandard
+except ImportError:  # dépendance optionnelle (extra `fast`) : segments gzip
+    zstandard = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# Colonnes écrites dans les segments (+ `metadata_json`, payload décompressé : le segment se suffit à lui-même).
+ARCHIVED_COLUMNS = ("id", "timestamp", "module_id", "event_type", "summary_text", "external_id", "repo_name", "actor", "ref")
+
+_DELETE_BATCH = 1000
+
+
+def archive_dir() -> Path:
+    settings = get_settings()
+    return Path(settings.archive_dir) if settings.archive_dir else data_dir() / "archive"
+
+
+def retention_cutoff(config: Mapping[str, Any], now: datetime | None = None) -> datetime | None:
+    """Date avant laquelle les events du module sont archivés (`None` : pas de rétention)."""
+    days = config.get("retention_days")
+    if not days:
+        return None
+    return (now or datetime.now(tz=timezone.utc)) - timedelta(days=float(days))
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite restitue des datetimes naïfs, déjà en UTC.
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _codec() -> str:
+    return "zstd" if zstandard is not None else "gzip"
+
+
+@contextmanager
+def _open_segment_writer(path: Path, codec: str) -> Iterator[IO[bytes]]:
+    level = get_settings().payload_compression_level
+    with open(path, "wb") as fh:
+        if codec == "zstd":
+            with zstandard.ZstdCompressor(level=level).stream_writer(fh, closefd=False) as writer:
+                yield writer
+        else:
+            with gzip.GzipFile(fileobj=fh, mode="wb", compresslevel=level) as writer:
+                yield writer
+        fh.flush()
+        os.fsync(fh.fileno())
+
+
+def iter_segment(path: Path, codec: str) -> Iterator[dict[str, Any]]:
+    """Events d'un segment, dans l'ordre d'écriture `(timestamp, id)` croissant."""
+    with open(path, "rb") as fh:
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError("Archive segment is zstd-compressed but 'zstandard' is not installed")
+            stream: IO[bytes] = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(fh))
+        else:
+            stream = gzip.GzipFile(fileobj=fh, mode="rb")
+        with stream:
+            for line in stream:
+                yield json.loads(line)
+
+
+def _record(row: Any) -> dict[str, Any]:
+    record = {key: getattr(row, key) for key in ARCHIVED_COLUMNS}
+    record["timestamp"] = _as_utc(row.timestamp).isoformat()
+    record["metadata_json"] = decompress_payload(row.payload)
+    return record
+
+
+@dataclass
+class ArchiveResult:
+    events: int = 0
+    segments: int = 0
+    bytes: int = 0
+
+
+def _write_segment(module_id: str, rows: Sequence[Any]) -> EventArchiveSegment:
+    """Écrit le segment (fichier temporaire puis renommage atomique) et retourne sa ligne de manifeste."""
+    codec = _codec()
+    first, last = _as_utc(rows[0].timestamp), _as_utc(rows[-1].timestamp)
+    relative = Path(module_id) / f"{first:%Y%m%d}-{last:%Y%m%d}-{uuid.uuid4().hex[:8]}.jsonl.{'zst' if codec == 'zstd' else 'gz'}"
+    path = archive_dir() / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    partial_path = path.with_name(path.name + ".part")
+    with _open_segment_writer(partial_path, codec) as writer:
+        for row in rows:
+            writer.write(json_dumps(_record(row)) + b"\n")
+    partial_path.replace(path)
+
+    return EventArchiveSegment(
+        module_id=module_id,
+        path=relative.as_posix(),
+        codec=codec,
+        event_count=len(rows),
+        size_bytes=path.stat().st_size,
+        min_timestamp=first,
+        max_timestamp=last,
+        created_at=datetime.now(tz=timezone.utc),
+    )
+
+
+def _commit_segment(segment: EventArchiveSegment, event_ids: Sequence[int]) -> None:
+    with SessionLocal() as session:
+        session.add(segment)
+        for batch in iter_batches(event_ids, _DELETE_BATCH):
+            session.execute(delete(Event).where(Event.id.in_(batch)))
+        bump_data_version(session, segment.module_id)
+        session.commit()
+
+
+def archive_module(module_id: str, cutoff: datetime, segment_size: int | None = None) -> ArchiveResult:
+    """Archive les events de `module_id` antérieurs à `cutoff`, par segments de `segment_size` events.
+
+    Chaque segment est écrit sur disque avant la transaction qui l'enregistre et supprime ses events :
+    un crash entre les deux laisse au pire un fichier orphelin (ignoré, absent du manifeste), jamais
+    d'events perdus.
+    """
+    size = segment_size or get_settings().archive_segment_max_events
+    result = ArchiveResult()
+    while True:
+        with SessionLocal() as session:
+            rows = session.execute(
+                select(*(getattr(Event, c) for c in ARCHIVED_COLUMNS), Event.payload)
+                .where(Event.module_id == module_id)
+                .where(Event.timestamp < cutoff)
+                .order_by(Event.timestamp.asc(), Event.id.asc())
+                .limit(size)
+            ).all()
+        if not rows:
+            return result
+
+        segment = _write_segment(module_id, rows)
+        try:
+            retry_on_locked_sync(partial(_commit_segment, segment, [row.id for row in rows]))
+        except Exception:
+            (archive_dir() / segment.path).unlink(missing_ok=True)
+            raise
+        result.events += segment.event_count
+        result.segments += 1
+        result.bytes += segment.size_bytes
+        logger.info("Archived %d events of %s into %s", segment.event_count, module_id, segment.path)
+
+
+def incremental_vacuum() -> int:
+    """Rend les pages libres au système de fichiers (SQLite en `auto_vacuum = INCREMENTAL`) ; retourne leur nombre."""
+    engine = get_engine()
+    if engine.dialect.name != "sqlite":
+        return 0
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        if cursor.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            logger.warning("SQLite auto_vacuum is not INCREMENTAL: run 'alembic upgrade head' to enable it")
+            return 0
+        free_pages = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+        cursor.close()
+        # Une page libérée par étape : `execute` s'arrêterait à la première, `executescript` va jusqu'au bout.
+        connection.driver_connection.executescript("PRAGMA incremental_vacuum;")
+        return int(free_pages)
+    finally:
+        connection.close()
+
+
+def run_retention(module_id: str | None = None, vacuum: bool = True) -> dict[str, Any]:
+    """Applique `retention_days` de chaque module configuré (ou du seul `module_id`)."""
+    with SessionLocal() as session:
+        stmt = select(ModuleConfig.module_id, ModuleConfig.config_json)
+        if module_id is not None:
+            stmt = stmt.where(ModuleConfig.module_id == module_id)
+        configs = session.execute(stmt).all()
+
+    modules: dict[str, dict[str, int]] = {}
+    for config_module_id, config_json in configs:
+        cutoff = retention_cutoff(config_json or {})
+        if cutoff is None:
+            continue
+        result = archive_module(config_module_id, cutoff)
+        modules[config_module_id] = {"events": result.events, "segments": result.segments, "bytes": result.bytes}
+
+    archived = sum(r["events"] for r in modules.values())
+    freed_pages = incremental_vacuum() if vacuum and archived else 0
+    return {"modules": modules, "archived_events": archived, "freed_pages": freed_pages}
+
+
+def _segment_overlaps(segment: Any, since: datetime | None, until: datetime | None) -> bool:
+    if since is not None and _as_utc(segment.max_timestamp) < since:
+        return False
+    if until is not None and _as_utc(segment.min_timestamp) >= until:
+        return False
+    return True
+
+
+@lru_cache(maxsize=256)
+def _segment_timestamps(path: str, codec: str, event_type: str) -> tuple[datetime, ...]:
+    """Timestamps UTC des events `event_type` d'un segment (un segment référencé n'est plus réécrit)."""
+    return tuple(
+        _as_utc(datetime.fromisoformat(record["timestamp"]))
+        for record in iter_segment(archive_dir() / path, codec)
+        if record["event_type"] == event_type
+    )
+
+
+def archived_local_dates(segments: Sequence[Any], event_type: str, tz: tzinfo, since: datetime) -> set[date]:
+    """Dates locales (dans `tz`) des events `event_type` archivés depuis `since`.
+
+    Les agrégats journaliers sont en jours UTC : hors UTC, les jours locaux d'une période archivée
+    viennent des segments. Les timestamps d'un segment sont gardés en mémoire après la première lecture.
+    """
+    return {
+        ts.astimezone(tz).date()
+        for segment in segments
+        if _segment_overlaps(segment, since, None)
+        for ts in _segment_timestamps(segment.path, segment.codec, event_type)
+        if ts >= since
+    }
+
+
+def read_archived_events(
+    segments: Sequence[Any],
+    *,
+    descending: bool,
+    limit: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after: tuple[datetime, int] | None = None,
+    event_types: Sequence[str] | None = None,
+    repo_name: str | None = None,
+    actor: str | None = None,
+) -> list[dict[str, Any]]:
+    """Les `limit` premiers events archivés selon `(timestamp, id)` (décroissant si `descending`).
+
+    `segments` (lignes du manifeste) sont lus dans l'ordre du tri, du plus proche au plus lointain ;
+    la lecture s'arrête dès qu'un segment ne peut plus rien apporter au `limit` déjà atteint.
+    `after` : clé du curseur, les events retenus sont strictement au-delà dans le sens du tri.
+    """
+    ordered = sorted(
+        (s for s in segments if _segment_overlaps(s, since, until)),
+        key=lambda s: _as_utc(s.max_timestamp if descending else s.min_timestamp),
+        reverse=descending,
+    )
+    wanted_types = set(event_types) if event_types else None
+    found: list[tuple[tuple[datetime, int], dict[str, Any]]] = []
+
+    for segment in ordered:
+        if len(found) >= limit:
+            boundary = found[limit - 1][0][0]
+            edge = _as_utc(segment.max_timestamp if descending else segment.min_timestamp)
+            if (edge < boundary) if descending else (edge > boundary):
+                break
+
+        for record in iter_segment(archive_dir() / segment.path, segment.codec):
+            ts = _as_utc(datetime.fromisoformat(record["timestamp"]))
+            key = (ts, record["id"])
+            if since is not None and ts < since or until is not None and ts >= until:
+                continue
+            if after is not None and ((key >= after) if descending else (key <= after)):
+                continue
+            if wanted_types is not None and record["event_type"] not in wanted_types:
+                continue
+            if repo_name is not None and record.get("repo_name") != repo_name:
+                continue
+            if actor is not None and record.get("actor") != actor:
+                continue
+            found.append((key, record))
+
+        found.sort(key=lambda item: item[0], reverse=descending)
+        del found[limit:]
+
+    return [record for _, record in found]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Archive les events hors fenêtre de rétention (retention_days).")
+    parser.add_argument("--module", default=None, help="module_id à traiter (défaut : tous)")
+    parser.add_argument("--no-vacuum", action="store_true", help="ne pas lancer PRAGMA incremental_vacuum")
+    args = parser.parse_args()
+
+    print(json.dumps(run_retention(args.module, vacuum=not args.no_vacuum), indent=2))
+
+
+if __name__ == "__main__":
+    main()
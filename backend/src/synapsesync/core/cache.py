@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from synapsesync.core.config import get_settings
+from synapsesync.modules.common.interfaces import WidgetData
+
+CacheKey = tuple[str, str, str, int]
+
+
+@dataclass
+class _Entry:
+    value: WidgetData
+    expires_at: float
+
+
+def make_key(module_id: str, widget_id: str, params: dict[str, Any], data_version: int) -> CacheKey:
+    """Clé d'un widget ; `data_version` (cf. `core/data_version.py`) périme les entrées des autres workers."""
+    return module_id, widget_id, json.dumps(params, sort_keys=True, default=str), data_version
+
+
+class WidgetDataCache:
+    """Cache LRU borné des `WidgetData`, avec TTL par entrée et invalidation par module."""
+
+    def __init__(self, max_entries: int, default_ttl: float) -> None:
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: CacheKey) -> WidgetData | None:
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def set(self, key: CacheKey, value: WidgetData, ttl: float | None = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+
+        self._entries[key] = _Entry(value=value, expires_at=time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate_module(self, module_id: str) -> int:
+        """Libère les entrées du module ; sa `data_version` a déjà changé, elles ne seraient plus lues."""
+        keys = [k for k in self._entries if k[0] == module_id]
+        for k in keys:
+            del self._entries[k]
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+_settings = get_settings()
+widget_cache = WidgetDataCache(
+    max_entries=_settings.widget_cache_max_entries,
+    default_ttl=_settings.widget_cache_default_ttl,
+)
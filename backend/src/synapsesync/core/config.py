@@ -13,10 +13,106 @@ class Settings(BaseSettings):
     )
 
     database_url: str = "sqlite:///../data/synapsesync.db"
+
+    # Profil SQLite appliqué à chaque connexion (WAL : les lectures ne sont plus bloquées par la sync).
+    sqlite_tuned: bool = True
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kib: int = 65536
+    sqlite_mmap_size: int = 268435456
+    sqlite_temp_store: str = "MEMORY"
+
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    # Nouvelles tentatives des écritures de sync sur `database is locked` (backoff exponentiel).
+    db_lock_retries: int = 3
+    db_lock_retry_backoff: float = 0.05
     cors_origins: list[str] = Field(default_factory=lambda: ["http://localhost:5173", "http://127.0.0.1:5173"])
 
     github_username: str | None = None
     github_token: str | None = None
+    github_events_per_page: int = 100
+    github_events_max_pages: int = 10
+    github_repos_max_pages: int = 10
+    github_languages_concurrency: int = 8
+
+    sync_batch_size: int = 500
+    # Syncs en tâche de fond (`core/scheduler.py`). Intervalle <= 0 : pas de sync périodique.
+    scheduler_enabled: bool = True
+    sync_interval_seconds: float = 3600.0
+    # Surcharges par module, ex: SYNAPSESYNC_SYNC_INTERVALS='{"github": 900}'.
+    sync_intervals: dict[str, float] = {}
+    sync_jitter_seconds: float = 60.0
+    sync_max_concurrency: int = 2
+    sync_job_history: int = 200
+
+    # Payload brut des events (`events.payload`) : auto = zstd si `zstandard` est installé, sinon zlib.
+    payload_codec: str = "auto"
+    payload_compression_level: int = 6
+
+    # Taille des chunks commités (et du checkpoint de reprise) de l'import HPI en streaming.
+    ingest_chunk_size: int = 5000
+    # Rétention (`retention_days` dans la config d'un module) : segments d'archive sous `archive_dir`
+    # (défaut : dossier `archive/` à côté de la base SQLite), passe périodique toutes les N secondes (0 = jamais).
+    archive_dir: str | None = None
+    archive_segment_max_events: int = 50000
+    retention_interval_seconds: float = 86400.0
+    # Export analytique Arrow (extra `analytics`, `core/analytics.py`) : mis à jour après chaque sync
+    # qui insère des events ; fragments d'un mois fusionnés au-delà de `analytics_max_fragments`.
+    analytics_enabled: bool = True
+    analytics_dir: str | None = None
+    analytics_max_fragments: int = 16
+    analytics_export_batch_rows: int = 500000
+    # Recherche plein texte : score BM25 calculé sur les N correspondances les plus récentes au plus (0 = toutes).
+    search_max_candidates: int = 20000
+    # Fuseau par défaut des widgets calendaires (surchargé par `timezone` dans la config du dashboard).
+    default_timezone: str = "UTC"
+
+    # Préchargement en tâche de fond au démarrage : modules (import, hook `warm_up()`, `core/discovery.py`)
+    # et routes FastAPI. Désactivé, chacun est préparé à sa première utilisation.
+    startup_warmup_enabled: bool = True
+
+    # Fréquence max. de revérification de `module_configs.updated_at` (écritures d'autres workers).
+    module_config_revalidate_seconds: float = 5.0
+    # Fréquence max. de relecture en base des versions servant aux ETags (`data_version` des modules,
+    # `updated_at` des dashboards) : les écritures locales sont vues tout de suite, celles d'autres workers
+    # après ce délai au plus.
+    version_revalidate_seconds: float = 1.0
+
+    widget_cache_max_entries: int = 512
+    widget_cache_default_ttl: float = 300.0
+    # Widgets résolus en parallèle par `POST /api/widget-data/batch`.
+    widget_batch_concurrency: int = 8
+
+    # Notifications SSE (`GET /api/stream`) : file par client, au-delà le client est déconnecté.
+    sse_queue_size: int = 64
+    sse_heartbeat_seconds: float = 15.0
+    sse_retry_ms: int = 3000
+
+    # Compression des réponses (brotli si `brotli-asgi` est installé, sinon gzip) au-delà du seuil.
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    gzip_compresslevel: int = 6
+    brotli_quality: int = 4
+
+    # `GET /metrics` (format texte Prometheus) et instrumentation des routes, du SQL et des appels sortants.
+    metrics_enabled: bool = True
+    metrics_sql_enabled: bool = True
+
+    # Profilage à la demande (`core/profiler.py`) : inactif sans jeton ; une requête portant
+    # `X-Profile-Token` (ou `?_profile=`) égal au jeton est échantillonnée et son profil enregistré.
+    profiler_token: str | None = None
+    profiler_dir: str | None = None
+    profiler_interval_ms: float = 2.0
+    profiler_max_profiles: int = 50
+
+    http_http2: bool = True
+    http_timeout: float = 30.0
+    http_connect_timeout: float = 10.0
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry: float = 30.0
 
     def model_post_init(self, __context) -> None:
         if self.database_url.startswith("sqlite:///") and self.database_url != "sqlite:///:memory:":
@@ -29,3 +125,11 @@ class Settings(BaseSettings):
 @lru_cache
 def get_settings() -> Settings:
     return Settings()
+
+
+def data_dir() -> Path:
+    """Dossier des données locales (archives, exports) : celui de la base SQLite, sinon `data/`."""
+    database_url = get_settings().database_url
+    if database_url.startswith("sqlite:///") and database_url != "sqlite:///:memory:":
+        return Path(database_url[len("sqlite:///") :]).parent
+    return Path("data")
@@ -0,0 +1,121 @@
+"""Version des données d'un module (`module_sync_states.data_version`), partagée par tous les workers.
+
+Incrémentée dans la transaction qui modifie ce que lisent les widgets du module : insertion d'events
+(`ingest_events`), enregistrement de la config, archivage par la rétention. L'ETag et la clé de cache
+d'un widget en dérivent : un worker qui n'a pas vu la sync sert quand même des données à jour.
+
+Chaque process garde aussi la dernière version connue (`data_versions`) : mise à jour au commit d'un
+`bump_data_version` local, relue en base au plus toutes les `SYNAPSESYNC_VERSION_REVALIDATE_SECONDS`
+pour les écritures des autres workers. Un poll en `304` ne fait alors aucune requête.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import event, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from synapsesync.core.config import get_settings
+from synapsesync.core.database import dialect_insert
+from synapsesync.core.models import ModuleSyncState
+
+# Versions bumpées par la transaction en cours, publiées dans `data_versions` à son commit.
+_PENDING_KEY = "synapsesync_pending_data_versions"
+
+
+class LocalVersions:
+    """Dernière version connue de chaque clé dans ce process, servie sans requête pendant `revalidate_seconds`."""
+
+    def __init__(self, revalidate_seconds: float) -> None:
+        self.revalidate_seconds = revalidate_seconds
+        self._entries: dict[str, tuple[Any, float]] = {}
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[1] >= self.revalidate_seconds:
+            return None
+        return entry[0]
+
+    def set(self, key: str, version: Any) -> None:
+        """Version écrite par ce process (commit) : remplace l'entrée."""
+        self._entries[key] = (version, time.monotonic())
+
+    def refresh(self, key: str, version: Any) -> Any:
+        """Version lue en base ; renvoie la version retenue.
+
+        Une lecture commencée avant un commit local ne fait pas reculer une entrée encore fraîche.
+        """
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and now - entry[1] < self.revalidate_seconds and entry[0] > version:
+            version = entry[0]
+        self._entries[key] = (version, now)
+        return version
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+data_versions = LocalVersions(revalidate_seconds=get_settings().version_revalidate_seconds)
+
+
+def bump_data_version_stmt(dialect_name: str, module_id: str):
+    table = ModuleSyncState.__table__
+    stmt = dialect_insert(dialect_name, table).values(module_id=module_id, data_version=1)
+    return stmt.on_conflict_do_update(
+        index_elements=["module_id"], set_={"data_version": table.c.data_version + 1}
+    ).returning(table.c.data_version)
+
+
+def bump_data_version(session: Session, module_id: str) -> int:
+    """Incrémente la version de `module_id` dans la transaction de l'appelant (ne commit pas).
+
+    La nouvelle version est publiée dans `data_versions` au commit de `session`, oubliée au rollback.
+    """
+    version = session.execute(bump_data_version_stmt(session.get_bind().dialect.name, module_id)).scalar_one()
+    session.info.setdefault(_PENDING_KEY, {})[module_id] = version
+    return version
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_data_versions(session: Session) -> None:
+    for module_id, version in session.info.pop(_PENDING_KEY, {}).items():
+        data_versions.set(module_id, version)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_data_versions(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+async def get_data_versions(session: AsyncSession, module_ids: Iterable[str]) -> dict[str, int]:
+    """Version courante de chaque module (0 pour un module jamais synchronisé).
+
+    Seuls les modules sans version locale fraîche sont lus en base.
+    """
+    versions: dict[str, int] = {}
+    missing: set[str] = set()
+    for module_id in set(module_ids):
+        version = data_versions.get(module_id)
+        if version is None:
+            missing.add(module_id)
+        else:
+            versions[module_id] = version
+    if not missing:
+        return versions
+
+    try:
+        rows = await session.execute(
+            select(ModuleSyncState.module_id, ModuleSyncState.data_version).where(ModuleSyncState.module_id.in_(missing))
+        )
+    except OperationalError:
+        # Base pas encore migrée : pas de version, les ETags restent valides jusqu'à la migration.
+        return versions | dict.fromkeys(missing, 0)
+    for module_id, version in (dict.fromkeys(missing, 0) | dict(rows.all())).items():
+        versions[module_id] = data_versions.refresh(module_id, version)
+    return versions
@@ -1,23 +1,80 @@
 from __future__ import annotations
 
+import asyncio
+import time
 from functools import lru_cache
-from typing import Generator
+from typing import Any, AsyncGenerator, Awaitable, Callable, Generator, Iterable, Sequence, TypeVar
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, Table, create_engine, event
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
-from synapsesync.core.config import get_settings
+from synapsesync.core.config import Settings, get_settings
+from synapsesync.core.metrics import install_engine_hooks
+from synapsesync.core.profiler import install_sql_hooks
+
+T = TypeVar("T")
+
+
+def _is_sqlite_memory(database_url: str) -> bool:
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def sqlite_pragmas(settings: Settings) -> list[str]:
+    pragmas = [f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout_ms)}"]
+    if settings.sqlite_tuned:
+        pragmas += [
+            f"PRAGMA journal_mode = {settings.sqlite_journal_mode}",
+            f"PRAGMA synchronous = {settings.sqlite_synchronous}",
+            # Valeur négative = taille en KiB (et non en pages).
+            f"PRAGMA cache_size = -{int(settings.sqlite_cache_size_kib)}",
+            f"PRAGMA mmap_size = {int(settings.sqlite_mmap_size)}",
+            f"PRAGMA temp_store = {settings.sqlite_temp_store}",
+        ]
+    return pragmas
+
+
+def _install_sqlite_pragmas(engine: Engine, settings: Settings) -> None:
+    pragmas = sqlite_pragmas(settings)
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, _connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def _engine_kwargs(settings: Settings) -> dict[str, Any]:
+    kwargs: dict[str, Any] = {}
+    if settings.database_url.startswith("sqlite"):
+        kwargs["connect_args"] = {"check_same_thread": False}
+    if not _is_sqlite_memory(settings.database_url):
+        # Pool de connexions persistantes : les PRAGMAs et le cache de pages survivent entre requêtes.
+        kwargs["pool_size"] = settings.db_pool_size
+        kwargs["max_overflow"] = settings.db_max_overflow
+    return kwargs
 
 
 @lru_cache
 def get_engine():
     settings = get_settings()
 
-    connect_args: dict[str, object] = {}
-    if settings.database_url.startswith("sqlite"):
-        connect_args = {"check_same_thread": False}
-
-    return create_engine(settings.database_url, connect_args=connect_args)
+    engine = create_engine(settings.database_url, **_engine_kwargs(settings))
+    if engine.dialect.name == "sqlite":
+        _install_sqlite_pragmas(engine, settings)
+    if settings.metrics_enabled and settings.metrics_sql_enabled:
+        install_engine_hooks(engine, "sync")
+    if settings.profiler_token:
+        install_sql_hooks(engine)
+    return engine
 
 
 SessionLocal = sessionmaker(bind=get_engine(), autoflush=False, autocommit=False, expire_on_commit=False)
@@ -29,3 +86,102 @@ def get_session() -> Generator[Session, None, None]:
         yield session
     finally:
         session.close()
+
+
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def to_async_url(database_url: str) -> str:
+    """`sqlite:///x.db` → `sqlite+aiosqlite:///x.db` (URL inchangée si un driver est déjà précisé)."""
+    url = make_url(database_url)
+    if url.drivername in _ASYNC_DRIVERS:
+        url = url.set(drivername=_ASYNC_DRIVERS[url.drivername])
+    return url.render_as_string(hide_password=False)
+
+
+@lru_cache
+def get_async_engine():
+    settings = get_settings()
+
+    kwargs = _engine_kwargs(settings)
+    kwargs.pop("connect_args", None)
+    engine = create_async_engine(to_async_url(settings.database_url), **kwargs)
+    if engine.dialect.name == "sqlite":
+        _install_sqlite_pragmas(engine.sync_engine, settings)
+    if settings.metrics_enabled and settings.metrics_sql_enabled:
+        install_engine_hooks(engine.sync_engine, "async")
+    if settings.profiler_token:
+        install_sql_hooks(engine.sync_engine)
+    return engine
+
+
+AsyncSessionLocal = async_sessionmaker(bind=get_async_engine(), autoflush=False, expire_on_commit=False)
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Dépendance FastAPI : une `AsyncSession` par requête (I/O base sans bloquer l'event loop)."""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+def is_lock_error(exc: BaseException) -> bool:
+    message = str(exc).lower()
+    return isinstance(exc, OperationalError) and ("database is locked" in message or "database is busy" in message)
+
+
+async def retry_on_locked(operation: Callable[[], Awaitable[T]]) -> T:
+    """Rejoue `operation` (une transaction complète) si SQLite répond `database is locked`.
+
+    `busy_timeout` couvre l'attente d'un verrou ; ce retry couvre les cas où SQLite abandonne
+    immédiatement (ex: passage lecture → écriture pendant qu'un autre writer tient le verrou).
+    """
+    settings = get_settings()
+    attempt = 0
+    while True:
+        try:
+            return await operation()
+        except OperationalError as e:
+            if not is_lock_error(e) or attempt >= settings.db_lock_retries:
+                raise
+            await asyncio.sleep(settings.db_lock_retry_backoff * (2**attempt))
+            attempt += 1
+
+
+def retry_on_locked_sync(operation: Callable[[], T]) -> T:
+    """Variante synchrone de `retry_on_locked` (travaux exécutés dans un thread)."""
+    settings = get_settings()
+    attempt = 0
+    while True:
+        try:
+            return operation()
+        except OperationalError as e:
+            if not is_lock_error(e) or attempt >= settings.db_lock_retries:
+                raise
+            time.sleep(settings.db_lock_retry_backoff * (2**attempt))
+            attempt += 1
+
+
+def iter_batches(rows: Iterable[dict[str, Any]], batch_size: int) -> Generator[list[dict[str, Any]], None, None]:
+    batch: list[dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def dialect_insert(dialect_name: str, table: Table):
+    """`insert()` du dialecte, qui expose `on_conflict_do_nothing` / `on_conflict_do_update`."""
+    if dialect_name == "sqlite":
+        return sqlite_insert(table)
+    if dialect_name == "postgresql":
+        return postgresql_insert(table)
+    raise NotImplementedError(f"INSERT ... ON CONFLICT not supported for dialect {dialect_name!r}")
+
+
+def insert_ignore_stmt(dialect_name: str, table: Table, conflict_columns: Sequence[str]):
+    """Construit un `INSERT ... ON CONFLICT DO NOTHING` pour le dialecte donné."""
+    return dialect_insert(dialect_name, table).on_conflict_do_nothing(index_elements=list(conflict_columns))
+
@@ -1,32 +1,191 @@
+"""Découverte des modules (entry points `synapsesync.modules`) et imports optionnels des providers.
+
+Les modules sont chargés à la demande : `load_modules()` ne lit que les entry points et renvoie des
+`LazyModule`. Un `LazyModule` n'importe et n'instancie son module qu'au premier accès à autre chose
+que son `id`, c'est-à-dire le nom de l'entry point. Le lifespan peut précharger les modules en tâche
+de fond (`registry.warm_up()`, `SYNAPSESYNC_STARTUP_WARMUP_ENABLED`). La première requête n'a alors
+pas d'import à payer.
+
+Les durées de lecture des entry points, d'import et d'instanciation de chaque module, et des imports
+optionnels (`import_optional`) sont exposées par `registry.report()` (`GET /__startup`).
+"""
+
 from __future__ import annotations
 
+import asyncio
+import importlib
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
 from importlib import metadata
+from types import ModuleType
+from typing import Any
 
 from synapsesync.modules.common.interfaces import BaseModule
 
+logger = logging.getLogger(__name__)
 
-class ModuleRegistry:
-    def __init__(self) -> None:
-        self._modules: dict[str, BaseModule] | None = None
+ENTRY_POINT_GROUP = "synapsesync.modules"
 
-    def load_modules(self) -> dict[str, BaseModule]:
-        if self._modules is not None:
-            return self._modules
+_optional_imports: dict[str, ModuleType] = {}
+_optional_import_ms: dict[str, float] = {}
+_optional_lock = threading.Lock()
+
+
+def import_optional(name: str) -> ModuleType:
+    """Importe `name` (dépendance optionnelle d'un provider, ex: `my.github.all`) et le garde en cache.
+
+    Seul un import réussi est mis en cache : un échec (`ImportError` ou autre) remonte et est retenté
+    à l'appel suivant. La config HPI (`my.config`) peut en effet être créée pendant que l'app tourne.
+    """
+    module = _optional_imports.get(name)
+    if module is not None:
+        return module
+    with _optional_lock:
+        module = _optional_imports.get(name)
+        if module is None:
+            start = time.perf_counter()
+            module = importlib.import_module(name)
+            _optional_import_ms[name] = round((time.perf_counter() - start) * 1000, 2)
+            _optional_imports[name] = module
+    return module
+
+
+@dataclass
+class ModuleLoad:
+    """Chargement d'un module, pour le rapport de démarrage."""
+
+    module_id: str
+    entry_point: str
+    status: str = "pending"  # pending | loaded | failed
+    import_ms: float | None = None
+    init_ms: float | None = None
+    error: str | None = None
+
+
+class LazyModule:
+    """Module déclaré par un entry point : importé et instancié au premier accès à un attribut.
+
+    `id` est le nom de l'entry point (sans import) ; le module instancié doit porter le même `id`.
+    """
 
-        modules: dict[str, BaseModule] = {}
-        entry_points = metadata.entry_points().select(group="synapsesync.modules")
+    def __init__(self, entry_point: metadata.EntryPoint) -> None:
+        self.id = entry_point.name
+        self._entry_point = entry_point
+        self._module: BaseModule | None = None
+        self._lock = threading.Lock()
+        self.load_info = ModuleLoad(module_id=entry_point.name, entry_point=entry_point.value)
 
-        for ep in entry_points:
-            module_cls = ep.load()
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def load(self) -> BaseModule:
+        """Importe et instancie le module (une seule fois, y compris entre threads)."""
+        module = self._module
+        if module is not None:
+            return module
+        with self._lock:
+            if self._module is None:
+                self._module = self._load()
+            return self._module
+
+    def _load(self) -> BaseModule:
+        info = self.load_info
+        try:
+            start = time.perf_counter()
+            module_cls = self._entry_point.load()
+            loaded = time.perf_counter()
             module: BaseModule = module_cls()
-            modules[module.id] = module
+            info.import_ms = round((loaded - start) * 1000, 2)
+            info.init_ms = round((time.perf_counter() - loaded) * 1000, 2)
+            if module.id != self.id:
+                raise ValueError(f"Entry point {self.id!r} provides a module with id {module.id!r}")
+        except Exception as e:
+            info.status = "failed"
+            info.error = str(e)
+            raise
+        info.status = "loaded"
+        info.error = None
+        logger.info("Loaded module %s in %.1f ms", self.id, info.import_ms + info.init_ms)
+        return module
+
+    def __getattr__(self, name: str) -> Any:
+        # Appelé seulement pour les attributs absents du proxy : tout le reste vient du module.
+        if name.startswith("__") or name in ("_entry_point", "_module", "_lock", "load_info"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        return f"<LazyModule {self.id} ({self.load_info.status})>"
 
-        self._modules = modules
-        return modules
+
+class ModuleRegistry:
+    def __init__(self, group: str = ENTRY_POINT_GROUP) -> None:
+        self.group = group
+        self._modules: dict[str, LazyModule] | None = None
+        self._lock = threading.Lock()
+        self.discovery_ms: float | None = None
+        self.warmup_ms: float | None = None
+
+    def load_modules(self) -> dict[str, BaseModule]:
+        """Modules déclarés, par id ; rien n'est importé (voir `LazyModule`)."""
+        modules = self._modules
+        if modules is not None:
+            return modules  # type: ignore[return-value]
+        with self._lock:
+            if self._modules is None:
+                start = time.perf_counter()
+                self._modules = {ep.name: LazyModule(ep) for ep in metadata.entry_points(group=self.group)}
+                self.discovery_ms = round((time.perf_counter() - start) * 1000, 2)
+            return self._modules  # type: ignore[return-value]
 
     def get_module(self, module_id: str) -> BaseModule:
         modules = self.load_modules()
         return modules[module_id]
 
+    async def load_module(self, module_id: str) -> BaseModule:
+        """`get_module`, avec la lecture des entry points et le premier import faits dans un thread."""
+        if self._modules is None:
+            await asyncio.to_thread(self.load_modules)
+        proxy: Any = self.get_module(module_id)
+        if not proxy.loaded:
+            await asyncio.to_thread(proxy.load)
+        return proxy
+
+    async def load_all(self) -> list[BaseModule]:
+        """Tous les modules déclarés, chargés par `load_module`."""
+        if self._modules is None:
+            await asyncio.to_thread(self.load_modules)
+        return [await self.load_module(module_id) for module_id in self.load_modules()]
+
+    async def warm_up(self) -> None:
+        """Importe et instancie chaque module dans un thread, puis appelle son `warm_up()` s'il en a un.
+
+        Un échec est journalisé sans interrompre le préchargement des autres modules.
+        """
+        start = time.perf_counter()
+        modules: dict[str, Any] = await asyncio.to_thread(self.load_modules)
+        for proxy in modules.values():
+            try:
+                module = await asyncio.to_thread(proxy.load)
+                hook = getattr(module, "warm_up", None)
+                if hook is not None:
+                    await hook()
+            except Exception:
+                logger.warning("Warm-up of module %s failed", proxy.id, exc_info=True)
+        self.warmup_ms = round((time.perf_counter() - start) * 1000, 2)
+        logger.info("Module warm-up done in %.1f ms", self.warmup_ms)
+
+    def report(self) -> dict[str, Any]:
+        modules = self._modules or {}
+        return {
+            "discovery_ms": self.discovery_ms,
+            "warmup_ms": self.warmup_ms,
+            "modules": [asdict(proxy.load_info) for proxy in modules.values()],
+            "optional_imports_ms": dict(_optional_import_ms),
+        }
+
 
 registry = ModuleRegistry()
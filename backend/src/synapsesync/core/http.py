@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+
+from synapsesync.core.config import get_settings
+from synapsesync.core.metrics import http_client_hooks
+
+_client: httpx.AsyncClient | None = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # type: ignore  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client(transport: httpx.AsyncBaseTransport | None = None) -> httpx.AsyncClient:
+    """Client HTTP sortant configuré depuis `Settings` (pool keep-alive, HTTP/2 si `h2` est installé).
+
+    `transport` : remplace le réseau (ex: `httpx.MockTransport` des benchmarks).
+    """
+    settings = get_settings()
+    return httpx.AsyncClient(
+        transport=transport,
+        http2=settings.http_http2 and _http2_available(),
+        timeout=httpx.Timeout(settings.http_timeout, connect=settings.http_connect_timeout),
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+        event_hooks=http_client_hooks() if settings.metrics_enabled else None,
+    )
+
+
+async def open_http_client() -> httpx.AsyncClient:
+    """Crée le client partagé dans un thread : contexte TLS et import de `h2` (~250 ms) hors de l'event loop."""
+    global _client
+    if _client is None or _client.is_closed:
+        client = await asyncio.to_thread(create_http_client)
+        if _client is None or _client.is_closed:
+            _client = client
+        else:
+            # Créé entre-temps par `get_http_client()`.
+            await client.aclose()
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def use_http_client(client: httpx.AsyncClient) -> None:
+    """Installe `client` comme client partagé (ex: API GitHub simulée des benchmarks)."""
+    global _client
+    _client = client
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Retourne le client partagé de l'application.
+
+    Ouvert/fermé par le lifespan FastAPI ; créé à la demande hors app (scripts, benchmarks).
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
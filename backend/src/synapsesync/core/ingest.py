@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+from collections import Counter, deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Iterable, TypeVar
+
+from sqlalchemy.orm import Session
+
+from synapsesync.core.config import get_settings
+from synapsesync.core.data_version import bump_data_version
+from synapsesync.core.database import SessionLocal, insert_ignore_stmt, iter_batches, retry_on_locked_sync
+from synapsesync.core.models import Event, ModuleSyncState
+from synapsesync.core.payload import compress_payload
+from synapsesync.core.rollups import RollupKey, apply_rollup_deltas, count_by_day
+from synapsesync.core.search import fts_enabled, index_events
+
+EVENT_CONFLICT_COLUMNS = ("module_id", "external_id")
+
+T = TypeVar("T")
+
+# Colonnes optionnelles d'une ligne `events` : toujours présentes dans un lot (executemany homogène).
+OPTIONAL_EVENT_COLUMNS = ("external_id", "repo_name", "actor", "ref")
+
+
+# Clés d'une ligne fournie par un module qui ne sont pas des colonnes `events`.
+NON_COLUMN_KEYS = ("metadata_json", "search_body")
+
+
+def prepare_event_row(row: dict[str, Any]) -> dict[str, Any]:
+    """Complète une ligne fournie par un module ; le payload brut `metadata_json` est compressé dans `payload`."""
+    prepared = {key: value for key, value in row.items() if key not in NON_COLUMN_KEYS}
+    for key in OPTIONAL_EVENT_COLUMNS:
+        prepared.setdefault(key, None)
+    prepared["payload"] = compress_payload(row.get("metadata_json"))
+    return prepared
+
+
+def _as_utc(ts: datetime) -> datetime:
+    # Un timestamp sans fuseau est interprété en UTC (comme à la lecture depuis SQLite).
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts
+
+
+def ingest_events(
+    session: Session,
+    module_id: str,
+    rows: Iterable[dict[str, Any]],
+    batch_size: int | None = None,
+    not_before: datetime | None = None,
+) -> int:
+    """Insère des lignes `events` par lots en ignorant les doublons `(module_id, external_id)`.
+
+    Les agrégats journaliers sont mis à jour pour les seules lignes réellement insérées, dans la
+    même transaction, ainsi que la version des données du module si au moins une ligne est insérée.
+    Ne commit pas. Retourne le nombre d'événements insérés.
+    Chaque ligne passe par `prepare_event_row` (compression de `metadata_json`). Sous SQLite, les lignes
+    insérées sont aussi indexées dans `events_fts` (`summary_text` + `search_body` optionnel).
+    `not_before` (limite de rétention du module) écarte les events qui seraient aussitôt archivés :
+    une fois archivés, ils ne sont plus dans l'index de déduplication et seraient réinsérés à chaque sync.
+    """
+    size = batch_size or get_settings().sync_batch_size
+    stmt = insert_ignore_stmt(session.get_bind().dialect.name, Event.__table__, EVENT_CONFLICT_COLUMNS).returning(
+        Event.timestamp, Event.event_type, Event.id, Event.external_id, Event.summary_text
+    )
+    index_fts = fts_enabled(session)
+
+    if not_before is not None:
+        rows = (row for row in rows if _as_utc(row["timestamp"]) >= not_before)
+
+    inserted = 0
+    deltas: Counter[RollupKey] = Counter()
+    for batch in iter_batches(rows, size):
+        # RETURNING ne renvoie que les lignes insérées (pas celles ignorées sur conflit).
+        new_rows = session.execute(stmt, [prepare_event_row(row) for row in batch]).all()
+        inserted += len(new_rows)
+        deltas.update(count_by_day((r.timestamp, r.event_type) for r in new_rows))
+        if index_fts:
+            # L'ordre de RETURNING n'est pas garanti : le body est retrouvé par `external_id`.
+            bodies = {row.get("external_id"): row.get("search_body") for row in batch if row.get("external_id") is not None}
+            index_events(session, ((r.id, r.summary_text, bodies.get(r.external_id)) for r in new_rows))
+
+    apply_rollup_deltas(session, module_id, deltas)
+    if inserted:
+        bump_data_version(session, module_id)
+    return inserted
+
+
+@dataclass
+class IngestProgress:
+    """Avancement d'un import en streaming (lu par l'API pendant que le thread d'import l'alimente)."""
+
+    module_id: str
+    source: str
+    status: str = "running"  # running | done | failed
+    resumed_from: int = 0
+    # Éléments de la source consommés, checkpoint de reprise inclus.
+    processed: int = 0
+    inserted: int = 0
+    chunks: int = 0
+    started_at: datetime = field(default_factory=lambda: datetime.now(tz=timezone.utc))
+    finished_at: datetime | None = None
+    error: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["started_at"] = self.started_at.isoformat()
+        data["finished_at"] = self.finished_at.isoformat() if self.finished_at else None
+        return data
+
+
+# Dernier import en streaming de chaque module (process courant).
+ingest_progress: dict[str, IngestProgress] = {}
+
+
+def begin_ingest(module_id: str, source: str) -> IngestProgress:
+    """Réserve l'import en streaming de `module_id` ; à appeler depuis l'event loop, avant le thread."""
+    current = ingest_progress.get(module_id)
+    if current is not None and current.status == "running":
+        raise RuntimeError(f"Ingestion already running for module {module_id!r}")
+    progress = IngestProgress(module_id=module_id, source=source)
+    ingest_progress[module_id] = progress
+    return progress
+
+
+def _load_checkpoint(module_id: str, source: str) -> int:
+    with SessionLocal() as session:
+        row = session.get(ModuleSyncState, module_id)
+        if row is None or row.checkpoint_source != source:
+            return 0
+        return row.checkpoint_offset or 0
+
+
+def _save_checkpoint(session: Session, module_id: str, source: str | None, offset: int | None) -> None:
+    row = session.get(ModuleSyncState, module_id)
+    if row is None:
+        row = ModuleSyncState(module_id=module_id)
+        session.add(row)
+    row.checkpoint_source = source
+    row.checkpoint_offset = offset
+    row.updated_at = datetime.now(tz=timezone.utc)
+
+
+def _commit_chunk(
+    module_id: str, source: str, rows: list[dict[str, Any]], offset: int, not_before: datetime | None = None
+) -> int:
+    with SessionLocal() as session:
+        inserted = ingest_events(session, module_id, rows, not_before=not_before)
+        _save_checkpoint(session, module_id, source, offset)
+        session.commit()
+        return inserted
+
+
+def _clear_checkpoint(module_id: str) -> None:
+    with SessionLocal() as session:
+        _save_checkpoint(session, module_id, None, None)
+        session.commit()
+
+
+def stream_ingest(
+    progress: IngestProgress,
+    items: Iterable[T],
+    to_row: Callable[[T], dict[str, Any] | None],
+    chunk_size: int | None = None,
+    not_before: datetime | None = None,
+) -> int:
+    """Importe `items` par chunks commités un par un, avec checkpoint de reprise. Bloquant.
+
+    Prévu pour tourner dans un thread (`asyncio.to_thread`) : la mémoire est bornée par la taille
+    d'un chunk et chaque commit enregistre dans `module_sync_states` le nombre d'éléments consommés.
+    Après un crash, le run suivant sur la même source saute ces éléments (la source doit donc être
+    relue dans le même ordre). `to_row` renvoie `None` pour un élément à ignorer ; `not_before`, cf. `ingest_events`.
+    Retourne le nombre d'événements insérés par ce run.
+    """
+    size = chunk_size or get_settings().ingest_chunk_size
+    module_id, source = progress.module_id, progress.source
+    try:
+        offset = _load_checkpoint(module_id, source)
+        progress.resumed_from = progress.processed = offset
+
+        it = iter(items)
+        deque(islice(it, offset), maxlen=0)
+
+        while chunk := list(islice(it, size)):
+            rows = [row for row in map(to_row, chunk) if row is not None]
+            end = progress.processed + len(chunk)
+            # Chunk matérialisé : la transaction peut être rejouée si la base est verrouillée.
+            progress.inserted += retry_on_locked_sync(partial(_commit_chunk, module_id, source, rows, end, not_before))
+            progress.processed = end
+            progress.chunks += 1
+
+        retry_on_locked_sync(partial(_clear_checkpoint, module_id))
+        progress.status = "done"
+        return progress.inserted
+    except Exception as e:
+        progress.status = "failed"
+        progress.error = str(e)
+        raise
+    finally:
+        progress.finished_at = datetime.now(tz=timezone.utc)
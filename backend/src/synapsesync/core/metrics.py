@@ -0,0 +1,355 @@
+"""Métriques au format texte Prometheus (`GET /metrics`), sans dépendance ni service externe.
+
+Compteurs, jauges et histogrammes en mémoire du process, alimentés par :
+
+- `MetricsMiddleware` : latence par route (gabarit de chemin, pas l'URL brute) ;
+- `install_engine_hooks` : durée et nombre des requêtes SQL (events `before/after_cursor_execute`) ;
+- `http_client_hooks` : latence des appels sortants et quota restant de l'API GitHub (`x-ratelimit-*`) ;
+- le scheduler (durée des syncs, lignes insérées) et `/api/widget-data` (calcul des widgets).
+
+Chaque observation coûte une recherche dichotomique et quelques additions sous un verrou ; le texte
+n'est construit qu'au scrape. Multi-workers : chaque process expose ses propres valeurs.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any
+
+import httpx
+from sqlalchemy import Engine, event
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Secondes : de la requête SQL indexée (~0,1 ms) à l'import complet.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SYNC_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in values]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in values]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Par jeu de labels : [compte par bucket (non cumulé, + `+Inf`), somme, total].
+        self._series: dict[tuple[str, ...], list[Any]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            snapshot = [(k, list(s[0]), s[1], s[2]) for k, s in self._series.items()]
+        lines = []
+        for labels, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+        # Valeurs lues au scrape (ex: statistiques du cache widgets) : `() -> [(nom, aide, type, valeur)]`.
+        self._collectors: list[Callable[[], Iterable[tuple[str, str, str, float]]]] = []
+
+    def register(self, metric: _Metric) -> Any:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[tuple[str, str, str, float]]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            samples = metric.render()
+            if samples:
+                lines += metric.header() + samples
+        for collector in self._collectors:
+            for name, documentation, kind, value in collector():
+                lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}", f"{name} {_format_value(value)}"]
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+PROCESS_START_TIME = time.time()
+
+http_request_duration = registry.register(
+    Histogram(
+        "synapsesync_http_request_duration_seconds",
+        "Latency of HTTP requests served by the API, by route template.",
+        ("method", "route", "status"),
+    )
+)
+db_query_duration = registry.register(
+    Histogram(
+        "synapsesync_db_query_duration_seconds",
+        "Duration of SQL statements executed through SQLAlchemy.",
+        ("engine", "operation"),
+    )
+)
+outbound_request_duration = registry.register(
+    Histogram(
+        "synapsesync_outbound_request_duration_seconds",
+        "Latency of outbound HTTP requests made with the shared client.",
+        ("host", "method", "status"),
+    )
+)
+github_rate_limit_remaining = registry.register(
+    Gauge("synapsesync_github_rate_limit_remaining", "Requests left in the current GitHub rate-limit window.", ("resource",))
+)
+github_rate_limit_limit = registry.register(
+    Gauge("synapsesync_github_rate_limit_limit", "Size of the GitHub rate-limit window.", ("resource",))
+)
+github_rate_limit_reset = registry.register(
+    Gauge(
+        "synapsesync_github_rate_limit_reset_timestamp_seconds",
+        "Unix time at which the GitHub rate-limit window resets.",
+        ("resource",),
+    )
+)
+sync_duration = registry.register(
+    Histogram(
+        "synapsesync_sync_duration_seconds",
+        "Duration of module syncs, by outcome.",
+        ("module_id", "status"),
+        buckets=SYNC_BUCKETS,
+    )
+)
+sync_rows_ingested = registry.register(
+    Counter("synapsesync_sync_rows_ingested_total", "Events inserted by module syncs.", ("module_id",))
+)
+sync_last_success = registry.register(
+    Gauge("synapsesync_sync_last_success_timestamp_seconds", "Unix time of the last successful sync.", ("module_id",))
+)
+widget_compute_duration = registry.register(
+    Histogram(
+        "synapsesync_widget_compute_duration_seconds",
+        "Time spent computing widget data (cache misses only).",
+        ("module_id", "widget_id"),
+    )
+)
+
+
+def _process_collector() -> Iterable[tuple[str, str, str, float]]:
+    yield "synapsesync_process_start_time_seconds", "Unix time at which the process started.", "gauge", PROCESS_START_TIME
+
+
+def _widget_cache_collector() -> Iterable[tuple[str, str, str, float]]:
+    from synapsesync.core.cache import widget_cache
+
+    stats = widget_cache.stats()
+    yield "synapsesync_widget_cache_hits_total", "Widget data cache hits.", "counter", stats["hits"]
+    yield "synapsesync_widget_cache_misses_total", "Widget data cache misses.", "counter", stats["misses"]
+    yield "synapsesync_widget_cache_evictions_total", "Widget data cache LRU evictions.", "counter", stats["evictions"]
+    yield "synapsesync_widget_cache_entries", "Entries held in the widget data cache.", "gauge", stats["entries"]
+
+
+registry.add_collector(_process_collector)
+registry.add_collector(_widget_cache_collector)
+
+
+def render() -> str:
+    return registry.render()
+
+
+# --- Requêtes SQL -----------------------------------------------------------------------------
+
+
+def _operation(statement: str) -> str:
+    head = statement.lstrip()[:8].split(None, 1)
+    return head[0].lower() if head else "other"
+
+
+def install_engine_hooks(engine: Engine, label: str) -> None:
+    """Chronomètre chaque requête de `engine` (moteur synchrone, ou `sync_engine` du moteur async).
+
+    Tout listener fait passer SQLAlchemy par son chemin d'exécution avec events : quelques dizaines
+    de µs par requête, d'où `SYNAPSESYNC_METRICS_SQL_ENABLED` pour s'en passer.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(_conn, _cursor, _statement, _parameters, context, _executemany) -> None:
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(_conn, _cursor, statement, _parameters, context, _executemany) -> None:
+        start = getattr(context, "_metrics_start", None)
+        if start is not None:
+            db_query_duration.observe(time.perf_counter() - start, label, _operation(statement))
+
+
+# --- Client HTTP sortant ----------------------------------------------------------------------
+
+
+async def _on_request(request: httpx.Request) -> None:
+    request.extensions["synapsesync_start"] = time.perf_counter()
+
+
+async def _on_response(response: httpx.Response) -> None:
+    request = response.request
+    start = request.extensions.get("synapsesync_start")
+    if start is not None:
+        outbound_request_duration.observe(
+            time.perf_counter() - start, request.url.host, request.method, str(response.status_code)
+        )
+
+    headers = response.headers
+    remaining = headers.get("x-ratelimit-remaining")
+    if remaining is not None and request.url.host.endswith("github.com"):
+        resource = headers.get("x-ratelimit-resource", "core")
+        try:
+            github_rate_limit_remaining.set(float(remaining), resource)
+            if "x-ratelimit-limit" in headers:
+                github_rate_limit_limit.set(float(headers["x-ratelimit-limit"]), resource)
+            if "x-ratelimit-reset" in headers:
+                github_rate_limit_reset.set(float(headers["x-ratelimit-reset"]), resource)
+        except ValueError:
+            pass
+
+
+def http_client_hooks() -> dict[str, list[Callable[..., Any]]]:
+    """`event_hooks` du client `httpx.AsyncClient` partagé."""
+    return {"request": [_on_request], "response": [_on_response]}
+
+
+# --- Requêtes entrantes -----------------------------------------------------------------------
+
+
+class MetricsMiddleware:
+    """Middleware ASGI : latence de chaque requête HTTP, étiquetée par gabarit de route.
+
+    La route (`/api/widget-data/{module_id}/{widget_id}`) est lue dans le scope une fois la requête
+    routée : pas d'explosion du nombre de séries avec les identifiants. Requête non routée : `unmatched`.
+    Le temps mesuré va jusqu'au dernier octet envoyé (réponses en streaming comprises).
+    """
+
+    def __init__(self, app: Any, exclude_paths: Sequence[str] = ("/metrics",)) -> None:
+        self.app = app
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_request_duration.observe(time.perf_counter() - start, scope["method"], route_template(scope), str(status))
+
+
+def route_template(scope: dict[str, Any]) -> str:
+    """Gabarit complet de la route servie (`/api/modules/{module_id}/sync`), `unmatched` sinon.
+
+    Selon la version de FastAPI, la route d'un routeur inclus porte le chemin complet ou seulement son
+    suffixe : le préfixe est retrouvé en retirant du chemin réel le suffixe rendu avec `path_params`.
+    """
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return "unmatched"
+    rendered = path_format
+    for name, value in (scope.get("path_params") or {}).items():
+        rendered = rendered.replace("{" + name + "}", str(value))
+    path = scope["path"]
+    if rendered and path.endswith(rendered):
+        return path[: len(path) - len(rendered)] + path_format
+    return path_format if path_format else path
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
+from typing import Any
 
-from sqlalchemy import JSON, DateTime, Index, String, Text, text
+from sqlalchemy import JSON, Date, DateTime, Index, Integer, LargeBinary, String, Text, text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
+from synapsesync.core.payload import decompress_payload
+
 
 class Base(DeclarativeBase):
     pass
@@ -20,10 +23,40 @@ class Event(Base):
     event_type: Mapped[str] = mapped_column(String(100), nullable=False)
 
     summary_text: Mapped[str] = mapped_column(Text, nullable=False)
-    metadata_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+
+    # Clé naturelle fournie par la source (id d'event GitHub, eid HPI...) : sert à dédupliquer les syncs.
+    external_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    # Champs du payload interrogés couramment, promus en colonnes indexées.
+    repo_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    actor: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    ref: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    # Payload brut de la source, JSON compressé (zstd ou zlib, cf. `core/payload.py`) ; jamais chargé
+    # par défaut (`deferred`), décompressé à la demande via `metadata_json`.
+    payload: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True, deferred=True)
+
+    @property
+    def metadata_json(self) -> dict[str, Any] | None:
+        return decompress_payload(self.payload)
 
 
 Index("ix_events_module_id_timestamp", Event.module_id, Event.timestamp)
+Index("ux_events_module_id_external_id", Event.module_id, Event.external_id, unique=True)
+Index("ix_events_module_id_repo_name", Event.module_id, Event.repo_name)
+Index("ix_events_module_id_actor", Event.module_id, Event.actor)
+Index("ix_events_module_id_ref", Event.module_id, Event.ref)
+
+
+class EventDailyRollup(Base):
+    """Nombre d'événements par module, jour (UTC) et type ; maintenu par la sync."""
+
+    __tablename__ = "event_daily_rollups"
+
+    module_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    event_type: Mapped[str] = mapped_column(String(100), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
 
 
 class Dashboard(Base):
@@ -48,3 +81,65 @@ class ModuleConfig(Base):
         nullable=False,
         server_default=text("CURRENT_TIMESTAMP"),
     )
+
+
+class ModuleSyncState(Base):
+    """Curseur de synchronisation incrémentale d'un module (ETag, dernier event vu)."""
+
+    __tablename__ = "module_sync_states"
+
+    module_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    # Ressource distante à laquelle se rapporte le curseur (ex: URL des events d'un username).
+    source: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    etag: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    cursor_external_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    cursor_timestamp: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Reprise d'un import en streaming interrompu : nb d'éléments de la source déjà commités.
+    checkpoint_source: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    checkpoint_offset: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Incrémentée à chaque changement des données lues par les widgets (cf. `core/data_version.py`).
+    data_version: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP"),
+    )
+
+
+class GitHubRepoLanguages(Base):
+    """Cache des langages d'un repo GitHub, valide tant que `pushed_at` n'a pas changé."""
+
+    __tablename__ = "github_repo_languages"
+
+    repo_full_name: Mapped[str] = mapped_column(String(255), primary_key=True)
+    pushed_at: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    languages_json: Mapped[dict] = mapped_column(JSON, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP"),
+    )
+
+
+class EventArchiveSegment(Base):
+    """Segment d'archive (fichier JSONL compressé, append-only) d'events sortis de la table `events`."""
+
+    __tablename__ = "event_archive_segments"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    module_id: Mapped[str] = mapped_column(String(100), nullable=False)
+    # Chemin relatif à `archive_dir`.
+    path: Mapped[str] = mapped_column(String(500), nullable=False, unique=True)
+    codec: Mapped[str] = mapped_column(String(10), nullable=False)
+    event_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    min_timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    max_timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP"),
+    )
+
+
+Index("ix_event_archive_segments_module_id_max_timestamp", EventArchiveSegment.module_id, EventArchiveSegment.max_timestamp)
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from synapsesync.core.config import get_settings
+from synapsesync.core.database import AsyncSessionLocal
+from synapsesync.core.models import ModuleConfig
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+def freeze(value: Any) -> Any:
+    """Copie profonde en lecture seule (dict → MappingProxyType, list → tuple)."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+@dataclass
+class _Entry:
+    snapshot: Mapping[str, Any]
+    version: datetime | None
+    checked_at: float
+
+
+class ModuleConfigCache:
+    """Cache en mémoire des `module_configs`, renvoyés sous forme de snapshots immuables.
+
+    Les écritures locales invalident l'entrée (`invalidate`). Pour les écritures faites par d'autres
+    process, la version (`updated_at`) est revérifiée au plus toutes les `revalidate_seconds`.
+    """
+
+    def __init__(self, revalidate_seconds: float) -> None:
+        self.revalidate_seconds = revalidate_seconds
+        self._entries: dict[str, _Entry] = {}
+
+    async def get(self, module_id: str) -> Mapping[str, Any]:
+        entry = self._entries.get(module_id)
+        now = time.monotonic()
+        if entry is not None and now - entry.checked_at < self.revalidate_seconds:
+            return entry.snapshot
+
+        async with AsyncSessionLocal() as session:
+            try:
+                if entry is not None:
+                    version = (
+                        await session.execute(select(ModuleConfig.updated_at).where(ModuleConfig.module_id == module_id))
+                    ).scalar_one_or_none()
+                    if version == entry.version:
+                        entry.checked_at = now
+                        return entry.snapshot
+
+                row = (
+                    await session.execute(select(ModuleConfig).where(ModuleConfig.module_id == module_id))
+                ).scalar_one_or_none()
+            except OperationalError:
+                row = None
+
+        if row is None:
+            entry = _Entry(snapshot=_EMPTY, version=None, checked_at=now)
+        else:
+            entry = _Entry(snapshot=freeze(row.config_json or {}), version=row.updated_at, checked_at=now)
+        self._entries[module_id] = entry
+        return entry.snapshot
+
+    def invalidate(self, module_id: str | None = None) -> None:
+        if module_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(module_id, None)
+
+
+module_config_cache = ModuleConfigCache(revalidate_seconds=get_settings().module_config_revalidate_seconds)
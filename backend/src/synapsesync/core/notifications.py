@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from synapsesync.core.cache import widget_cache
+from synapsesync.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Notification:
+    id: int
+    event: str
+    data: dict[str, Any]
+
+
+@dataclass(eq=False)
+class Subscription:
+    """File bornée d'un client ; `dropped` passe à True si le client ne suit pas le rythme."""
+
+    queue: asyncio.Queue[Notification]
+    module_ids: frozenset[str] | None = None
+    dropped: bool = False
+
+    def wants(self, notification: Notification) -> bool:
+        return self.module_ids is None or notification.data.get("module_id") in self.module_ids
+
+    async def next(self, timeout: float) -> Notification | None:
+        """Prochaine notification, ou `None` après `timeout` secondes (heartbeat)."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class NotificationBus:
+    """Pub/sub en mémoire (process courant) vers les clients SSE.
+
+    `publish` ne bloque jamais : un client dont la file est pleine est déconnecté (il se reconnecte
+    et recharge tout) plutôt que de ralentir la sync ou de faire grossir la mémoire.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: set[Subscription] = set()
+        self._ids = itertools.count(1)
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, module_ids: Iterable[str] | None = None, max_queue: int | None = None) -> Subscription:
+        size = max_queue or get_settings().sse_queue_size
+        sub = Subscription(queue=asyncio.Queue(maxsize=size), module_ids=frozenset(module_ids) if module_ids else None)
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._subscribers.discard(sub)
+
+    def publish(self, event: str, data: dict[str, Any]) -> Notification:
+        notification = Notification(id=next(self._ids), event=event, data=data)
+        self.published += 1
+        for sub in list(self._subscribers):
+            if not sub.wants(notification):
+                continue
+            try:
+                sub.queue.put_nowait(notification)
+            except asyncio.QueueFull:
+                logger.warning("Dropping slow SSE consumer (%d pending notifications)", sub.queue.qsize())
+                sub.dropped = True
+                self._subscribers.discard(sub)
+                self.dropped += 1
+        return notification
+
+    def stats(self) -> dict[str, int]:
+        return {"subscribers": len(self._subscribers), "published": self.published, "dropped": self.dropped}
+
+
+notification_bus = NotificationBus()
+
+
+def notify_module_updated(module_id: str, *, inserted: int, widgets: Iterable[str], source: str) -> None:
+    """Invalide le cache des widgets du module puis prévient les clients (qui rechargent ces widgets).
+
+    L'invalidation passe avant la publication : un client qui recharge aussitôt ne relit pas l'ancien cache.
+    """
+    widget_cache.invalidate_module(module_id)
+    notification_bus.publish(
+        "module_synced",
+        {
+            "module_id": module_id,
+            "inserted": inserted,
+            "widgets": sorted(widgets),
+            "source": source,
+            "at": datetime.now(tz=timezone.utc).isoformat(),
+        },
+    )
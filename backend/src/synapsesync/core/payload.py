@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import json
+import zlib
+from typing import Any
+
+from synapsesync.core.config import get_settings
+
+try:
+    import zstandard
+except ImportError:  # dépendance optionnelle (extra `fast`) : repli zlib
+    zstandard = None  # type: ignore[assignment]
+
+# Le codec se reconnaît à l'en-tête du blob : pas de colonne dédiée, et les deux formats cohabitent.
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _codec() -> str:
+    codec = get_settings().payload_codec
+    if codec == "auto":
+        return "zstd" if zstandard is not None else "zlib"
+    if codec == "zstd" and zstandard is None:
+        raise RuntimeError("payload_codec=zstd requires the 'zstandard' package")
+    return codec
+
+
+def compress_payload(value: dict[str, Any] | None) -> bytes | None:
+    """JSON compact compressé (zstd si disponible, sinon zlib)."""
+    if value is None:
+        return None
+    raw = json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+    if _codec() == "zstd":
+        return zstandard.ZstdCompressor(level=get_settings().payload_compression_level).compress(raw)
+    return zlib.compress(raw, get_settings().payload_compression_level)
+
+
+def decompress_payload(blob: bytes | None) -> Any:
+    if blob is None:
+        return None
+    if blob[:4] == _ZSTD_MAGIC:
+        if zstandard is None:
+            raise RuntimeError("Event payload is zstd-compressed but 'zstandard' is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(blob)
+    else:
+        raw = zlib.decompress(blob)
+    return json.loads(raw)
@@ -0,0 +1,437 @@
+"""Profilage à la demande d'une requête HTTP ou d'une sync, déclenché par un jeton d'administration.
+
+Inactif tant que `SYNAPSESYNC_PROFILER_TOKEN` n'est pas défini : ni middleware ni hooks SQL ne sont
+alors installés. Une fois le jeton défini, seule une requête qui le porte (en-tête `X-Profile-Token`
+ou paramètre `?_profile=`) est profilée ; les autres ne paient qu'un parcours des en-têtes, plus une
+lecture de contextvar par requête SQL.
+
+- Échantillonnage (`sys._current_frames`, thread dédié, toutes les `profiler_interval_ms`) de la tâche
+  asyncio profilée : sa pile réelle quand elle s'exécute, sa chaîne d'`await` quand elle attend (appel
+  GitHub, SQLite async…) ; les tâches qu'elle attend (`gather`, tâche attendue) sont suivies. Les
+  threads de travail (`asyncio.to_thread`, endpoints synchrones) occupés pendant la session sont
+  échantillonnés sous `[worker thread]`, sans attribution (ils peuvent servir une autre requête).
+- SQL : contextvar propagée aux tâches et threads lancés par la requête ; nombre, durée totale et
+  max. par instruction.
+
+Résultat dans `profiler_dir` : `<id>.folded` (piles repliées, pour `flamegraph.pl` ou speedscope) et
+`<id>.json` (répartition SQL / ORM / HTTP / JSON, fonctions les plus présentes, instructions SQL),
+consultables via `/api/profiles`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hmac
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any
+from urllib.parse import parse_qs
+
+from sqlalchemy import Engine, event
+from starlette.responses import JSONResponse
+
+from synapsesync.core.config import data_dir, get_settings
+from synapsesync.core.metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+TOKEN_HEADER = b"x-profile-token"
+TOKEN_PARAM = "_profile"
+PROFILE_ID_RE = re.compile(r"^[0-9A-Za-z_-]+$")
+
+# Répartition du temps : catégorie du premier cadre reconnu en partant du sommet de la pile.
+CATEGORIES: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("orm", ("sqlalchemy/orm/",)),
+    ("sql", ("sqlalchemy/", "aiosqlite/", "sqlite3/")),
+    ("http", ("httpx/", "httpcore/", "h11/", "h2/")),
+    ("json", ("json/", "orjson", "core/responses.py", "fastapi/encoders.py")),
+)
+_WORKER_THREAD_PREFIXES = ("asyncio_", "AnyIO worker")
+_IDLE_FILES = ("threading.py", "queue.py", "concurrent/futures/thread.py")
+_MAX_DEPTH = 256
+
+_current: ContextVar[ProfileSession | None] = ContextVar("synapsesync_profile", default=None)
+
+
+def profiles_dir() -> Path:
+    configured = get_settings().profiler_dir
+    return Path(configured) if configured else data_dir() / "profiles"
+
+
+def new_profile_id() -> str:
+    return f"{datetime.now(tz=timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+
+def check_token(candidate: str | None) -> bool:
+    token = get_settings().profiler_token
+    if not token or candidate is None:
+        return False
+    return hmac.compare_digest(candidate.encode(), token.encode())
+
+
+def current_session() -> ProfileSession | None:
+    """Profil de la requête en cours (propagé aux tâches et threads qu'elle lance), sinon `None`."""
+    return _current.get()
+
+
+# --- Libellés de pile -------------------------------------------------------------------------
+
+
+@lru_cache
+def _path_prefixes() -> tuple[str, ...]:
+    # Le plus long d'abord : `site-packages/` l'emporte sur le dossier de la bibliothèque standard.
+    return tuple(sorted({os.path.abspath(p) for p in sys.path if p}, key=len, reverse=True))
+
+
+def _short_path(filename: str) -> str:
+    for prefix in _path_prefixes():
+        if filename.startswith(prefix + os.sep):
+            return filename[len(prefix) + 1 :].replace("\\", "/")
+    return os.path.basename(filename)
+
+
+_labels: dict[CodeType, str] = {}
+
+
+def _label(code: CodeType) -> str:
+    label = _labels.get(code)
+    if label is None:
+        name = getattr(code, "co_qualname", code.co_name)
+        label = f"{name} ({_short_path(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+        _labels[code] = label
+    return label
+
+
+def _frame_labels(frame: FrameType | None, stop: FrameType | None = None) -> tuple[str, ...] | None:
+    """Libellés de la racine au sommet ; avec `stop`, la pile est coupée à ce cadre (`None` s'il est absent)."""
+    labels: list[str] = []
+    while frame is not None and len(labels) < _MAX_DEPTH:
+        labels.append(_label(frame.f_code))
+        if frame is stop:
+            break
+        frame = frame.f_back
+    else:
+        if stop is not None:
+            return None
+    labels.reverse()
+    return tuple(labels)
+
+
+def _await_chain(coro: Any) -> list[FrameType]:
+    """Cadres des coroutines imbriquées par `await`, de la plus externe à celle qui attend."""
+    frames: list[FrameType] = []
+    while coro is not None and len(frames) < _MAX_DEPTH:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) if hasattr(coro, "cr_await") else getattr(coro, "gi_yieldfrom", None)
+    return frames
+
+
+def _category(stack: Sequence[str]) -> str:
+    for label in reversed(stack):
+        for name, markers in CATEGORIES:
+            if any(marker in label for marker in markers):
+                return name
+    return "other"
+
+
+# --- Session et échantillonnage ---------------------------------------------------------------
+
+
+class ProfileSession:
+    """Profil en cours d'une tâche asyncio (requête ou sync), alimenté par le thread d'échantillonnage."""
+
+    def __init__(self, kind: str, label: str, task: asyncio.Task[Any], profile_id: str | None = None) -> None:
+        self.id = profile_id or new_profile_id()
+        self.kind = kind
+        self.label = label
+        self.task = task
+        self.loop_thread_id = threading.get_ident()
+        self.started_at = datetime.now(tz=timezone.utc)
+        self.duration_s: float | None = None
+        self.extra: dict[str, Any] = {}
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+        self.states: Counter[str] = Counter()
+        # Instruction SQL -> [nombre, durée totale, durée max.]
+        self.sql: dict[str, list[float]] = {}
+        self._sql_lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def record_sql(self, statement: str, elapsed: float) -> None:
+        with self._sql_lock:
+            stats = self.sql.get(statement)
+            if stats is None:
+                self.sql[statement] = [1, elapsed, elapsed]
+            else:
+                stats[0] += 1
+                stats[1] += elapsed
+                stats[2] = max(stats[2], elapsed)
+
+    def sample(self, frames: dict[int, FrameType], thread_names: dict[int | None, str]) -> None:
+        if not self.task.done():
+            self._visit(self.task, (), frames.get(self.loop_thread_id), 0)
+        for thread_id, frame in frames.items():
+            name = thread_names.get(thread_id, "")
+            if thread_id == self.loop_thread_id or not name.startswith(_WORKER_THREAD_PREFIXES):
+                continue
+            if frame.f_code.co_filename.replace("\\", "/").endswith(_IDLE_FILES):
+                continue
+            labels = _frame_labels(frame)
+            if labels:
+                self.stacks[("[worker thread]", *labels)] += 1
+                self.states["worker_thread"] += 1
+
+    def _visit(self, task: asyncio.Task[Any], prefix: tuple[str, ...], loop_frame: FrameType | None, depth: int) -> None:
+        coro = task.get_coro()
+        if getattr(coro, "cr_running", False):
+            # La tâche s'exécute : pile réelle du thread de la boucle, coupée au cadre de sa coroutine.
+            labels = _frame_labels(loop_frame, coro.cr_frame) if loop_frame is not None else None
+            if labels is not None:
+                self.stacks[prefix + labels] += 1
+                self.states["running"] += 1
+            return
+
+        path = prefix + tuple(_label(frame.f_code) for frame in _await_chain(coro))
+        waiter = getattr(task, "_fut_waiter", None)
+        children = [waiter] if isinstance(waiter, asyncio.Task) else list(getattr(waiter, "_children", None) or ())
+        pending = [child for child in children if isinstance(child, asyncio.Task) and not child.done()]
+        if pending and depth < 32:
+            for child in pending:
+                self._visit(child, path, loop_frame, depth + 1)
+        elif len(path) > len(prefix):
+            self.stacks[path + ("[await]",)] += 1
+            self.states["awaiting"] += 1
+
+    def summary(self) -> dict[str, Any]:
+        total = sum(self.stacks.values())
+        categories: Counter[str] = Counter()
+        leaves: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            categories[_category(stack)] += count
+            leaves[f"{stack[-2]} [await]" if stack[-1] == "[await]" and len(stack) > 1 else stack[-1]] += count
+        with self._sql_lock:
+            statements = sorted(self.sql.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "label": self.label,
+            "started_at": self.started_at.isoformat(),
+            "duration_s": self.duration_s,
+            "interval_ms": get_settings().profiler_interval_ms,
+            **self.extra,
+            "samples": {"total": total, **self.states},
+            "breakdown": {name: round(count / total, 3) for name, count in categories.most_common()} if total else {},
+            "top_functions": [
+                {"function": name, "samples": count, "share": round(count / total, 3)}
+                for name, count in leaves.most_common(25)
+            ],
+            "sql": {
+                "queries": int(sum(stats[0] for _, stats in statements)),
+                "total_s": round(sum(stats[1] for _, stats in statements), 6),
+                "statements": [
+                    {"sql": sql, "count": int(stats[0]), "total_s": round(stats[1], 6), "max_s": round(stats[2], 6)}
+                    for sql, stats in statements[:50]
+                ],
+            },
+        }
+
+    def folded(self) -> str:
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class _Sampler:
+    """Thread d'échantillonnage partagé, lancé à la première session et arrêté après la dernière."""
+
+    def __init__(self) -> None:
+        self._sessions: set[ProfileSession] = set()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def add(self, session: ProfileSession) -> None:
+        with self._lock:
+            self._sessions.add(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="synapsesync-profiler", daemon=True)
+                self._thread.start()
+
+    def remove(self, session: ProfileSession) -> None:
+        with self._lock:
+            self._sessions.discard(session)
+
+    def _loop(self) -> None:
+        while True:
+            with self._lock:
+                sessions = list(self._sessions)
+                if not sessions:
+                    self._thread = None
+                    return
+            frames = sys._current_frames()
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for session in sessions:
+                try:
+                    session.sample(frames, thread_names)
+                except Exception:  # pile modifiée pendant la lecture : échantillon perdu
+                    logger.debug("Profiler sample dropped", exc_info=True)
+            del frames
+            time.sleep(get_settings().profiler_interval_ms / 1000)
+
+
+_sampler = _Sampler()
+
+
+@asynccontextmanager
+async def profile_task(kind: str, label: str, profile_id: str | None = None) -> AsyncIterator[ProfileSession]:
+    """Profile la tâche asyncio courante pendant le bloc, puis enregistre le profil (même en cas d'erreur)."""
+    task = asyncio.current_task()
+    if task is None:
+        raise RuntimeError("profile_task() must be used from an asyncio task")
+    session = ProfileSession(kind, label, task, profile_id)
+    token = _current.set(session)
+    _sampler.add(session)
+    try:
+        yield session
+    finally:
+        _sampler.remove(session)
+        _current.reset(token)
+        session.duration_s = round(time.perf_counter() - session._start, 6)
+        try:
+            await asyncio.to_thread(save_profile, session)
+        except OSError:
+            logger.exception("Could not store profile %s", session.id)
+
+
+# --- Stockage ---------------------------------------------------------------------------------
+
+
+def save_profile(session: ProfileSession) -> Path:
+    directory = profiles_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{session.id}.folded").write_text(session.folded(), encoding="utf-8")
+    path = directory / f"{session.id}.json"
+    path.write_text(json.dumps(session.summary(), indent=2), encoding="utf-8")
+
+    profiles = sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+    for old in profiles[: max(0, len(profiles) - get_settings().profiler_max_profiles)]:
+        old.unlink(missing_ok=True)
+        old.with_suffix(".folded").unlink(missing_ok=True)
+    return path
+
+
+def list_profiles() -> list[dict[str, Any]]:
+    """Profils enregistrés, du plus récent au plus ancien (sans le détail des fonctions et du SQL)."""
+    directory = profiles_dir()
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for path in sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True):
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        profiles.append(
+            {
+                key: data.get(key)
+                for key in ("id", "kind", "label", "started_at", "duration_s", "status", "samples", "breakdown")
+            }
+            | {"sql_queries": data.get("sql", {}).get("queries")}
+        )
+    return profiles
+
+
+def load_profile(profile_id: str, folded: bool = False) -> dict[str, Any] | str | None:
+    """Résumé JSON du profil (`folded` : piles repliées brutes), `None` s'il n'existe pas."""
+    if not PROFILE_ID_RE.match(profile_id):
+        return None
+    path = profiles_dir() / f"{profile_id}.{'folded' if folded else 'json'}"
+    try:
+        text = path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+    return text if folded else json.loads(text)
+
+
+# --- Hooks SQL et middleware ------------------------------------------------------------------
+
+
+def install_sql_hooks(engine: Engine) -> None:
+    """Chronomètre les requêtes de `engine` exécutées pendant une session de profilage."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(_conn, _cursor, _statement, _parameters, context, _executemany) -> None:
+        if _current.get() is not None:
+            context._profile_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(_conn, _cursor, statement, _parameters, context, _executemany) -> None:
+        session = _current.get()
+        start = getattr(context, "_profile_start", None)
+        if session is not None and start is not None:
+            session.record_sql(statement, time.perf_counter() - start)
+
+
+def _requested_token(scope: dict[str, Any]) -> str | None:
+    for name, value in scope["headers"]:
+        if name == TOKEN_HEADER:
+            return value.decode("latin-1")
+    query_string = scope.get("query_string", b"")
+    if b"_profile=" in query_string:
+        values = parse_qs(query_string.decode("latin-1")).get(TOKEN_PARAM)
+        if values:
+            return values[0]
+    return None
+
+
+class ProfilerMiddleware:
+    """Middleware ASGI : profile les requêtes qui portent le jeton (`X-Profile-Token` ou `?_profile=`).
+
+    La réponse reçoit `X-Profile-Id` ; le profil est enregistré une fois le dernier octet envoyé.
+    Jeton invalide : 403. Les routes de consultation (`/api/profiles`) ne sont jamais profilées.
+    """
+
+    def __init__(self, app: Any, exclude_prefixes: Sequence[str] = ("/api/profiles",)) -> None:
+        self.app = app
+        self.exclude_prefixes = tuple(exclude_prefixes)
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        candidate = _requested_token(scope)
+        if candidate is None or scope["path"].startswith(self.exclude_prefixes):
+            await self.app(scope, receive, send)
+            return
+        if not check_token(candidate):
+            await JSONResponse({"detail": "Invalid profiler token"}, status_code=403)(scope, receive, send)
+            return
+
+        async with profile_task("request", f"{scope['method']} {scope['path']}") as session:
+            session.extra["path"] = scope["path"]
+
+            async def send_wrapper(message: dict[str, Any]) -> None:
+                if message["type"] == "http.response.start":
+                    session.extra["status"] = message["status"]
+                    message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", session.id.encode())]}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = route_template(scope)
+                if route != "unmatched":
+                    session.label = f"{scope['method']} {route}"
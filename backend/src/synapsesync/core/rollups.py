@@ -0,0 +1,88 @@
+"""Agrégats journaliers des événements (`event_daily_rollups`).
+
+Reconstruction complète depuis `events` (ex: après un import hors sync) :
+
+    python -m synapsesync.core.rollups [--module github]
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import Iterable
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from synapsesync.core.database import SessionLocal, dialect_insert
+from synapsesync.core.models import Event, EventDailyRollup
+
+RollupKey = tuple[date, str]
+
+
+def utc_day(ts: datetime) -> date:
+    # SQLite restitue des datetimes naïfs, déjà en UTC.
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc)
+    return ts.date()
+
+
+def count_by_day(rows: Iterable[tuple[datetime, str]]) -> Counter[RollupKey]:
+    return Counter((utc_day(ts), event_type) for ts, event_type in rows)
+
+
+def apply_rollup_deltas(session: Session, module_id: str, deltas: Counter[RollupKey]) -> None:
+    """Ajoute `deltas` aux compteurs existants, dans la transaction de l'appelant."""
+    if not deltas:
+        return
+
+    table = EventDailyRollup.__table__
+    stmt = dialect_insert(session.get_bind().dialect.name, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["module_id", "day", "event_type"],
+        set_={"count": table.c.count + stmt.excluded.count},
+    )
+    session.execute(
+        stmt,
+        [
+            {"module_id": module_id, "day": day, "event_type": event_type, "count": n}
+            for (day, event_type), n in deltas.items()
+        ],
+    )
+
+
+def rebuild_rollups(session: Session, module_id: str | None = None) -> int:
+    """Recalcule les agrégats depuis `events` ; retourne le nombre de lignes d'agrégat écrites."""
+    delete_stmt = delete(EventDailyRollup)
+    if module_id is not None:
+        delete_stmt = delete_stmt.where(EventDailyRollup.module_id == module_id)
+    session.execute(delete_stmt)
+
+    day = func.date(Event.timestamp)
+    source = select(Event.module_id, day, Event.event_type, func.count()).group_by(Event.module_id, day, Event.event_type)
+    if module_id is not None:
+        source = source.where(Event.module_id == module_id)
+
+    result = session.execute(
+        insert(EventDailyRollup).from_select(["module_id", "day", "event_type", "count"], source)
+    )
+    return max(result.rowcount or 0, 0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reconstruit event_daily_rollups depuis events.")
+    parser.add_argument("--module", default=None, help="module_id à reconstruire (défaut : tous)")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        written = rebuild_rollups(session, args.module)
+        session.commit()
+    finally:
+        session.close()
+    print(f"{written} rollup rows written")
+
+
+if __name__ == "__main__":
+    main()
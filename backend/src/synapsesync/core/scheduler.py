@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+
+from synapsesync.core import metrics
+from synapsesync.core.analytics import HAS_PYARROW, export_events
+from synapsesync.core.archive import run_retention
+from synapsesync.core.cache import widget_cache
+from synapsesync.core.config import get_settings
+from synapsesync.core.discovery import registry
+from synapsesync.core.ingest import ingest_progress
+from synapsesync.core.profiler import new_profile_id, profile_task
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SyncJob:
+    """Exécution (manuelle ou planifiée) de `module.sync()`."""
+
+    module_id: str
+    trigger: str  # manual | scheduled
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"  # queued | running | done | failed
+    created_at: datetime = field(default_factory=lambda: datetime.now(tz=timezone.utc))
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    duration_s: float | None = None
+    inserted: int | None = None
+    error: str | None = None
+    profile_id: str | None = None  # sync profilée (`core/profiler.py`)
+
+    def as_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        for key in ("created_at", "started_at", "finished_at"):
+            value = getattr(self, key)
+            data[key] = value.isoformat() if value else None
+        return data
+
+
+class SyncScheduler:
+    """Syncs en tâche de fond : déclenchements manuels + exécutions périodiques (APScheduler).
+
+    Au plus une sync en cours par module (un déclenchement pendant une sync en cours est ignoré
+    ou renvoie le job existant) et au plus `sync_max_concurrency` syncs simultanées au total.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: OrderedDict[str, SyncJob] = OrderedDict()
+        self._active: dict[str, SyncJob] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._semaphore: asyncio.Semaphore | None = None
+        self._scheduler: AsyncIOScheduler | None = None
+        self._retention_lock: asyncio.Lock | None = None
+        self._export_locks: dict[str, asyncio.Lock] = {}
+
+    @staticmethod
+    def interval_for(module_id: str) -> float:
+        settings = get_settings()
+        return settings.sync_intervals.get(module_id, settings.sync_interval_seconds)
+
+    def start(self) -> None:
+        """Planifie les syncs périodiques ; à appeler depuis l'event loop (lifespan)."""
+        settings = get_settings()
+        self._semaphore = asyncio.Semaphore(max(1, settings.sync_max_concurrency))
+        if not settings.scheduler_enabled:
+            return
+
+        scheduler = AsyncIOScheduler(timezone=timezone.utc)
+        for module_id in registry.load_modules():
+            interval = self.interval_for(module_id)
+            if interval <= 0:
+                continue
+            scheduler.add_job(
+                self._run_scheduled,
+                IntervalTrigger(seconds=interval, jitter=settings.sync_jitter_seconds or None),
+                args=[module_id],
+                id=f"sync:{module_id}",
+                max_instances=1,
+                coalesce=True,
+            )
+        if settings.retention_interval_seconds > 0:
+            scheduler.add_job(
+                self.run_retention,
+                IntervalTrigger(seconds=settings.retention_interval_seconds, jitter=settings.sync_jitter_seconds or None),
+                id="retention",
+                max_instances=1,
+                coalesce=True,
+            )
+        scheduler.start()
+        self._scheduler = scheduler
+
+    async def shutdown(self) -> None:
+        if self._scheduler is not None:
+            self._scheduler.shutdown(wait=False)
+            self._scheduler = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def enqueue(self, module_id: str, profile: bool = False) -> SyncJob:
+        """Lance une sync manuelle en tâche de fond (ou renvoie celle en attente ou en cours pour ce module).
+
+        `profile` : la sync est profilée, profil enregistré sous `job.profile_id` à la fin du job.
+        """
+        active = self._active.get(module_id)
+        if active is not None and active.status in ("queued", "running"):
+            return active
+
+        job = self._register(module_id, "manual")
+        if profile:
+            job.profile_id = new_profile_id()
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def run_retention(self, module_id: str | None = None) -> dict[str, Any]:
+        """Passe de rétention (`core/archive.py`) dans un thread ; au plus une à la fois."""
+        if self._retention_lock is None:
+            self._retention_lock = asyncio.Lock()
+        async with self._retention_lock:
+            report = await asyncio.to_thread(run_retention, module_id)
+        for archived_module_id, result in report["modules"].items():
+            if result["events"]:
+                widget_cache.invalidate_module(archived_module_id)
+        if report["archived_events"]:
+            logger.info("Retention archived %d events, freed %d pages", report["archived_events"], report["freed_pages"])
+        return report
+
+    async def run_analytics_export(self, module_id: str, full: bool = False) -> dict[str, Any]:
+        """Export analytique Arrow du module (`core/analytics.py`) dans un thread ; un seul par module."""
+        lock = self._export_locks.setdefault(module_id, asyncio.Lock())
+        async with lock:
+            return await asyncio.to_thread(export_events, module_id, full)
+
+    def get_job(self, job_id: str) -> SyncJob | None:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self, module_id: str | None = None) -> list[SyncJob]:
+        return [j for j in reversed(self._jobs.values()) if module_id is None or j.module_id == module_id]
+
+    def next_run_time(self, module_id: str) -> datetime | None:
+        if self._scheduler is None:
+            return None
+        job = self._scheduler.get_job(f"sync:{module_id}")
+        return None if job is None else job.next_run_time
+
+    def _register(self, module_id: str, trigger: str) -> SyncJob:
+        job = SyncJob(module_id=module_id, trigger=trigger)
+        self._active[module_id] = job
+        self._jobs[job.id] = job
+        while len(self._jobs) > get_settings().sync_job_history:
+            self._jobs.popitem(last=False)
+        return job
+
+    async def _run_scheduled(self, module_id: str) -> None:
+        if module_id in self._active:
+            logger.info("Skipping scheduled sync of %s: previous run still in progress", module_id)
+            return
+        await self._run(self._register(module_id, "scheduled"))
+
+    async def _run(self, job: SyncJob) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, get_settings().sync_max_concurrency))
+
+        try:
+            async with self._semaphore:
+                job.status = "running"
+                job.started_at = datetime.now(tz=timezone.utc)
+                start = time.perf_counter()
+                try:
+                    job.inserted = await self._sync(job)
+                    job.status = "done"
+                except Exception as e:
+                    logger.exception("Sync of %s failed", job.module_id)
+                    job.status = "failed"
+                    job.error = str(e)
+                finally:
+                    elapsed = time.perf_counter() - start
+                    job.duration_s = round(elapsed, 3)
+                    job.finished_at = datetime.now(tz=timezone.utc)
+                    _record_sync_metrics(job, elapsed)
+                    if job.inserted or _committed_partially(job):
+                        widget_cache.invalidate_module(job.module_id)
+        finally:
+            # Libéré avant l'export : une sync demandée pendant l'export démarre aussitôt.
+            if self._active.get(job.module_id) is job:
+                del self._active[job.module_id]
+
+        if job.inserted and HAS_PYARROW and get_settings().analytics_enabled:
+            # Hors du sémaphore : l'export ne retarde pas les syncs des autres modules.
+            try:
+                await self.run_analytics_export(job.module_id)
+            except Exception:
+                logger.exception("Analytics export of %s failed", job.module_id)
+
+    @staticmethod
+    async def _sync(job: SyncJob) -> int:
+        module = await registry.load_module(job.module_id)
+        if job.profile_id is None:
+            return await module.sync()
+        async with profile_task("sync", f"sync {job.module_id}", job.profile_id):
+            return await module.sync()
+
+
+def _committed_partially(job: SyncJob) -> bool:
+    """Sync en échec qui a tout de même commité des chunks (import HPI en streaming) pendant ce job."""
+    if job.status != "failed" or job.started_at is None:
+        return False
+    progress = ingest_progress.get(job.module_id)
+    return progress is not None and progress.started_at >= job.started_at and progress.inserted > 0
+
+
+def _record_sync_metrics(job: SyncJob, elapsed: float) -> None:
+    metrics.sync_duration.observe(elapsed, job.module_id, job.status)
+    if job.inserted:
+        metrics.sync_rows_ingested.inc(job.inserted, job.module_id)
+    if job.status == "done":
+        metrics.sync_last_success.set(job.finished_at.timestamp(), job.module_id)
+
+
+sync_scheduler = SyncScheduler()
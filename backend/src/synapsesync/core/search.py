@@ -0,0 +1,104 @@
+"""Recherche plein texte des événements (table virtuelle SQLite FTS5 `events_fts`).
+
+`events_fts` (rowid = `events.id`) indexe `summary_text` et un texte libre `body` extrait du payload
+par le module (clé `search_body` des lignes passées à `ingest_events`). Le payload étant compressé,
+l'index est alimenté à l'insertion (`index_events`) et non par trigger ; seule la suppression passe
+par un trigger (`events_fts_delete`, migration `0010`).
+
+Reconstruction complète depuis `events` (ex: après un import hors sync) :
+
+    python -m synapsesync.core.search
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+from typing import Iterable, Mapping
+
+from sqlalchemy import column, delete, insert, select, table, text
+from sqlalchemy.orm import Session
+
+from synapsesync.core.database import SessionLocal, iter_batches
+from synapsesync.core.models import Event
+from synapsesync.core.payload import decompress_payload
+
+events_fts = table("events_fts", column("rowid"), column("summary_text"), column("body"))
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_enabled(session: Session) -> bool:
+    """FTS5 n'existe que sous SQLite : ailleurs la recherche est désactivée."""
+    return session.get_bind().dialect.name == "sqlite"
+
+
+def index_events(session: Session, rows: Iterable[tuple[int, str | None, str | None]]) -> None:
+    """Indexe des events `(id, summary_text, body)` déjà insérés. Ne commit pas."""
+    params = [{"rowid": event_id, "summary_text": summary or "", "body": body or ""} for event_id, summary, body in rows]
+    if params:
+        session.execute(insert(events_fts), params)
+
+
+def match_query(q: str, syntax: str = "simple") -> str:
+    """Expression `MATCH` FTS5.
+
+    `simple` : chaque mot devient un terme entre guillemets (ET implicite), le dernier en préfixe
+    (`mot*`) pour la recherche au fil de la frappe ; aucun caractère de la saisie n'est interprété.
+    `fts5` : la saisie est passée telle quelle (`OR`, `NEAR`, `"phrase"`, `summary_text:…`).
+    """
+    if syntax == "fts5":
+        return q
+    terms = _TERM_RE.findall(q)
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def rebuild_index(session: Session, batch_size: int = 1000) -> int:
+    """Vide et reconstruit `events_fts` depuis `events`. Ne commit pas.
+
+    Le `body` est ré-extrait du payload par `module.search_body(metadata)` (modules qui l'exposent).
+    """
+    from synapsesync.core.discovery import registry
+
+    session.execute(delete(events_fts))
+    extractors = {module_id: getattr(module, "search_body", None) for module_id, module in registry.load_modules().items()}
+
+    indexed = 0
+    rows = session.execute(
+        select(Event.id, Event.module_id, Event.summary_text, Event.payload).execution_options(yield_per=batch_size)
+    )
+    for batch in iter_batches(rows, batch_size):
+        entries = []
+        for event_id, module_id, summary, payload in batch:
+            extract = extractors.get(module_id)
+            metadata = decompress_payload(payload) if extract is not None else None
+            # Payload qui n'est pas un objet (possible pour des lignes antérieures à 0009) : pas de body.
+            entries.append((event_id, summary, extract(metadata) if isinstance(metadata, Mapping) else None))
+        index_events(session, entries)
+        indexed += len(entries)
+
+    optimize_index(session)
+    return indexed
+
+
+def optimize_index(session: Session) -> None:
+    """Fusionne les segments de l'index (après un import massif)."""
+    session.execute(text("INSERT INTO events_fts(events_fts) VALUES ('optimize')"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reconstruit l'index plein texte events_fts")
+    parser.parse_args()
+
+    with SessionLocal() as session:
+        indexed = rebuild_index(session)
+        session.commit()
+    print(f"{indexed} events indexed")
+
+
+if __name__ == "__main__":
+    main()
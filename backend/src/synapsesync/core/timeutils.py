@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone, tzinfo
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import case, func
+from sqlalchemy.sql.elements import ColumnElement
+
+from synapsesync.core.config import get_settings
+
+
+def resolve_timezone(name: str | None) -> tzinfo:
+    """Fuseau IANA (ex: `Europe/Paris`) ; `SYNAPSESYNC_DEFAULT_TIMEZONE` si absent."""
+    name = (name or get_settings().default_timezone).strip()
+    if name.upper() == "UTC":
+        return timezone.utc
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        raise ValueError(f"Unknown timezone: {name}") from e
+
+
+def is_utc(tz: tzinfo) -> bool:
+    return tz is timezone.utc or getattr(tz, "key", None) in {"UTC", "Etc/UTC"}
+
+
+def utc_offset_periods(tz: tzinfo, start: datetime, end: datetime) -> list[tuple[datetime | None, int]]:
+    """Découpe `[start, end]` en périodes d'offset UTC constant.
+
+    Retourne `[(fin_utc_exclusive, offset_minutes), ...]`, la dernière période ayant `None` pour fin.
+    Les changements d'heure sont détectés à l'heure près.
+    """
+    start = start.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    end = end.astimezone(timezone.utc)
+
+    def offset_at(moment: datetime) -> int:
+        return int(moment.astimezone(tz).utcoffset().total_seconds() // 60)
+
+    periods: list[tuple[datetime | None, int]] = []
+    current = offset_at(start)
+    moment = start + timedelta(hours=1)
+    while moment <= end:
+        offset = offset_at(moment)
+        if offset != current:
+            periods.append((moment, current))
+            current = offset
+        moment += timedelta(hours=1)
+    periods.append((None, current))
+    return periods
+
+
+def local_date_expr(column: ColumnElement, tz: tzinfo, start: datetime, end: datetime) -> ColumnElement:
+    """Expression SQLite `date(...)` donnant la date locale d'un timestamp UTC stocké, DST compris."""
+    periods = utc_offset_periods(tz, start, end)
+    if len(periods) == 1:
+        return func.date(column, f"{periods[0][1]:+d} minutes")
+
+    *bounded, (_, last_offset) = periods
+    return case(
+        *[(column < until, func.date(column, f"{offset:+d} minutes")) for until, offset in bounded],
+        else_=func.date(column, f"{last_offset:+d} minutes"),
+    )
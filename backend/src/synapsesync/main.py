@@ -1,14 +1,76 @@
-from fastapi import FastAPI
+import time
+
+# Début de l'import de l'app (rapport `GET /__startup`).
+_IMPORT_START = time.perf_counter()
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from synapsesync.api.router import api_router
 from synapsesync.core.config import get_settings
+from synapsesync.core.discovery import registry
+from synapsesync.core.http import close_http_client, open_http_client
+from synapsesync.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from synapsesync.core.metrics import MetricsMiddleware, render as render_metrics
+from synapsesync.core.profiler import ProfilerMiddleware
+from synapsesync.core.responses import FastJSONResponse
+from synapsesync.core.scheduler import sync_scheduler
+
+
+async def _warm_up(app: FastAPI) -> None:
+    # Une étape après l'autre : en parallèle, elles se disputent le GIL avec les premières requêtes.
+    if get_settings().startup_warmup_enabled:
+        await registry.warm_up()
+        # `openapi()` construit l'état (dépendances, modèles de réponse) que FastAPI prépare sinon
+        # route par route à la première requête ; le schéma est ensuite servi tel quel par `/docs`.
+        await asyncio.to_thread(app.openapi)
+    # Utile aux syncs seulement : en dernier.
+    await open_http_client()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    start = time.perf_counter()
+    sync_scheduler.start()
+    # Client HTTP et modules préparés en tâche de fond : le worker accepte des requêtes sans attendre.
+    warm_up = asyncio.create_task(_warm_up(app))
+    app.state.startup_ms = round((time.perf_counter() - start) * 1000, 2)
+    try:
+        yield
+    finally:
+        warm_up.cancel()
+        await asyncio.gather(warm_up, return_exceptions=True)
+        await sync_scheduler.shutdown()
+        await close_http_client()
 
 
 def create_app() -> FastAPI:
     settings = get_settings()
 
-    app = FastAPI(title="SynapseSync")
+    app = FastAPI(title="SynapseSync", lifespan=lifespan, default_response_class=FastJSONResponse)
+
+    if settings.compression_enabled:
+        try:
+            from brotli_asgi import BrotliMiddleware  # type: ignore
+        except ImportError:
+            app.add_middleware(
+                GZipMiddleware,
+                minimum_size=settings.compression_minimum_size,
+                compresslevel=settings.gzip_compresslevel,
+            )
+        else:
+            # Brotli si le client l'accepte, gzip sinon.
+            app.add_middleware(
+                BrotliMiddleware,
+                quality=settings.brotli_quality,
+                minimum_size=settings.compression_minimum_size,
+                gzip_fallback=True,
+            )
 
     app.add_middleware(
         CORSMiddleware,
@@ -18,12 +80,26 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    if settings.metrics_enabled:
+        # Ajouté en dernier : enveloppe CORS et compression, mesure la requête complète.
+        app.add_middleware(MetricsMiddleware)
+
+    if settings.profiler_token:
+        # Tout à l'extérieur : le profil couvre la pile complète, métriques et compression comprises.
+        app.add_middleware(ProfilerMiddleware)
+
     app.include_router(api_router, prefix="/api")
 
     @app.get("/health")
     async def health() -> dict:
         return {"status": "ok"}
 
+    if settings.metrics_enabled:
+
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics() -> Response:
+            return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
     @app.get("/__routes")
     async def list_routes() -> list[dict]:
         routes: list[dict] = []
@@ -32,7 +108,17 @@ def create_app() -> FastAPI:
             routes.append({"path": getattr(r, "path", None), "name": getattr(r, "name", None), "methods": methods})
         return routes
 
+    @app.get("/__startup")
+    async def startup_report() -> dict:
+        # Démarrage du worker : import de l'app, lifespan, découverte et chargement des modules.
+        return {
+            "import_ms": getattr(app.state, "import_ms", None),
+            "startup_ms": getattr(app.state, "startup_ms", None),
+            **registry.report(),
+        }
+
     return app
 
 
 app = create_app()
+app.state.import_ms = round((time.perf_counter() - _IMPORT_START) * 1000, 2)
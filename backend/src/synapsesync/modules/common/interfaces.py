@@ -11,6 +11,8 @@ class WidgetDescriptor(BaseModel):
     visual_type: str
     description: str | None = None
     config_schema: dict[str, Any] = Field(default_factory=dict)
+    # Durée de vie (secondes) des données en cache ; None = défaut global, 0 = pas de cache.
+    cache_ttl: float | None = None
 
 
 class WidgetData(BaseModel):
@@ -21,7 +23,8 @@ class WidgetData(BaseModel):
 class BaseModule(Protocol):
     id: str
 
-    async def sync(self) -> None:
+    async def sync(self) -> int:
+        """Synchronise la source et retourne le nombre de nouveaux événements insérés."""
         ...
 
     def get_widgets(self) -> list[WidgetDescriptor]:
@@ -1,39 +1,74 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
-from typing import Any
+import asyncio
+import hashlib
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import Any, Callable, Iterable, Iterator, Mapping
+from urllib.parse import urlparse
 
-import httpx
 from sqlalchemy import func, select
 from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from synapsesync.core.archive import archived_local_dates, retention_cutoff
 from synapsesync.core.config import get_settings
-from synapsesync.core.database import SessionLocal
-from synapsesync.core.models import Event, ModuleConfig
+from synapsesync.core.database import AsyncSessionLocal, retry_on_locked
+from synapsesync.core.discovery import import_optional
+from synapsesync.core.http import get_http_client
+from synapsesync.core.ingest import begin_ingest, ingest_events, stream_ingest
+from synapsesync.core.models import Event, EventArchiveSegment, EventDailyRollup, GitHubRepoLanguages, ModuleSyncState
+from synapsesync.core.module_config import module_config_cache
+from synapsesync.core.notifications import notify_module_updated
+from synapsesync.core.timeutils import is_utc, local_date_expr, resolve_timezone
 from synapsesync.modules.common.interfaces import WidgetData, WidgetDescriptor
 
+# Source du checkpoint de reprise de l'import HPI (cf. `stream_ingest`).
+HPI_SOURCE = "hpi:my.github.all"
 
-class GitHubModule:
-    id = "github"
 
-    def _get_config(self) -> dict[str, Any]:
-        session = SessionLocal()
-        try:
-            try:
-                row = session.execute(select(ModuleConfig).where(ModuleConfig.module_id == self.id)).scalar_one_or_none()
-            except OperationalError:
-                row = None
+def load_hpi_events() -> Callable[[], Iterable[Any]]:
+    """`my.github.all.get_events`, importé une fois pour toutes dès que l'import réussit (`import_optional`).
+
+    Lève `RuntimeError` avec un message exploitable si HPI est absent ou non configuré.
+    """
+    try:
+        return import_optional("my.github.all").get_events
+    except Exception as e:
+        # More specific error message for missing dependencies
+        if "No module named 'ghexport'" in str(e):
+            raise RuntimeError("HPI GitHub module requires 'ghexport'. Install it or switch to provider=api.") from e
+        elif "my.config" in str(e):
+            raise RuntimeError("HPI not configured. Run 'hpi config create' or switch to provider=api.") from e
+        else:
+            raise RuntimeError(f"HPI import failed: {e}. Install HPI or switch to provider=api.") from e
 
-            if row is not None:
-                return row.config_json or {}
-        finally:
-            session.close()
 
-        return {}
+def api_external_id(ev: Mapping[str, Any]) -> str:
+    """`id` d'un event de l'API ; à défaut, clé stable dérivée du type, du repo, de l'acteur et de `created_at`.
+
+    Une ligne sans `external_id` échapperait à l'index unique `(module_id, external_id)` (NULL) et serait
+    réinsérée à chaque sync.
+    """
+    if ev.get("id") is not None:
+        return str(ev["id"])
+    parts = (ev.get("type"), (ev.get("repo") or {}).get("name"), (ev.get("actor") or {}).get("login"), ev.get("created_at"))
+    return "sha256:" + hashlib.sha256("\x1f".join(str(p) for p in parts).encode()).hexdigest()[:32]
+
+
+class GitHubModule:
+    id = "github"
+
+    # Champs du payload exportés en colonnes pour les agrégations (cf. `core/analytics.py`).
+    analytics_fields = {
+        "action": ("payload.action", "string"),
+        "commit_count": ("payload.size", "int64"),
+    }
 
+    async def _get_config(self) -> Mapping[str, Any]:
+        return await module_config_cache.get(self.id)
 
-    def _get_credentials(self) -> tuple[str | None, str | None]:
-        cfg = self._get_config()
+    async def _get_credentials(self) -> tuple[str | None, str | None]:
+        cfg = await self._get_config()
         username = (cfg.get("username") or "").strip() or None
         token = (cfg.get("token") or "").strip() or None
         if username:
@@ -42,109 +77,245 @@ class GitHubModule:
         settings = get_settings()
         return settings.github_username, settings.github_token
 
-    async def sync(self) -> None:
-        cfg = self._get_config()
+    async def warm_up(self) -> None:
+        """Préchargement au démarrage (`registry.warm_up`) : import HPI si c'est le provider configuré."""
+        cfg = await self._get_config()
+        if (cfg.get("provider") or "api").strip().lower() == "hpi":
+            await asyncio.to_thread(load_hpi_events)
+
+    async def sync(self) -> int:
+        cfg = await self._get_config()
         provider = (cfg.get("provider") or "api").strip().lower()
 
         if provider == "hpi":
-            try:
-                from my.github.all import get_events  # type: ignore
-            except Exception as e:
-                # More specific error message for missing dependencies
-                if "No module named 'ghexport'" in str(e):
-                    raise RuntimeError("HPI GitHub module requires 'ghexport'. Install it or switch to provider=api.") from e
-                elif "my.config" in str(e):
-                    raise RuntimeError("HPI not configured. Run 'hpi config create' or switch to provider=api.") from e
-                else:
-                    raise RuntimeError(f"HPI import failed: {e}. Install HPI or switch to provider=api.") from e
-
-            session = SessionLocal()
-            try:
-                inserted = 0
-                first_error: Exception | None = None
+            get_events = await asyncio.to_thread(load_hpi_events)
+
+            first_error: Exception | None = None
+            seen = 0
+
+            def items() -> Iterator[Any]:
                 try:
-                    for item in get_events():
-                        if isinstance(item, Exception):
-                            if first_error is None:
-                                first_error = item
-                            continue
-
-                        session.add(
-                            Event(
-                                timestamp=item.dt,
-                                module_id=self.id,
-                                event_type="hpi",
-                                summary_text=item.summary,
-                                metadata_json={
-                                    "provider": "hpi",
-                                    "eid": item.eid,
-                                    "link": item.link,
-                                    "body": item.body,
-                                },
-                            )
-                        )
-                        inserted += 1
+                    yield from get_events()
                 except ValueError as e:
                     # HPI n'a pas de données (max() arg is an empty sequence)
                     if "max() arg is an empty sequence" in str(e):
                         # Normal, HPI est vide, on continue avec 0 événement
-                        pass
-                    else:
-                        raise
-
-                if inserted == 0 and first_error is not None:
-                    raise RuntimeError(str(first_error))
-
-                session.commit()
-            finally:
-                session.close()
-
-            return
-
-        username, token = self._get_credentials()
+                        return
+                    raise
+
+            def to_row(item: Any) -> dict[str, Any] | None:
+                nonlocal first_error, seen
+                if isinstance(item, Exception):
+                    if first_error is None:
+                        first_error = item
+                    return None
+
+                seen += 1
+                return {
+                    "timestamp": item.dt,
+                    "module_id": self.id,
+                    "event_type": "hpi",
+                    "summary_text": item.summary,
+                    "external_id": str(item.eid),
+                    "repo_name": self._repo_from_link(item.link),
+                    "search_body": item.body,
+                    "metadata_json": {
+                        "provider": "hpi",
+                        "eid": item.eid,
+                        "link": item.link,
+                        "body": item.body,
+                    },
+                }
+
+            progress = begin_ingest(self.id, HPI_SOURCE)
+            # Lecture des exports HPI et commits par chunks dans un thread : l'event loop reste libre.
+            inserted = await asyncio.to_thread(
+                stream_ingest, progress, items(), to_row, not_before=retention_cutoff(cfg)
+            )
+
+            if seen == 0 and first_error is not None:
+                raise RuntimeError(str(first_error))
+
+            if inserted:
+                notify_module_updated(self.id, inserted=inserted, widgets=self._affected_widgets({"hpi"}), source="hpi")
+            return inserted
+
+        username, token = await self._get_credentials()
         if not username:
-            return
+            return 0
 
         # NOTE: GitHub events endpoint is /users/{username}/events.
         # If authenticated as that user, it can include private events.
+        settings = get_settings()
         url = f"https://api.github.com/users/{username}/events"
         headers: dict[str, str] = {"Accept": "application/vnd.github+json"}
         if token:
             headers["Authorization"] = f"Bearer {token}"
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.get(url, headers=headers, params={"per_page": 30})
+        state = await self._get_sync_state()
+        if state is not None and state.source != url:
+            # Username changé : le curseur et l'ETag ne s'appliquent plus.
+            state = None
+
+        first_page_headers = dict(headers)
+        if state is not None and state.etag:
+            first_page_headers["If-None-Match"] = state.etag
+
+        client = get_http_client()
+        events: list[dict[str, Any]] = []
+        resp = await client.get(url, headers=first_page_headers, params={"per_page": settings.github_events_per_page})
+        if resp.status_code == 304:
+            # Rien de nouveau depuis la dernière sync (et un 304 ne consomme pas de rate limit).
+            return 0
+        resp.raise_for_status()
+        etag = resp.headers.get("ETag")
+
+        pages = 1
+        while True:
+            page: list[dict[str, Any]] = resp.json()
+            reached_seen = False
+            for ev in page:
+                if self._is_already_synced(ev, state):
+                    reached_seen = True
+                    break
+                events.append(ev)
+
+            next_url = resp.links.get("next", {}).get("url")
+            if reached_seen or not next_url or pages >= settings.github_events_max_pages:
+                break
+
+            resp = await client.get(next_url, headers=headers)
             resp.raise_for_status()
-            events: list[dict[str, Any]] = resp.json()
-
-        session = SessionLocal()
-        try:
-            for ev in events:
-                created_at = ev.get("created_at")
-                if not created_at:
-                    continue
-
-                ts = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
-                repo_name = (ev.get("repo") or {}).get("name")
-                ev_type = ev.get("type") or "event"
-
-                summary = f"{username}: {ev_type}"
-                if repo_name:
-                    summary = f"{summary} ({repo_name})"
-
-                session.add(
-                    Event(
-                        timestamp=ts,
-                        module_id=self.id,
-                        event_type=ev_type,
-                        summary_text=summary,
-                        metadata_json=ev,
-                    )
-                )
+            pages += 1
 
-            session.commit()
-        finally:
-            session.close()
+        rows = [row for row in (self.event_row(ev, username) for ev in events) if row is not None]
+
+        newest = max(rows, key=lambda r: r["timestamp"], default=None)
+
+        async def write() -> int:
+            async with AsyncSessionLocal() as session:
+                inserted = await session.run_sync(ingest_events, self.id, rows, not_before=retention_cutoff(cfg))
+                await self._save_sync_state(
+                    session,
+                    source=url,
+                    etag=etag,
+                    cursor_external_id=newest["external_id"] if newest else (state.cursor_external_id if state else None),
+                    cursor_timestamp=newest["timestamp"] if newest else (state.cursor_timestamp if state else None),
+                )
+                await session.commit()
+                return inserted
+
+        # Transaction rejouable : `rows` est une liste, pas un itérateur consommé.
+        inserted = await retry_on_locked(write)
+        if inserted:
+            event_types = {r["event_type"] for r in rows}
+            notify_module_updated(self.id, inserted=inserted, widgets=self._affected_widgets(event_types), source="api")
+        return inserted
+
+    def event_row(self, ev: Mapping[str, Any], username: str) -> dict[str, Any] | None:
+        """Ligne `events` d'un event de l'API (`/users/{username}/events`) ; `None` sans `created_at`."""
+        created_at = ev.get("created_at")
+        if not created_at:
+            return None
+
+        ts = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+        repo_name = (ev.get("repo") or {}).get("name")
+        ev_type = ev.get("type") or "event"
+
+        summary = f"{username}: {ev_type}"
+        if repo_name:
+            summary = f"{summary} ({repo_name})"
+
+        return {
+            "timestamp": ts,
+            "module_id": self.id,
+            "event_type": ev_type,
+            "summary_text": summary,
+            "external_id": api_external_id(ev),
+            "repo_name": repo_name,
+            "actor": (ev.get("actor") or {}).get("login"),
+            "ref": (ev.get("payload") or {}).get("ref"),
+            "search_body": self.search_body(ev),
+            "metadata_json": ev,
+        }
+
+    @staticmethod
+    def _repo_from_link(link: str | None) -> str | None:
+        """`owner/repo` d'un lien HPI (`https://github.com/owner/repo/...`)."""
+        if not link:
+            return None
+        url = urlparse(link)
+        parts = [p for p in url.path.split("/") if p]
+        if not url.netloc.endswith("github.com") or len(parts) < 2:
+            return None
+        return f"{parts[0]}/{parts[1]}"
+
+    @staticmethod
+    def search_body(metadata: Mapping[str, Any]) -> str | None:
+        """Texte indexé pour la recherche plein texte (`events_fts.body`) à partir du payload brut.
+
+        HPI : `body` de l'event ; API : messages de commits, titres/corps d'issues, PR, commentaires, releases.
+        """
+        if metadata.get("provider") == "hpi":
+            return metadata.get("body")
+
+        payload = metadata.get("payload") or {}
+        parts = [c.get("message") for c in payload.get("commits") or []]
+        for key in ("issue", "pull_request", "comment", "review", "release"):
+            obj = payload.get(key) or {}
+            parts += [obj.get("title"), obj.get("name"), obj.get("body")]
+        parts.append(payload.get("description"))
+        return "\n".join(p for p in parts if isinstance(p, str) and p) or None
+
+    @staticmethod
+    def _affected_widgets(event_types: set[str]) -> set[str]:
+        """Widgets dont les données dépendent des events insérés (`languages_usage` vient de l'API repos)."""
+        widgets = {"recent_activity", "events_7d"}
+        if "PushEvent" in event_types:
+            widgets |= {"commit_streak", "commit_streak_history"}
+        return widgets
+
+    async def _get_sync_state(self) -> ModuleSyncState | None:
+        async with AsyncSessionLocal() as session:
+            try:
+                return (
+                    await session.execute(select(ModuleSyncState).where(ModuleSyncState.module_id == self.id))
+                ).scalar_one_or_none()
+            except OperationalError:
+                return None
+
+    async def _save_sync_state(self, session: AsyncSession, **values: Any) -> None:
+        row = await session.get(ModuleSyncState, self.id)
+        if row is None:
+            row = ModuleSyncState(module_id=self.id)
+            session.add(row)
+        for key, value in values.items():
+            setattr(row, key, value)
+        row.updated_at = datetime.now(tz=timezone.utc)
+
+    @staticmethod
+    def _is_already_synced(ev: dict[str, Any], state: ModuleSyncState | None) -> bool:
+        """Indique si l'event (renvoyé du plus récent au plus ancien) est antérieur au curseur."""
+        if state is None or (state.cursor_external_id is None and state.cursor_timestamp is None):
+            return False
+
+        ev_id = api_external_id(ev)
+        if state.cursor_external_id is not None:
+            if ev_id == state.cursor_external_id:
+                return True
+            # Les ids d'events GitHub sont numériques et croissants.
+            if ev_id.isdigit() and state.cursor_external_id.isdigit():
+                return int(ev_id) < int(state.cursor_external_id)
+
+        created_at = ev.get("created_at")
+        if created_at and state.cursor_timestamp is not None:
+            ts = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+            cursor_ts = state.cursor_timestamp
+            if cursor_ts.tzinfo is None:
+                cursor_ts = cursor_ts.replace(tzinfo=timezone.utc)
+            return ts < cursor_ts
+
+        return False
 
     def get_widgets(self) -> list[WidgetDescriptor]:
         return [
@@ -163,24 +334,30 @@ class GitHubModule:
                 title="Commit Streak",
                 visual_type="counter",
             ),
+            WidgetDescriptor(
+                id="commit_streak_history",
+                title="Commit Streaks (historique)",
+                visual_type="timeline",
+            ),
             WidgetDescriptor(
                 id="languages_usage",
                 title="Languages Usage",
                 visual_type="pie",
+                cache_ttl=3600,
             ),
         ]
 
     async def get_widget_data(self, widget_id: str, params: dict[str, Any]) -> WidgetData:
-        session = SessionLocal()
-        try:
+        async with AsyncSessionLocal() as session:
             if widget_id == "recent_activity":
                 limit = int(params.get("limit", 30))
-                rows = session.execute(
-                    select(Event)
+                # Colonnes projetées : pas de chargement de `metadata_json` pour une timeline.
+                rows = await session.execute(
+                    select(Event.timestamp, Event.summary_text, Event.event_type)
                     .where(Event.module_id == self.id)
                     .order_by(Event.timestamp.desc())
                     .limit(limit)
-                ).scalars()
+                )
 
                 data = [
                     {
@@ -197,42 +374,62 @@ class GitHubModule:
                 now = datetime.now(tz=timezone.utc)
                 since = now - timedelta(days=7)
 
-                count = session.execute(
-                    select(func.count())
-                    .select_from(Event)
-                    .where(Event.module_id == self.id)
-                    .where(Event.timestamp >= since)
+                # Jours complets depuis les agrégats, jour partiel du début de fenêtre depuis `events`.
+                first_full_day = since.date() + timedelta(days=1)
+                full_days = (
+                    await session.execute(
+                        select(func.coalesce(func.sum(EventDailyRollup.count), 0))
+                        .where(EventDailyRollup.module_id == self.id)
+                        .where(EventDailyRollup.day >= first_full_day)
+                    )
+                ).scalar_one()
+                partial_day = (
+                    await session.execute(
+                        select(func.count())
+                        .select_from(Event)
+                        .where(Event.module_id == self.id)
+                        .where(Event.timestamp >= since)
+                        .where(Event.timestamp < datetime.combine(first_full_day, time.min, tzinfo=timezone.utc))
+                    )
                 ).scalar_one()
 
-                return WidgetData(visual_type="counter", data={"value": int(count)})
+                return WidgetData(visual_type="counter", data={"value": int(full_days) + int(partial_day)})
 
-            if widget_id == "commit_streak":
-                # Récupérer tous les PushEvent des 365 derniers jours
+            if widget_id in {"commit_streak", "commit_streak_history"}:
+                tz = resolve_timezone(params.get("timezone"))
                 now = datetime.now(tz=timezone.utc)
-                since = now - timedelta(days=365)
-                
-                rows = session.execute(
-                    select(Event)
-                    .where(Event.module_id == self.id)
-                    .where(Event.event_type == "PushEvent")
-                    .where(Event.timestamp >= since)
-                    .order_by(Event.timestamp.desc())
-                ).scalars().all()
-                
+                commit_dates = await self._get_commit_dates(session, tz, now)
+                streaks = self._compute_streaks(commit_dates)
+
+                if widget_id == "commit_streak_history":
+                    data = [
+                        {
+                            "timestamp": start.isoformat(),
+                            "summary_text": f"{length} jour(s) consécutif(s) du {start.isoformat()} au {end.isoformat()}",
+                            "event_type": "streak",
+                            "start": start.isoformat(),
+                            "end": end.isoformat(),
+                            "length": length,
+                        }
+                        for start, end, length in sorted(streaks, reverse=True)
+                    ]
+                    return WidgetData(visual_type="timeline", data=data)
+
                 # Calculer le streak actuel
-                current_streak = self._calculate_commit_streak(rows, now)
-                
+                current_streak = self._calculate_commit_streak(commit_dates, now.astimezone(tz).date())
+
                 return WidgetData(
-                    visual_type="counter", 
+                    visual_type="counter",
                     data={
                         "value": current_streak,
-                        "unit": "jours"
+                        "unit": "jours",
+                        "longest": max((length for _, _, length in streaks), default=0),
                     }
                 )
 
             if widget_id == "languages_usage":
                 # Récupérer les langages utilisés dans les repos
-                username, token = self._get_credentials()
+                username, token = await self._get_credentials()
                 if not username:
                     return WidgetData(visual_type="pie", data={"labels": [], "values": []})
                 
@@ -247,33 +444,78 @@ class GitHubModule:
                 )
 
             return WidgetData(visual_type="unknown", data=None)
-        finally:
-            session.close()
 
-    def _calculate_commit_streak(self, events: list[Event], now: datetime) -> int:
+    async def _get_commit_dates(self, session: AsyncSession, tz: tzinfo, now: datetime) -> set[date]:
+        """Dates locales (dans `tz`) avec au moins un PushEvent sur les 365 derniers jours.
+
+        Seules les dates distinctes remontent de la base : O(jours), pas O(événements). Hors UTC, la
+        période archivée par la rétention est relue dans les segments d'archive : le résultat ne dépend
+        pas de `retention_days`.
+        """
+        since = now - timedelta(days=365)
+
+        if is_utc(tz):
+            # Les agrégats journaliers sont déjà en jours UTC.
+            return set(
+                (
+                    await session.execute(
+                        select(EventDailyRollup.day)
+                        .where(EventDailyRollup.module_id == self.id)
+                        .where(EventDailyRollup.event_type == "PushEvent")
+                        .where(EventDailyRollup.day >= since.date())
+                        .where(EventDailyRollup.count > 0)
+                    )
+                ).scalars()
+            )
+
+        local_day = local_date_expr(Event.timestamp, tz, since, now)
+        rows = await session.stream_scalars(
+            select(local_day)
+            .distinct()
+            .where(Event.module_id == self.id)
+            .where(Event.event_type == "PushEvent")
+            .where(Event.timestamp >= since)
+        )
+        dates = {date.fromisoformat(day) async for day in rows}
+
+        # Jours locaux des events sortis par la rétention : lus dans les segments d'archive.
+        segments = (
+            await session.execute(
+                select(EventArchiveSegment)
+                .where(EventArchiveSegment.module_id == self.id)
+                .where(EventArchiveSegment.max_timestamp >= since)
+            )
+        ).scalars().all()
+        if segments:
+            dates |= await asyncio.to_thread(archived_local_dates, segments, "PushEvent", tz, since)
+        return dates
+
+    @staticmethod
+    def _compute_streaks(commit_dates: set[date]) -> list[tuple[date, date, int]]:
+        """Découpe les dates en séries de jours consécutifs : `[(début, fin, longueur), ...]`."""
+        streaks: list[tuple[date, date, int]] = []
+        start: date | None = None
+        previous: date | None = None
+        for day in sorted(commit_dates):
+            if previous is None or day - previous > timedelta(days=1):
+                if start is not None and previous is not None:
+                    streaks.append((start, previous, (previous - start).days + 1))
+                start = day
+            previous = day
+        if start is not None and previous is not None:
+            streaks.append((start, previous, (previous - start).days + 1))
+        return streaks
+
+    def _calculate_commit_streak(self, commit_dates: set[date], today: date) -> int:
         """Calcule le nombre de jours consécutifs avec des commits."""
-        if not events:
-            return 0
-            
-        # Extraire les dates uniques des events
-        commit_dates = set()
-        for event in events:
-            # Convertir en date locale (sans heure)
-            local_date = event.timestamp.astimezone().date()
-            commit_dates.add(local_date)
-        
         if not commit_dates:
             return 0
-            
-        # Trier les dates
-        sorted_dates = sorted(commit_dates, reverse=True)
-        
+
         # Vérifier si aujourd'hui ou hier a des commits
-        today = now.astimezone().date()
         yesterday = today - timedelta(days=1)
-        
+
         current_streak = 0
-        
+
         # Si aujourd'hui a des commits, commencer avec aujourd'hui
         if today in commit_dates:
             current_date = today
@@ -282,65 +524,134 @@ class GitHubModule:
             current_date = yesterday
         else:
             return 0
-            
+
         # Compter les jours consécutifs
         while current_date in commit_dates:
             current_streak += 1
             current_date -= timedelta(days=1)
-            
+
         return current_streak
 
     async def _get_languages_usage(self, username: str, token: str) -> dict[str, int]:
-        """Récupère les langages utilisés dans les repos de l'utilisateur."""
+        """Récupère les langages utilisés dans les repos de l'utilisateur.
+
+        Les langages de chaque repo sont mis en cache en base (`github_repo_languages`) et ne sont
+        redemandés que si le `pushed_at` du repo a changé ; les appels restants partent en parallèle.
+        """
         from collections import Counter
-        
+
+        settings = get_settings()
+
         # Récupérer les repos de l'utilisateur
         url = f"https://api.github.com/users/{username}/repos"
         headers: dict[str, str] = {"Accept": "application/vnd.github+json"}
         if token:
             headers["Authorization"] = f"Bearer {token}"
-        
-        async with httpx.AsyncClient(timeout=30) as client:
-            # Récupérer les 100 premiers repos (pagination possible si besoin)
-            resp = await client.get(url, headers=headers, params={"per_page": 100})
-            resp.raise_for_status()
-            repos = resp.json()
-        
-        # Compter les langages
-        language_counter = Counter()
-        
-        for repo in repos:
-            # Ignorer les forks
-            if repo.get("fork", False):
-                continue
-                
-            # Récupérer les langages du repo
-            languages_url = repo.get("languages_url")
-            if not languages_url:
-                continue
-                
+
+        client = get_http_client()
+        repos = await self._list_repos(url, headers)
+
+        # Ignorer les forks et les repos sans languages_url
+        repos = [r for r in repos if not r.get("fork", False) and r.get("languages_url") and r.get("full_name")]
+
+        async with AsyncSessionLocal() as session:
             try:
-                async with httpx.AsyncClient(timeout=30) as client:
-                    lang_resp = await client.get(languages_url, headers=headers)
-                    if lang_resp.status_code == 200:
-                        languages = lang_resp.json()
-                        # Ajouter les octets de chaque langage
-                        for lang, bytes_count in languages.items():
-                            language_counter[lang] += bytes_count
-            except Exception:
-                # Ignorer les erreurs pour les langages
+                cached = {
+                    row.repo_full_name: row
+                    for row in (
+                        await session.execute(
+                            select(GitHubRepoLanguages).where(
+                                GitHubRepoLanguages.repo_full_name.in_([r["full_name"] for r in repos])
+                            )
+                        )
+                    ).scalars()
+                }
+            except OperationalError:
+                cached = None
+
+        stale = [
+            r
+            for r in repos
+            if cached is None
+            or r["full_name"] not in cached
+            or cached[r["full_name"]].pushed_at != r.get("pushed_at")
+        ]
+
+        semaphore = asyncio.Semaphore(settings.github_languages_concurrency)
+
+        async def fetch(repo: dict[str, Any]) -> tuple[dict[str, Any], dict[str, int] | None]:
+            async with semaphore:
+                try:
+                    lang_resp = await client.get(repo["languages_url"], headers=headers)
+                except Exception:
+                    # Ignorer les erreurs pour les langages
+                    return repo, None
+            if lang_resp.status_code != 200:
+                return repo, None
+            return repo, lang_resp.json()
+
+        fetched = await asyncio.gather(*(fetch(r) for r in stale))
+
+        languages_by_repo: dict[str, dict[str, int]] = {}
+        if cached is not None:
+            languages_by_repo.update({name: row.languages_json or {} for name, row in cached.items()})
+
+        now = datetime.now(tz=timezone.utc)
+        refreshed: list[GitHubRepoLanguages] = []
+        for repo, languages in fetched:
+            if languages is None:
+                # Échec : on garde l'éventuelle valeur en cache, même périmée.
                 continue
-        
+            languages_by_repo[repo["full_name"]] = languages
+            refreshed.append(
+                GitHubRepoLanguages(
+                    repo_full_name=repo["full_name"],
+                    pushed_at=repo.get("pushed_at"),
+                    languages_json=languages,
+                    updated_at=now,
+                )
+            )
+
+        if cached is not None and refreshed:
+            async with AsyncSessionLocal() as session:
+                for row in refreshed:
+                    await session.merge(row)
+                await session.commit()
+
+        # Compter les langages (octets par langage), uniquement pour les repos encore présents
+        language_counter = Counter()
+        for repo in repos:
+            for lang, bytes_count in languages_by_repo.get(repo["full_name"], {}).items():
+                language_counter[lang] += bytes_count
+
         # Convertir en pourcentages et limiter aux 10 premiers langages
         total_bytes = sum(language_counter.values())
         if total_bytes == 0:
             return {}
-        
+
         # Calculer les pourcentages et arrondir
         languages_percent = {}
         for lang, bytes_count in language_counter.most_common(10):
             percent = round((bytes_count / total_bytes) * 100)
             if percent > 0:  # Inclure seulement si > 0%
                 languages_percent[lang] = percent
-        
+
         return languages_percent
+
+    async def _list_repos(self, url: str, headers: dict[str, str]) -> list[dict[str, Any]]:
+        """Liste les repos en suivant la pagination `Link` (au-delà des 100 premiers)."""
+        settings = get_settings()
+        client = get_http_client()
+
+        repos: list[dict[str, Any]] = []
+        resp = await client.get(url, headers=headers, params={"per_page": 100})
+        pages = 1
+        while True:
+            resp.raise_for_status()
+            repos.extend(resp.json())
+
+            next_url = resp.links.get("next", {}).get("url")
+            if not next_url or pages >= settings.github_repos_max_pages:
+                return repos
+            resp = await client.get(next_url, headers=headers)
+            pages += 1
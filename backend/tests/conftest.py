@@ -0,0 +1,100 @@
+"""Base SQLite temporaire, migrée une fois pour la session de tests.
+
+Les variables d'environnement sont posées à l'import : les engines sont créés à l'import de
+`synapsesync.core.database`, avant toute fixture.
+
+Chaque test porte le marqueur `covers("user-0XX")` de la demande dont il vérifie le comportement ;
+`pytest -k user-0XX` lance les tests d'une demande.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+_TMP = Path(tempfile.mkdtemp(prefix="synapsesync-tests-"))
+os.environ.update(
+    {
+        "SYNAPSESYNC_DATABASE_URL": f"sqlite:///{_TMP / 'tests.db'}",
+        "SYNAPSESYNC_SCHEDULER_ENABLED": "false",
+        "SYNAPSESYNC_STARTUP_WARMUP_ENABLED": "false",
+        "SYNAPSESYNC_ARCHIVE_DIR": str(_TMP / "archive"),
+        "SYNAPSESYNC_ANALYTICS_DIR": str(_TMP / "analytics"),
+    }
+)
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def pytest_collection_modifyitems(items):
+    for item in items:
+        for marker in item.iter_markers("covers"):
+            item.extra_keyword_matches.add(marker.args[0])
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    from alembic import command
+    from alembic.config import Config
+
+    # Sans fichier ini : pas de `fileConfig`, la configuration des loggers de pytest reste intacte.
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    command.upgrade(config, "head")
+    yield
+    shutil.rmtree(_TMP, ignore_errors=True)
+
+
+@pytest.fixture
+def clean_database():
+    """Tables de données vidées et caches du process remis à zéro : le test part d'une base migrée vide."""
+    from sqlalchemy import delete
+
+    from synapsesync.core.cache import widget_cache
+    from synapsesync.core.data_version import data_versions
+    from synapsesync.core.database import SessionLocal
+    from synapsesync.core.ingest import ingest_progress
+    from synapsesync.core.models import (
+        Event,
+        EventArchiveSegment,
+        EventDailyRollup,
+        GitHubRepoLanguages,
+        ModuleConfig,
+        ModuleSyncState,
+    )
+    from synapsesync.core.module_config import module_config_cache
+
+    with SessionLocal() as session:
+        # Le trigger `events_fts_delete` vide aussi l'index plein texte.
+        for model in (Event, EventDailyRollup, EventArchiveSegment, ModuleSyncState, ModuleConfig, GitHubRepoLanguages):
+            session.execute(delete(model))
+        session.commit()
+    module_config_cache.invalidate()
+    widget_cache.clear()
+    data_versions.clear()
+    ingest_progress.clear()
+
+
+@pytest.fixture
+def fake_github(clean_database):
+    """API GitHub simulée des benchmarks (`FakeGitHub`), installée comme client HTTP partagé.
+
+    Le module `github` est configuré en provider `api` sur l'utilisateur de la fausse API.
+    """
+    from benchmarks.fake_github import FakeGitHub
+    from synapsesync.core.database import SessionLocal
+    from synapsesync.core.http import close_http_client, create_http_client, use_http_client
+    from synapsesync.core.models import ModuleConfig
+
+    fake = FakeGitHub()
+    with SessionLocal() as session:
+        session.add(ModuleConfig(module_id="github", config_json={"provider": "api", "username": fake.username}))
+        session.commit()
+    use_http_client(create_http_client(transport=fake.transport()))
+    yield fake
+    asyncio.run(close_http_client())
@@ -0,0 +1,197 @@
+"""Requêtes conditionnelles : `ETag` / `If-None-Match` des widgets et des dashboards."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+from synapsesync.api.endpoints.dashboards import _dashboard_etag, dashboard_versions
+from synapsesync.core.cache import widget_cache
+from synapsesync.core.data_version import data_versions
+from synapsesync.core.database import SessionLocal, get_async_engine
+from synapsesync.core.ingest import ingest_events
+from synapsesync.main import app
+from synapsesync.modules.github.module import GitHubModule
+
+WIDGET = "/api/widget-data/github/events_7d"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    widget_cache.clear()
+    data_versions.clear()
+    dashboard_versions.clear()
+    # Tranche de TTL large : l'ETag ne change pas d'une requête à l'autre pendant un test.
+    monkeypatch.setattr(widget_cache, "default_ttl", 86400.0)
+    return TestClient(app)
+
+
+@pytest.fixture
+def computed(monkeypatch) -> list[str]:
+    """Widgets réellement calculés par le module (hors cache et hors `304`)."""
+    calls: list[str] = []
+    original = GitHubModule.get_widget_data
+
+    async def get_widget_data(self, widget_id, params):
+        calls.append(widget_id)
+        return await original(self, widget_id=widget_id, params=params)
+
+    monkeypatch.setattr(GitHubModule, "get_widget_data", get_widget_data)
+    return calls
+
+
+@pytest.fixture
+def api_queries() -> list[str]:
+    """Requêtes SQL exécutées par les endpoints (moteur async)."""
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = get_async_engine().sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def _insert_push(external_id: str) -> int:
+    """Insertion directe, sans `notify_module_updated` ni invalidation du cache des widgets."""
+    row = {
+        "module_id": "github",
+        "event_type": "PushEvent",
+        "timestamp": datetime.now(tz=timezone.utc),
+        "external_id": external_id,
+        "summary_text": "octocat: PushEvent",
+        "metadata_json": {"provider": "test"},
+    }
+    with SessionLocal() as session:
+        inserted = ingest_events(session, "github", [row])
+        session.commit()
+    return inserted
+
+
+@pytest.mark.covers("user-014")
+def test_widget_if_none_match_returns_304_without_computing(client, computed):
+    first = client.get(WIDGET)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+    assert computed == ["events_7d"]
+
+    for header in (etag, f"W/{etag}", f'"other", {etag}'):
+        response = client.get(WIDGET, headers={"If-None-Match": header})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+    assert computed == ["events_7d"]
+
+    assert client.get(WIDGET, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+@pytest.mark.covers("user-014")
+def test_widget_etag_and_cache_follow_the_data_version_in_database(client, computed):
+    etag = client.get(WIDGET).headers["ETag"]
+    assert client.get(WIDGET).status_code == 200
+    assert computed == ["events_7d"]
+
+    external_id = uuid.uuid4().hex
+    assert _insert_push(external_id) == 1
+
+    # Aucune invalidation du cache : seule la version (en base et connue du process) a changé.
+    response = client.get(WIDGET, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    new_etag = response.headers["ETag"]
+    assert new_etag != etag
+    assert computed == ["events_7d", "events_7d"]
+
+    # Doublon ignoré : pas de nouvelle version, l'ETag reste valide.
+    assert _insert_push(external_id) == 0
+    assert client.get(WIDGET, headers={"If-None-Match": new_etag}).status_code == 304
+
+
+@pytest.mark.covers("user-014")
+def test_widget_etag_is_stable_across_cache_resets(client):
+    etag = client.get(WIDGET).headers["ETag"]
+    # Un autre worker (ou un redémarrage) n'a pas ce cache en mémoire mais calcule le même ETag.
+    widget_cache.clear()
+    assert client.get(WIDGET, headers={"If-None-Match": etag}).status_code == 304
+
+
+@pytest.mark.covers("user-014")
+def test_dashboard_if_none_match(client):
+    dashboard_id = f"test-{uuid.uuid4().hex}"
+    path = f"/api/dashboards/{dashboard_id}"
+    assert client.post(path, json={"config_json": {"widgets": []}}).status_code == 200
+
+    first = client.get(path)
+    etag = first.headers["ETag"]
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    assert client.post(path, json={"config_json": {"widgets": [], "timezone": "Europe/Paris"}}).status_code == 200
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["config_json"]["timezone"] == "Europe/Paris"
+
+
+@pytest.mark.covers("user-023")
+def test_underscore_params_do_not_change_the_etag_or_reach_the_module(client, computed):
+    etag = client.get(WIDGET).headers["ETag"]
+    for query in ({"_profile": "token"}, {"_": "1700000000"}, {"_t": "1", "dashboard_id": "missing"}):
+        response = client.get(WIDGET, params=query, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+    assert client.get(WIDGET, params={"_": "2"}).headers["ETag"] == etag
+    assert computed == ["events_7d"]
+
+
+def _write_from_other_worker(statement: str, **params) -> None:
+    """Écriture SQL brute : ni `bump_data_version` ni endpoint, ce process n'en sait rien."""
+    with SessionLocal() as session:
+        session.execute(text(statement), params)
+        session.commit()
+
+
+@pytest.mark.covers("user-014")
+def test_widget_304_uses_the_local_version_until_revalidation(client, computed, api_queries, monkeypatch):
+    monkeypatch.setattr(data_versions, "revalidate_seconds", 3600.0)
+    etag = client.get(WIDGET).headers["ETag"]
+    _write_from_other_worker("UPDATE module_sync_states SET data_version = data_version + 1 WHERE module_id = 'github'")
+
+    # Version locale encore fraîche : pas de relecture en base.
+    api_queries.clear()
+    assert client.get(WIDGET, headers={"If-None-Match": etag}).status_code == 304
+    assert api_queries == []
+
+    monkeypatch.setattr(data_versions, "revalidate_seconds", 0.0)
+    response = client.get(WIDGET, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert any("module_sync_states" in statement for statement in api_queries)
+    assert response.headers["ETag"] != etag
+    assert computed == ["events_7d", "events_7d"]
+
+
+@pytest.mark.covers("user-014")
+def test_dashboard_304_uses_the_local_version_until_revalidation(client, api_queries, monkeypatch):
+    monkeypatch.setattr(dashboard_versions, "revalidate_seconds", 3600.0)
+    dashboard_id = f"test-{uuid.uuid4().hex}"
+    path = f"/api/dashboards/{dashboard_id}"
+    assert client.post(path, json={"config_json": {"widgets": []}}).status_code == 200
+    # Version enregistrée par le `POST` : même ETag que celui que renvoie `GET`.
+    etag = client.get(path).headers["ETag"]
+    assert _dashboard_etag(dashboard_id, dashboard_versions.get(dashboard_id)) == etag
+
+    _write_from_other_worker(
+        "UPDATE dashboards SET updated_at = :now WHERE id = :id", now=datetime.now(tz=timezone.utc), id=dashboard_id
+    )
+    api_queries.clear()
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+    assert api_queries == []
+
+    monkeypatch.setattr(dashboard_versions, "revalidate_seconds", 0.0)
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 200
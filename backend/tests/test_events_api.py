@@ -0,0 +1,171 @@
+"""`GET /api/events` (curseur, archives de la rétention) et `GET /api/events/search`, sur des events
+synchronisés depuis l'API simulée (`benchmarks.fake_github.FakeGitHub`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.datasets import FIRST_EVENT_ID, github_events
+from synapsesync.core.archive import run_retention
+from synapsesync.core.config import get_settings
+from synapsesync.core.database import SessionLocal
+from synapsesync.core.models import ModuleConfig
+from synapsesync.main import app
+from synapsesync.modules.github.module import GitHubModule
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(app)
+
+
+def _sync_events(fake_github, events: list[dict]) -> None:
+    fake_github.push(events)
+    assert asyncio.run(GitHubModule().sync()) == len(events)
+
+
+def _pages(client: TestClient, path: str, **params) -> list[list[dict]]:
+    pages, cursor = [], None
+    while True:
+        body = client.get(path, params={**params, **({"cursor": cursor} if cursor else {})}).json()
+        pages.append(body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def _key(item: dict) -> tuple[datetime, int]:
+    return datetime.fromisoformat(item["timestamp"]), item["id"]
+
+
+@pytest.mark.covers("user-016")
+def test_keyset_pages_cover_every_event_once_in_order(client, fake_github):
+    _sync_events(fake_github, list(github_events(250, span_days=20)))
+
+    pages = _pages(client, "/api/events", module_id="github", limit=40)
+    assert [len(page) for page in pages] == [40] * 6 + [10]
+    items = [item for page in pages for item in page]
+    keys = [_key(item) for item in items]
+    assert keys == sorted(keys, reverse=True)
+    assert len(set(keys)) == 250
+
+    ascending = _pages(client, "/api/events", module_id="github", limit=33, order="asc")
+    assert [_key(item) for page in ascending for item in page] == keys[::-1]
+
+
+@pytest.mark.covers("user-016")
+def test_keyset_cursor_is_stable_when_newer_events_arrive(client, fake_github):
+    _sync_events(fake_github, list(github_events(120, span_days=20)))
+
+    first = client.get("/api/events", params={"module_id": "github", "limit": 50}).json()
+    # Nouveaux events entre deux pages : ils sont avant le curseur (tri décroissant), la suite ne bouge pas.
+    _sync_events(fake_github, list(github_events(10, span_days=1, first_id=FIRST_EVENT_ID + 120)))
+    rest = [
+        item
+        for page in _pages(client, "/api/events", module_id="github", limit=50, cursor=first["next_cursor"])
+        for item in page
+    ]
+    seen = {item["id"] for item in first["items"]}
+    assert len(rest) == 70
+    assert seen.isdisjoint(item["id"] for item in rest)
+
+
+@pytest.mark.covers("user-016")
+def test_time_range_is_half_open(client, fake_github):
+    events = list(github_events(100, span_days=20))
+    _sync_events(fake_github, events)
+    since = datetime.fromisoformat(events[20]["created_at"].replace("Z", "+00:00"))
+    until = datetime.fromisoformat(events[80]["created_at"].replace("Z", "+00:00"))
+
+    items = [
+        item
+        for page in _pages(
+            client, "/api/events", module_id="github", limit=15, since=since.isoformat(), until=until.isoformat()
+        )
+        for item in page
+    ]
+    expected = {
+        ev["id"]
+        for ev in events
+        if since <= datetime.fromisoformat(ev["created_at"].replace("Z", "+00:00")) < until
+    }
+    assert {item["external_id"] for item in items} == expected
+
+
+@pytest.mark.covers("user-020")
+def test_include_archived_merges_retention_segments(client, fake_github, monkeypatch):
+    end = datetime.now(tz=timezone.utc).replace(minute=0, second=0, microsecond=0)
+    events = list(github_events(150, span_days=60, end=end))
+    _sync_events(fake_github, events)
+    with SessionLocal() as session:
+        config = session.get(ModuleConfig, "github")
+        config.config_json = {**config.config_json, "retention_days": 30}
+        session.commit()
+    monkeypatch.setattr(get_settings(), "archive_segment_max_events", 40)
+
+    result = run_retention("github", vacuum=False)
+    archived = result["modules"]["github"]["events"]
+    assert archived > 40
+    assert result["modules"]["github"]["segments"] == -(-archived // 40)
+
+    live = [item for page in _pages(client, "/api/events", module_id="github", limit=1000) for item in page]
+    assert len(live) == 150 - archived
+    assert all(_key(item)[0] >= end - timedelta(days=30) for item in live)
+
+    merged = [
+        item
+        for page in _pages(client, "/api/events", module_id="github", limit=35, include_archived="true")
+        for item in page
+    ]
+    keys = [_key(item) for item in merged]
+    assert keys == sorted(keys, reverse=True)
+    assert len(set(keys)) == 150
+    assert sum(item["archived"] for item in merged) == archived
+    assert {item["external_id"] for item in merged} == {ev["id"] for ev in events}
+
+    with_metadata = client.get(
+        "/api/events",
+        params={"module_id": "github", "include_archived": "true", "include_metadata": "true", "order": "asc", "limit": 1},
+    ).json()["items"][0]
+    assert with_metadata["archived"] is True
+    assert with_metadata["metadata_json"]["id"] == with_metadata["external_id"]
+
+
+def _push_event(event_id: int, message: str) -> dict:
+    ev = next(github_events(1, span_days=1, first_id=event_id))
+    ev["type"] = "PushEvent"
+    ev["payload"] = {"ref": "refs/heads/main", "size": 1, "commits": [{"sha": f"{event_id:040x}", "message": message}]}
+    return ev
+
+
+@pytest.mark.covers("user-019")
+def test_search_matches_commit_messages_with_highlight(client, fake_github):
+    events = list(github_events(60, span_days=10))
+    events.append(_push_event(FIRST_EVENT_ID + 60, "Rewrite the zanzibar tokenizer"))
+    _sync_events(fake_github, events)
+
+    body = client.get("/api/events/search", params={"q": "zanzib"}).json()
+    assert [item["external_id"] for item in body["items"]] == [str(FIRST_EVENT_ID + 60)]
+    assert "<mark>zanzibar</mark>" in body["items"][0]["highlight"]["body"]
+    assert body["next_cursor"] is None
+
+    assert client.get("/api/events/search", params={"q": '"unclosed', "syntax": "fts5"}).status_code == 400
+
+
+@pytest.mark.covers("user-019")
+def test_search_pages_by_relevance_and_recency(client, fake_github):
+    events = [_push_event(FIRST_EVENT_ID + i, f"parser fix number {i}" + " parser" * (i % 3)) for i in range(23)]
+    _sync_events(fake_github, events)
+
+    relevance = [item for page in _pages(client, "/api/events/search", q="parser", limit=5) for item in page]
+    recent = [item for page in _pages(client, "/api/events/search", q="parser", limit=5, order="recent") for item in page]
+    assert len(relevance) == len(recent) == 23
+    assert {item["id"] for item in relevance} == {item["id"] for item in recent}
+    scores = [item["score"] for item in relevance]
+    assert scores == sorted(scores, reverse=True)
+    assert [item["id"] for item in recent] == sorted((item["id"] for item in recent), reverse=True)
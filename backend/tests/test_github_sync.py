@@ -0,0 +1,108 @@
+"""Sync du provider `api` de `GitHubModule` contre l'API simulée (`benchmarks.fake_github.FakeGitHub`)."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from benchmarks.datasets import FIRST_EVENT_ID, github_events
+from synapsesync.core.config import get_settings
+from synapsesync.core.database import SessionLocal
+from synapsesync.core.ingest import ingest_events
+from synapsesync.core.models import Event, EventDailyRollup, ModuleSyncState
+from synapsesync.modules.github.module import GitHubModule
+
+
+def _sync() -> int:
+    return asyncio.run(GitHubModule().sync())
+
+
+def _event_count() -> int:
+    with SessionLocal() as session:
+        return session.execute(select(func.count()).select_from(Event).where(Event.module_id == "github")).scalar_one()
+
+
+def _rollup_total() -> int:
+    with SessionLocal() as session:
+        return session.execute(
+            select(func.coalesce(func.sum(EventDailyRollup.count), 0)).where(EventDailyRollup.module_id == "github")
+        ).scalar_one()
+
+
+def _forget_sync_state() -> None:
+    """Sans curseur ni ETag, la sync suivante relit toutes les pages."""
+    with SessionLocal() as session:
+        session.execute(delete(ModuleSyncState).where(ModuleSyncState.module_id == "github"))
+        session.commit()
+
+
+@pytest.fixture
+def per_page(monkeypatch) -> int:
+    monkeypatch.setattr(get_settings(), "github_events_per_page", 20)
+    return 20
+
+
+@pytest.mark.covers("user-001")
+def test_resync_of_the_same_events_inserts_nothing(fake_github, per_page):
+    fake_github.push(github_events(50, span_days=10))
+    assert _sync() == 50
+
+    _forget_sync_state()
+    assert _sync() == 0
+    assert _event_count() == 50
+    # Les agrégats ne comptent que les lignes réellement insérées.
+    assert _rollup_total() == 50
+
+
+@pytest.mark.covers("user-001")
+def test_events_without_id_get_a_stable_external_id():
+    module = GitHubModule()
+    ev = next(github_events(1, span_days=1))
+    del ev["id"]
+    rows = [module.event_row(ev, "octocat")]
+    assert rows[0]["external_id"].startswith("sha256:")
+
+    with SessionLocal() as session:
+        before = session.execute(select(func.count()).select_from(Event)).scalar_one()
+        first = ingest_events(session, "github", rows)
+        second = ingest_events(session, "github", [module.event_row(ev, "octocat")])
+        after = session.execute(select(func.count()).select_from(Event)).scalar_one()
+        session.rollback()
+    assert (first, second, after - before) == (1, 0, 1)
+
+
+@pytest.mark.covers("user-002")
+def test_sync_follows_link_pagination(fake_github, per_page):
+    fake_github.push(github_events(75, span_days=10))
+
+    assert _sync() == 75
+    assert fake_github.calls["events"] == 4
+    assert _event_count() == 75
+
+
+@pytest.mark.covers("user-002")
+def test_sync_sends_if_none_match_and_treats_304_as_a_no_op(fake_github, per_page):
+    fake_github.push(github_events(30, span_days=10))
+    assert _sync() == 30
+    calls = fake_github.calls["events"]
+
+    assert _sync() == 0
+    assert fake_github.calls["not_modified"] == 1
+    assert fake_github.calls["events"] == calls + 1
+    # Un 304 ne consomme pas de quota.
+    assert fake_github.remaining == 5000 - calls
+
+
+@pytest.mark.covers("user-002")
+def test_incremental_sync_stops_at_the_cursor(fake_github, per_page):
+    fake_github.push(github_events(75, span_days=10))
+    assert _sync() == 75
+    calls = fake_github.calls["events"]
+
+    fake_github.push(github_events(5, span_days=1, first_id=FIRST_EVENT_ID + 75))
+    assert _sync() == 5
+    # Les nouveaux events tiennent dans la première page : les suivantes ne sont pas demandées.
+    assert fake_github.calls["events"] == calls + 1
+    assert _event_count() == 80
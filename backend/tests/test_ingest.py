@@ -0,0 +1,86 @@
+"""Import en streaming par chunks commités (`stream_ingest`) : reprise au checkpoint après un échec."""
+
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import func, select
+
+from benchmarks.datasets import github_events
+from synapsesync.core.database import SessionLocal
+from synapsesync.core.ingest import begin_ingest, stream_ingest
+from synapsesync.core.models import Event, ModuleSyncState
+from synapsesync.modules.github.module import GitHubModule
+
+SOURCE = "test:events"
+
+
+class Crash(Exception):
+    pass
+
+
+def _to_row(fail_at: str | None = None, converted: list[str] | None = None):
+    module = GitHubModule()
+
+    def to_row(ev: dict) -> dict:
+        if ev["id"] == fail_at:
+            raise Crash(ev["id"])
+        if converted is not None:
+            converted.append(ev["id"])
+        return module.event_row(ev, "octocat")
+
+    return to_row
+
+
+def _event_count() -> int:
+    with SessionLocal() as session:
+        return session.execute(select(func.count()).select_from(Event).where(Event.module_id == "github")).scalar_one()
+
+
+def _checkpoint() -> tuple[str | None, int | None]:
+    with SessionLocal() as session:
+        row = session.get(ModuleSyncState, "github")
+        return (row.checkpoint_source, row.checkpoint_offset) if row else (None, None)
+
+
+@pytest.mark.covers("user-011")
+def test_failed_import_resumes_after_the_last_committed_chunk(clean_database):
+    events = list(github_events(100, span_days=10))
+
+    progress = begin_ingest("github", SOURCE)
+    with pytest.raises(Crash):
+        stream_ingest(progress, iter(events), _to_row(fail_at=events[60]["id"]), chunk_size=25)
+    assert progress.status == "failed"
+    assert (progress.chunks, progress.inserted) == (2, 50)
+    assert _checkpoint() == (SOURCE, 50)
+    assert _event_count() == 50
+
+    converted: list[str] = []
+    progress = begin_ingest("github", SOURCE)
+    assert stream_ingest(progress, iter(events), _to_row(converted=converted), chunk_size=25) == 50
+    assert progress.status == "done"
+    assert progress.resumed_from == 50
+    # Les éléments déjà commités sont sautés sans être convertis.
+    assert converted == [ev["id"] for ev in events[50:]]
+    assert _event_count() == 100
+    assert _checkpoint() == (None, None)
+
+
+@pytest.mark.covers("user-011")
+def test_checkpoint_of_another_source_is_ignored(clean_database):
+    events = list(github_events(30, span_days=10))
+    progress = begin_ingest("github", SOURCE)
+    with pytest.raises(Crash):
+        stream_ingest(progress, iter(events), _to_row(fail_at=events[20]["id"]), chunk_size=10)
+    assert _checkpoint() == (SOURCE, 20)
+
+    progress = begin_ingest("github", "test:other")
+    assert stream_ingest(progress, iter(events), _to_row(), chunk_size=10) == 10
+    assert progress.resumed_from == 0
+    assert _event_count() == 30
+
+
+@pytest.mark.covers("user-011")
+def test_only_one_streaming_import_per_module(clean_database):
+    begin_ingest("github", SOURCE)
+    with pytest.raises(RuntimeError):
+        begin_ingest("github", SOURCE)
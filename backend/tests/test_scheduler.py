@@ -0,0 +1,105 @@
+"""Au plus une sync en cours par module (`SyncScheduler.enqueue` / `_run_scheduled`)."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from synapsesync.core import scheduler as scheduler_module
+from synapsesync.core.config import get_settings
+from synapsesync.core.scheduler import SyncJob, SyncScheduler
+
+pytestmark = pytest.mark.covers("user-012")
+
+
+def _fake_sync(release: asyncio.Event, calls: list[str], inserted: int = 0):
+    async def sync(job: SyncJob) -> int:
+        calls.append(job.id)
+        await release.wait()
+        return inserted
+
+    return staticmethod(sync)
+
+
+async def _drain(scheduler: SyncScheduler) -> None:
+    while scheduler._tasks:
+        await asyncio.gather(*list(scheduler._tasks))
+
+
+def test_enqueue_returns_the_queued_or_running_job(monkeypatch):
+    async def scenario() -> None:
+        release, calls = asyncio.Event(), []
+        monkeypatch.setattr(SyncScheduler, "_sync", _fake_sync(release, calls))
+        scheduler = SyncScheduler()
+
+        first = scheduler.enqueue("github")
+        assert first.status == "queued"
+        assert scheduler.enqueue("github") is first
+
+        await asyncio.sleep(0)
+        assert first.status == "running"
+        assert scheduler.enqueue("github") is first
+
+        release.set()
+        await _drain(scheduler)
+        assert first.status == "done"
+        assert calls == [first.id]
+
+        second = scheduler.enqueue("github")
+        assert second is not first
+        await _drain(scheduler)
+        assert calls == [first.id, second.id]
+
+    asyncio.run(scenario())
+
+
+def test_scheduled_run_is_skipped_while_a_sync_is_running(monkeypatch):
+    async def scenario() -> None:
+        release, calls = asyncio.Event(), []
+        monkeypatch.setattr(SyncScheduler, "_sync", _fake_sync(release, calls))
+        scheduler = SyncScheduler()
+
+        manual = scheduler.enqueue("github")
+        await asyncio.sleep(0)
+        await scheduler._run_scheduled("github")
+        assert [job.id for job in scheduler.list_jobs("github")] == [manual.id]
+
+        release.set()
+        await _drain(scheduler)
+        assert calls == [manual.id]
+
+    asyncio.run(scenario())
+
+
+def test_enqueue_during_analytics_export_starts_a_new_sync(monkeypatch):
+    async def scenario() -> None:
+        release, calls = asyncio.Event(), []
+        release.set()
+        monkeypatch.setattr(SyncScheduler, "_sync", _fake_sync(release, calls, inserted=3))
+        monkeypatch.setattr(scheduler_module, "HAS_PYARROW", True)
+        monkeypatch.setattr(get_settings(), "analytics_enabled", True)
+        scheduler = SyncScheduler()
+
+        export_started, release_export = asyncio.Event(), asyncio.Event()
+
+        async def export(module_id: str, full: bool = False) -> dict:
+            export_started.set()
+            await release_export.wait()
+            return {}
+
+        monkeypatch.setattr(scheduler, "run_analytics_export", export)
+
+        first = scheduler.enqueue("github")
+        await export_started.wait()
+        assert first.status == "done"
+
+        second = scheduler.enqueue("github")
+        assert second is not first
+
+        release_export.set()
+        await _drain(scheduler)
+        assert calls == [first.id, second.id]
+        assert second.status == "done"
+
+    asyncio.run(scenario())
@@ -0,0 +1,92 @@
+"""Widgets `commit_streak` / `commit_streak_history` selon le fuseau, avant et après archivage par la rétention."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.datasets import FIRST_EVENT_ID, github_events
+from synapsesync.core.archive import run_retention
+from synapsesync.core.database import SessionLocal
+from synapsesync.core.models import ModuleConfig
+from synapsesync.main import app
+from synapsesync.modules.github.module import GitHubModule
+
+NOW = datetime.now(tz=timezone.utc).replace(second=0, microsecond=0)
+BASE = datetime.combine(NOW.date() - timedelta(days=20), datetime.min.time(), tzinfo=timezone.utc)
+# Deux pushes de part et d'autre de minuit UTC, puis trois jours consécutifs à midi UTC.
+PUSHES = [
+    BASE + timedelta(hours=23, minutes=30),
+    BASE + timedelta(days=1, minutes=30),
+    BASE + timedelta(days=5, hours=12),
+    BASE + timedelta(days=6, hours=12),
+    BASE + timedelta(days=7, hours=12),
+]
+
+
+def _push(index: int, at: datetime) -> dict:
+    ev = next(github_events(1, span_days=1, first_id=FIRST_EVENT_ID + index))
+    ev.update(type="PushEvent", created_at=at.strftime("%Y-%m-%dT%H:%M:%SZ"))
+    return ev
+
+
+@pytest.fixture
+def client(fake_github) -> TestClient:
+    fake_github.push(_push(i, at) for i, at in enumerate(PUSHES))
+    assert asyncio.run(GitHubModule().sync()) == len(PUSHES)
+    return TestClient(app)
+
+
+def _history(client: TestClient, tz: str) -> list[tuple[date, date, int]]:
+    data = client.get("/api/widget-data/github/commit_streak_history", params={"timezone": tz}).json()["data"]
+    return [(date.fromisoformat(s["start"]), date.fromisoformat(s["end"]), s["length"]) for s in data]
+
+
+def _day(offset: int) -> date:
+    return BASE.date() + timedelta(days=offset)
+
+
+EXPECTED = {
+    "UTC": [(_day(5), _day(7), 3), (_day(0), _day(1), 2)],
+    # UTC-4/-5 : les deux premiers pushes tombent le même jour local.
+    "America/New_York": [(_day(5), _day(7), 3), (_day(0), _day(0), 1)],
+    # UTC+9 : les deux premiers pushes tombent le lendemain.
+    "Asia/Tokyo": [(_day(5), _day(7), 3), (_day(1), _day(1), 1)],
+}
+
+
+@pytest.mark.covers("user-007")
+@pytest.mark.parametrize("tz", sorted(EXPECTED))
+def test_streak_history_uses_local_days(client, tz):
+    assert _history(client, tz) == EXPECTED[tz]
+
+
+@pytest.mark.covers("user-007")
+@pytest.mark.parametrize("tz", ["UTC", "Asia/Tokyo"])
+def test_current_streak_counts_today(client, fake_github, tz):
+    fake_github.push([_push(10, NOW - timedelta(days=1)), _push(11, NOW - timedelta(minutes=1))])
+    assert asyncio.run(GitHubModule().sync()) == 2
+
+    data = client.get("/api/widget-data/github/commit_streak", params={"timezone": tz}).json()["data"]
+    assert data["value"] == 2
+    assert data["longest"] == 3
+
+
+@pytest.mark.covers("user-007")
+def test_invalid_timezone_is_a_400(client):
+    assert client.get("/api/widget-data/github/commit_streak", params={"timezone": "Mars/Olympus"}).status_code == 400
+
+
+@pytest.mark.covers("user-020")
+def test_streaks_are_unchanged_by_retention(client):
+    before = {tz: _history(client, tz) for tz in EXPECTED}
+    with SessionLocal() as session:
+        config = session.get(ModuleConfig, "github")
+        config.config_json = {**config.config_json, "retention_days": 10}
+        session.commit()
+    assert run_retention("github", vacuum=False)["archived_events"] == len(PUSHES)
+
+    assert {tz: _history(client, tz) for tz in EXPECTED} == before
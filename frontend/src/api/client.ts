@@ -8,9 +8,13 @@ export class ApiError extends Error {
   }
 }
 
-export async function apiFetch<T>(path: string, init?: RequestInit): Promise<T> {
+export function apiUrl(path: string): string {
   const baseUrl = (import.meta as any).env?.VITE_API_BASE_URL as string | undefined
-  const url = baseUrl ? `${baseUrl}${path}` : path
+  return baseUrl ? `${baseUrl}${path}` : path
+}
+
+export async function apiFetch<T>(path: string, init?: RequestInit): Promise<T> {
+  const url = apiUrl(path)
 
   const method = (init?.method ?? 'GET').toUpperCase()
   const headers = new Headers(init?.headers)
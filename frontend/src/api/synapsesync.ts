@@ -1,4 +1,4 @@
-import { apiFetch } from './client'
+import { apiFetch, apiUrl } from './client'
 
 export type WidgetDescriptor = {
   module_id: string
@@ -7,6 +7,7 @@ export type WidgetDescriptor = {
   visual_type: string
   description?: string | null
   config_schema?: Record<string, unknown>
+  cache_ttl?: number | null
 }
 
 export type WidgetData = {
@@ -45,6 +46,7 @@ export type DashboardLayoutItem = {
 export type DashboardConfig = {
   widgets: DashboardWidgetRef[]
   layout?: DashboardLayoutItem[]
+  timezone?: string
 }
 
 export type Dashboard = {
@@ -61,8 +63,41 @@ export async function listModules(): Promise<ModuleInfo[]> {
   return apiFetch<ModuleInfo[]>('/api/modules')
 }
 
-export async function getWidgetData(moduleId: string, widgetId: string): Promise<WidgetData> {
-  return apiFetch<WidgetData>(`/api/widget-data/${encodeURIComponent(moduleId)}/${encodeURIComponent(widgetId)}`)
+export async function getWidgetData(
+  moduleId: string,
+  widgetId: string,
+  params?: Record<string, string>,
+): Promise<WidgetData> {
+  const query = params && Object.keys(params).length > 0 ? `?${new URLSearchParams(params).toString()}` : ''
+  return apiFetch<WidgetData>(`/api/widget-data/${encodeURIComponent(moduleId)}/${encodeURIComponent(widgetId)}${query}`)
+}
+
+export type WidgetDataRequest = {
+  module_id: string
+  widget_id: string
+  params?: Record<string, unknown>
+}
+
+export type WidgetDataResult = {
+  module_id: string
+  widget_id: string
+  status: 'ok' | 'error'
+  visual_type?: string
+  data?: unknown
+  cached?: boolean
+  status_code?: number
+  error?: string
+  duration_ms: number
+}
+
+export async function getWidgetDataBatch(
+  widgets: WidgetDataRequest[],
+  dashboardId?: string,
+): Promise<{ results: WidgetDataResult[]; duration_ms: number }> {
+  return apiFetch<{ results: WidgetDataResult[]; duration_ms: number }>('/api/widget-data/batch', {
+    method: 'POST',
+    body: JSON.stringify({ widgets, dashboard_id: dashboardId }),
+  })
 }
 
 export async function getDashboard(dashboardId: string): Promise<Dashboard> {
@@ -78,12 +113,42 @@ export async function saveDashboard(dashboardId: string, config: DashboardConfig
   )
 }
 
-export async function syncModule(moduleId: string): Promise<{ status: string }> {
-  return apiFetch<{ status: string }>(`/api/modules/${encodeURIComponent(moduleId)}/sync`, {
+export type SyncJob = {
+  id: string
+  module_id: string
+  trigger: 'manual' | 'scheduled'
+  status: 'queued' | 'running' | 'done' | 'failed'
+  created_at: string
+  started_at: string | null
+  finished_at: string | null
+  duration_s: number | null
+  inserted: number | null
+  error: string | null
+}
+
+export async function syncModule(moduleId: string): Promise<{ status: string; job_id: string }> {
+  return apiFetch<{ status: string; job_id: string }>(`/api/modules/${encodeURIComponent(moduleId)}/sync`, {
     method: 'POST',
   })
 }
 
+export async function getSyncJob(moduleId: string, jobId: string): Promise<SyncJob> {
+  return apiFetch<SyncJob>(`/api/modules/${encodeURIComponent(moduleId)}/sync/jobs/${encodeURIComponent(jobId)}`)
+}
+
+export async function syncModuleAndWait(moduleId: string, pollMs = 1000): Promise<SyncJob> {
+  const { job_id } = await syncModule(moduleId)
+  let job = await getSyncJob(moduleId, job_id)
+  while (job.status === 'queued' || job.status === 'running') {
+    await new Promise((resolve) => setTimeout(resolve, pollMs))
+    job = await getSyncJob(moduleId, job_id)
+  }
+  if (job.status === 'failed') {
+    throw new Error(job.error ?? 'Sync failed')
+  }
+  return job
+}
+
 export async function getModuleConfig(moduleId: string): Promise<ModuleConfig> {
   return apiFetch<ModuleConfig>(`/api/modules/${encodeURIComponent(moduleId)}/config`)
 }
@@ -101,3 +166,28 @@ export async function testModuleConfig(moduleId: string, configJson: Record<stri
     body: JSON.stringify({ config_json: configJson }),
   })
 }
+
+export type ModuleSyncedNotification = {
+  module_id: string
+  inserted: number
+  widgets: string[]
+  source: string
+  at: string
+}
+
+export function subscribeModuleSynced(
+  onSynced: (notification: ModuleSyncedNotification) => void,
+  onReconnect?: () => void,
+): () => void {
+  const source = new EventSource(apiUrl('/api/stream'))
+  let connected = false
+  source.addEventListener('ready', () => {
+    // Reconnexion (redémarrage du backend, client lâché car trop lent) : des notifications ont pu être perdues.
+    if (connected) onReconnect?.()
+    connected = true
+  })
+  source.addEventListener('module_synced', (ev) => {
+    onSynced(JSON.parse((ev as MessageEvent<string>).data) as ModuleSyncedNotification)
+  })
+  return () => source.close()
+}
@@ -1,4 +1,4 @@
-import { useEffect, useMemo, useState, type ComponentType } from 'react'
+import { useEffect, useMemo, useRef, useState, type ComponentType } from 'react'
 
 import { ReactGridLayout as ReactGridLayoutBase, type Layout, useContainerWidth } from 'react-grid-layout'
 import 'react-grid-layout/css/styles.css'
@@ -6,10 +6,11 @@ import 'react-resizable/css/styles.css'
 
 import {
   getDashboard,
-  getWidgetData,
+  getWidgetDataBatch,
   listWidgets,
   saveDashboard,
-  syncModule,
+  subscribeModuleSynced,
+  syncModuleAndWait,
   type DashboardConfig,
   type DashboardLayoutItem,
   type DashboardWidgetRef,
@@ -115,6 +116,12 @@ export default function DashboardPage(props: Props) {
     return filteredWidgets.filter((w) => selectedKeySet.has(`${w.descriptor.module_id}:${w.descriptor.id}`))
   }, [filteredWidgets, selectedKeySet])
 
+  // Widgets affichés, lus par le handler SSE (abonné une seule fois, il ne voit pas les états suivants).
+  const shownKeysRef = useRef<Set<string>>(new Set())
+  useEffect(() => {
+    shownKeysRef.current = new Set(selectedWidgets.map((w) => `${w.descriptor.module_id}:${w.descriptor.id}`))
+  }, [selectedWidgets])
+
   const gridLayout = useMemo(() => {
     const selectedKeys = selectedWidgets.map((w) => `${w.descriptor.module_id}:${w.descriptor.id}`)
     const cfgLayout = Array.isArray(dashboard.layout) ? dashboard.layout : []
@@ -126,6 +133,31 @@ export default function DashboardPage(props: Props) {
     return filteredWidgets.filter((w) => !selectedKeySet.has(`${w.descriptor.module_id}:${w.descriptor.id}`))
   }, [filteredWidgets, selectedKeySet])
 
+  async function loadWidgetData(refs: DashboardWidgetRef[]) {
+    if (refs.length === 0) return
+    const keys = new Set(refs.map((r) => widgetKey(r)))
+    try {
+      // Une seule requête : le backend résout les widgets en parallèle (fuseau du dashboard inclus).
+      const { results } = await getWidgetDataBatch(refs, 'default')
+      const byKey = new Map(results.map((r) => [widgetKey(r), r] as const))
+      setWidgets((prev) =>
+        prev.map((p) => {
+          const k = `${p.descriptor.module_id}:${p.descriptor.id}`
+          const r = byKey.get(k)
+          if (!r) return keys.has(k) ? { ...p, loading: false } : p
+          return r.status === 'ok'
+            ? { ...p, loading: false, error: null, data: r.data }
+            : { ...p, loading: false, error: r.error ?? 'Erreur' }
+        }),
+      )
+    } catch (e) {
+      const msg = e instanceof Error ? e.message : 'Erreur'
+      setWidgets((prev) =>
+        prev.map((p) => (keys.has(`${p.descriptor.module_id}:${p.descriptor.id}`) ? { ...p, loading: false, error: msg } : p)),
+      )
+    }
+  }
+
   async function refreshWidgets() {
     setLoading(true)
     setError(null)
@@ -139,29 +171,7 @@ export default function DashboardPage(props: Props) {
       }))
       setWidgets(initial)
 
-      await Promise.all(
-        initial.map(async (w) => {
-          try {
-            const res = await getWidgetData(w.descriptor.module_id, w.descriptor.id)
-            setWidgets((prev) =>
-              prev.map((p) =>
-                p.descriptor.module_id === w.descriptor.module_id && p.descriptor.id === w.descriptor.id
-                  ? { ...p, loading: false, data: res.data }
-                  : p,
-              ),
-            )
-          } catch (e) {
-            const msg = e instanceof Error ? e.message : 'Erreur'
-            setWidgets((prev) =>
-              prev.map((p) =>
-                p.descriptor.module_id === w.descriptor.module_id && p.descriptor.id === w.descriptor.id
-                  ? { ...p, loading: false, error: msg }
-                  : p,
-              ),
-            )
-          }
-        }),
-      )
+      await loadWidgetData(initial.map((w) => ({ module_id: w.descriptor.module_id, widget_id: w.descriptor.id })))
     } catch (e) {
       setError(e instanceof Error ? e.message : 'Erreur')
     } finally {
@@ -244,6 +254,8 @@ export default function DashboardPage(props: Props) {
     const next = { widgets: nextWidgets, layout: nextLayout }
     setDashboard(next)
     void persistDashboard(next)
+    // Les syncs ne rechargent que les widgets affichés : les données de celui-ci peuvent dater.
+    void loadWidgetData([ref])
   }
 
   function removeWidget(ref: DashboardWidgetRef) {
@@ -296,7 +308,7 @@ export default function DashboardPage(props: Props) {
     setLoading(true)
     setError(null)
     try {
-      await syncModule(props.moduleFilter)
+      await syncModuleAndWait(props.moduleFilter)
       await refreshWidgets()
     } catch (e) {
       setError(e instanceof Error ? e.message : 'Erreur')
@@ -309,6 +321,19 @@ export default function DashboardPage(props: Props) {
     void loadDashboard()
   }, [])
 
+  useEffect(() => {
+    // Push SSE : seuls les widgets affichés et touchés par une sync sont rechargés (plus de polling).
+    return subscribeModuleSynced(
+      (n) =>
+        void loadWidgetData(
+          n.widgets
+            .map((widget_id) => ({ module_id: n.module_id, widget_id }))
+            .filter((ref) => shownKeysRef.current.has(widgetKey(ref))),
+        ),
+      () => void refreshWidgets(),
+    )
+  }, [])
+
   return (
     <div style={{ display: 'flex', flexDirection: 'column', gap: 16 }}>
       <header style={{ display: 'flex', alignItems: 'center', justifyContent: 'space-between', gap: 12 }}>
@@ -4,7 +4,7 @@ import {
   getModuleConfig,
   listModules,
   saveModuleConfig,
-  syncModule,
+  syncModuleAndWait,
   testModuleConfig,
   type ModuleInfo,
 } from '../api/synapsesync'
@@ -104,7 +104,7 @@ export default function ModulesPage() {
   async function onSync(moduleId: string) {
     setModules((prev) => prev.map((m) => (m.module.id === moduleId ? { ...m, syncing: true, error: null } : m)))
     try {
-      await syncModule(moduleId)
+      await syncModuleAndWait(moduleId)
       await refresh()
     } catch (e) {
       const msg = e instanceof Error ? e.message : 'Erreur'